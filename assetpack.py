@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Asset pack builder for Retro Platform Fighter - Diamond Quest
+Converts the WAV files in sounds/ to the mixer's native format (MIXER_FORMAT:
+22050 Hz, signed 16-bit, stereo) ahead of time and packs them, plus any
+sprite sheet PNGs as raw RGBA, into one indexed file next to the game module.
+At startup SoundManager memory-maps the pack instead of opening each WAV.
+
+Usage:
+    retro-platform pack                          # sounds/*.wav -> assets.pack
+    retro-platform pack --images sprites/ --output build/assets.pack
+"""
+
+import glob
+import os
+import sys
+import wave
+
+import numpy
+import pygame
+
+import retro_platform_game as rpg
+
+Pack = rpg.AssetPack
+
+def read_wav(path):
+    """Samples of a PCM WAV file as a (frames, channels) float array in [-1, 1]"""
+    with wave.open(path, "rb") as fh:
+        channels, width, rate = fh.getnchannels(), fh.getsampwidth(), fh.getframerate()
+        raw = fh.readframes(fh.getnframes())
+    if width == 1:
+        samples = (numpy.frombuffer(raw, numpy.uint8).astype(numpy.float64) - 128) / 128
+    elif width == 2:
+        samples = numpy.frombuffer(raw, "<i2") / 32768.0
+    elif width == 3:
+        padded = numpy.frombuffer(raw, numpy.uint8).reshape(-1, 3)
+        padded = numpy.pad(padded, ((0, 0), (1, 0)))  # 24-bit -> high bytes of int32
+        samples = padded.copy().view("<i4").ravel() / 2147483648.0
+    elif width == 4:
+        samples = numpy.frombuffer(raw, "<i4") / 2147483648.0
+    else:
+        raise ValueError(f"{path}: unsupported sample width {width}")
+    return samples.reshape(-1, channels), rate
+
+def convert(samples, rate, frequency, channels):
+    """Resample (linear) and remix samples to the target format as 16-bit PCM bytes"""
+    if rate != frequency:
+        frames = round(len(samples) * frequency / rate)
+        source = numpy.arange(len(samples)) / rate
+        target = numpy.arange(frames) / frequency
+        samples = numpy.column_stack([numpy.interp(target, source, column) for column in samples.T])
+    if samples.shape[1] != channels:
+        mono = samples.mean(axis=1, keepdims=True)
+        samples = numpy.repeat(mono, channels, axis=1)
+    pcm = numpy.clip(numpy.round(samples * 32767), -32768, 32767).astype("<i2")
+    return pcm.tobytes()
+
+def collect_assets(sound_dir, image_dir=None):
+    """(name, kind, data, a, b) for every sound and image to pack"""
+    frequency, size, channels = rpg.MIXER_FORMAT
+    assets = []
+    for name in rpg.SOUND_NAMES:
+        path = os.path.join(sound_dir, f"{name}.wav")
+        if not os.path.exists(path):
+            print(f"Skipping {name}: {path} not found (it will be generated at startup)",
+                  file=sys.stderr)
+            continue
+        samples, rate = read_wav(path)
+        assets.append((name, Pack.SOUND, convert(samples, rate, frequency, channels),
+                       frequency, channels))
+    if image_dir:
+        for path in sorted(glob.glob(os.path.join(image_dir, "*.png"))):
+            surface = pygame.image.load(path)
+            name = os.path.splitext(os.path.basename(path))[0]
+            assets.append((name, Pack.IMAGE, pygame.image.tostring(surface, "RGBA"),
+                           surface.get_width(), surface.get_height()))
+    return assets
+
+def write_pack(path, assets):
+    """Write assets as a header, a fixed-size index and aligned data blocks"""
+    for name, *_ in assets:
+        if len(name.encode()) > 32:
+            raise ValueError(f"Asset name too long for the index: {name}")
+    offset = Pack.HEADER.size + Pack.ENTRY.size * len(assets)
+    index, blocks = [], []
+    for name, kind, data, a, b in assets:
+        padding = -offset % Pack.ALIGN
+        offset += padding
+        blocks.append(b"\0" * padding + data)
+        index.append(Pack.ENTRY.pack(name.encode(), kind, offset, len(data), a, b))
+        offset += len(data)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(Pack.HEADER.pack(Pack.MAGIC, Pack.VERSION, len(assets)))
+        fh.writelines(index)
+        fh.writelines(blocks)
+    os.replace(tmp_path, path)
+    return offset
+
+def run_pack(args):
+    """Entry point for the `pack` subcommand"""
+    assets = collect_assets(args.sounds, args.images)
+    size = write_pack(args.output, assets)
+    sounds = sum(1 for asset in assets if asset[1] == Pack.SOUND)
+    print(f"Packed {sounds} sounds and {len(assets) - sounds} images "
+          f"({size / 1024:.0f} KB) into {args.output}")
+    return 0
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser(
+        "pack", help="build the asset pack",
+        description="Convert sounds to the mixer's format and pack them, plus sprite "
+                    "sheets, into one memory-mapped asset file.")
+    parser.add_argument("--sounds", default=rpg.SOUND_DIR,
+                        help="directory of WAV files (default: sounds/ next to the game)")
+    parser.add_argument("--images", metavar="DIR",
+                        help="directory of sprite sheet PNGs to pack as RGBA")
+    parser.add_argument("--output", default=rpg.ASSET_PACK,
+                        help="pack file (default: assets.pack next to the game, "
+                             "where it is loaded from)")
+    parser.set_defaults(handler=run_pack)
+    return parser
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Autopilot for Retro Platform Fighter - Diamond Quest
+Autopilot plays the game through the same input path as a human player.
+Each frame it looks at the game and returns the held keys and the KEYDOWN
+presses. These go through Game.handle_key and Game.update like the window's
+events. It walks right, climbs platforms by jumping beside them, attacks the
+robots in range and then fights the boss. On the level complete, game over
+and victory screens it presses Enter or R.
+Routes come from a graph of the level's ledges, built from create_level's
+platforms and the player's jump arc.
+
+Usage:
+    retro-platform soak --minutes 120       # the autopilot across all ten levels
+    pilot = autopilot.Autopilot(game)       # inputs(frame) works like Replay.inputs
+    rpg.run_headless(game, 3600, pilot)
+"""
+
+import random
+from collections import deque
+
+import pygame
+
+import retro_platform_game as rpg
+
+PLAYER_WIDTH, PLAYER_HEIGHT = 32, 48
+STUCK_FRAMES = 240   # Frames without progress before wandering off at random
+WANDER_FRAMES = 90
+STAND_MARGIN = 8     # Keep this far inside the pixels the player can stand on
+ENGAGE_RANGE = rpg.KICK_RANGE + 16  # Start kicking before an enemy is in reach
+BOSS_ENGAGE_RANGE = 100  # The boss strikes from further away
+SPARE_STAMINA = 60   # Punch between kicks only above this
+
+def jump_arc():
+    """Feet height above the take-off point on each frame of a jump until it
+    falls 800 pixels below it, from the same physics as Player.update"""
+    arc, rise, vel_y = [], 0.0, rpg.JUMP_STRENGTH
+    while rise > -800:
+        vel_y += rpg.GRAVITY
+        rise -= vel_y
+        arc.append(rise)
+    return arc
+
+ARC = jump_arc()
+
+class Ledge:
+    """Platform tops the player can walk along: platforms at the same height
+    that touch are merged (the ground is one ledge)"""
+    __slots__ = ("left", "right", "top", "bottom")
+
+    def __init__(self, left, right, top, bottom):
+        self.left, self.right, self.top, self.bottom = left, right, top, bottom
+
+    def stand_range(self):
+        """Player x positions that stand on the ledge with some margin"""
+        return self.left - PLAYER_WIDTH + STAND_MARGIN, self.right - STAND_MARGIN
+
+    def under(self, x, width, feet):
+        """Whether an entity of width at x with its feet at feet is on or above the ledge"""
+        return x < self.right and x + width > self.left and feet <= self.top + 2
+
+def build_ledges(platforms):
+    ledges = []
+    for rect in sorted((platform.rect for platform in platforms), key=lambda r: (r.top, r.left)):
+        last = ledges[-1] if ledges else None
+        if last is not None and last.top == rect.top and rect.left <= last.right:
+            last.right = max(last.right, rect.right)
+            last.bottom = max(last.bottom, rect.bottom)
+        else:
+            ledges.append(Ledge(rect.left, rect.right, rect.top, rect.bottom))
+    return ledges
+
+def air_frames(rise):
+    """(first, last) jump frames with the feet above a ledge rise pixels
+    higher (first clears it by a few pixels), or None if it is out of reach"""
+    first = last = None
+    for i, height in enumerate(ARC):
+        if height >= rise + 4 and first is None:
+            first = i
+        if height >= rise:
+            last = i
+        elif first is not None:
+            break
+    return None if first is None else (first, last)
+
+def gap(a, b):
+    """Distance between two x ranges, 0 when they overlap"""
+    return max(0, b[0] - a[1], a[0] - b[1])
+
+def beside(source, target):
+    """Take-off spots on source next to target, where jumping straight up does
+    not hit target's underside: (left spot, right spot), either may be None"""
+    low, high = source.stand_range()
+    left = min(high, target.left - PLAYER_WIDTH - 4)
+    right = max(low, target.right + 4)
+    return (left if left >= low else None), (right if right <= high else None)
+
+def can_hop(source, target):
+    """Whether the player can get from standing on source to landing on target"""
+    rise = source.top - target.top
+    frames = air_frames(rise)
+    if frames is None:
+        return False
+    first, last = frames
+    distance = gap(source.stand_range(), target.stand_range())
+    if rise > 0 and distance == 0:
+        # Straight up beside it, then drift over
+        return beside(source, target) != (None, None) and last - first >= 4
+    return rpg.PLAYER_SPEED * last >= distance + STAND_MARGIN
+
+class Autopilot:
+    """Scripted player: inputs(frame) returns (held keys, keydowns) for the next
+    game.update, like Replay.inputs, so it drives run_headless or a soak loop.
+    It only reads the game. The key presses it chooses are all it changes, and
+    its own random generator keeps the run reproducible for a seed."""
+    JUMP_KEY, PUNCH_KEY, KICK_KEY = pygame.K_SPACE, pygame.K_x, pygame.K_z
+    LEFT_KEY, RIGHT_KEY = pygame.K_LEFT, pygame.K_RIGHT
+
+    def __init__(self, game, seed=0):
+        self.game = game
+        self.rng = random.Random(seed)
+        self._level = None     # (platform list, its length, level) the ledges were built from
+        self.ledges = []
+        self.hops = {}         # Ledge -> ledges reachable from it
+        self.hop = None        # Ledge the current jump or drop is heading for
+        self.jumped = False    # Jump pressed and the player has not landed since
+        self._progress = None  # (x, score, enemy health, level) last time the player made progress
+        self._still = 0
+        self._wander = 0
+        self._wander_key = self.RIGHT_KEY
+
+    def _load(self):
+        """Rebuild the ledge graph when the game's level changed"""
+        game = self.game
+        platforms = game.platforms
+        level = (platforms, len(platforms), game.current_level)
+        if self._level is not None and level[1:] == self._level[1:] and platforms is self._level[0]:
+            return
+        self._level = level
+        self.ledges = build_ledges(platforms)
+        self.hops = {ledge: [other for other in self.ledges
+                             if other is not ledge and can_hop(ledge, other)]
+                     for ledge in self.ledges}
+        self.hop = None
+
+    def ledge_of(self, x, width, feet):
+        """Highest ledge at or below an entity's feet, or None above a drop"""
+        best = None
+        for ledge in self.ledges:
+            if ledge.under(x, width, feet) and (best is None or ledge.top < best.top):
+                best = ledge
+        return best
+
+    def route(self, start, goal):
+        """Next ledge on the shortest hop path from start to goal, or None"""
+        previous = {start: None}
+        queue = deque([start])
+        while queue:
+            ledge = queue.popleft()
+            if ledge is goal:
+                while previous[ledge] is not start:
+                    ledge = previous[ledge]
+                return ledge
+            for other in self.hops[ledge]:
+                if other not in previous:
+                    previous[other] = ledge
+                    queue.append(other)
+        return None
+
+    def inputs(self, frame):
+        """(KeyState, keydowns) for this frame; frame is unused (see Replay.inputs)"""
+        game = self.game
+        if game.game_state == "level_complete":
+            return rpg.KeyState(), (pygame.K_RETURN,)
+        if game.game_state in ("game_over", "victory"):
+            return rpg.KeyState(), (pygame.K_r,)
+        if game.game_state == "paused":
+            return rpg.KeyState(), (pygame.K_p,)
+        self._load()
+        held, keydowns = [], []
+        player = game.player
+        if player.on_ground:
+            self.jumped = False
+
+        enemy = self.target()
+        if self._stuck() or enemy is None:
+            self.walk(held, keydowns, enemy)
+        elif not self.attack(enemy, held, keydowns):
+            self.approach(enemy, held, keydowns)
+        return rpg.KeyState(held), tuple(keydowns)
+
+    def target(self):
+        """Nearest robot; the boss once the robots are gone (the game keeps the
+        player out of the boss area until then) or when it comes close"""
+        game, player = self.game, self.game.player
+        enemies = list(game.robots)
+        boss = game.boss
+        if boss is not None and boss.alive and (not enemies or abs(boss.x - player.x) < 200):
+            enemies.append(boss)
+        return min(enemies, key=lambda enemy: abs(enemy.x - player.x) + abs(enemy.y - player.y),
+                   default=None)
+
+    def attack(self, enemy, held, keydowns):
+        """Fight an enemy that is in or about to come into range; returns False
+        if it is out of reach. Enemies only strike while the player is not
+        attacking, so kicks (the longest swing) are kept going back to back,
+        and punches only spend spare stamina."""
+        player = self.game.player
+        distance = abs(enemy.x - player.x)
+        engage = BOSS_ENGAGE_RANGE if enemy is self.game.boss else ENGAGE_RANGE
+        if distance >= engage or abs(enemy.y - player.y) >= enemy.HIT_HEIGHT - 2:
+            return False
+        if distance > rpg.KICK_RANGE - 8:
+            self.move_to(enemy.x, held)
+        stamina = player.stamina
+        if (stamina >= player.attack_stamina_cost and not player.kicking
+                and not player.kick_buffer):
+            self.press(self.KICK_KEY, held, keydowns)
+        elif (stamina >= SPARE_STAMINA and distance < rpg.PUNCH_RANGE - 2
+              and not player.punching and not player.punch_buffer):
+            self.press(self.PUNCH_KEY, held, keydowns)
+        return True
+
+    def approach(self, enemy, held, keydowns):
+        """Walk (or climb) towards an enemy"""
+        player = self.game.player
+        goal = self.ledge_of(enemy.x, enemy.width, enemy.y + enemy.height)
+        if not player.on_ground:
+            self.steer(held)
+            return
+        here = self.ledge_of(player.x, PLAYER_WIDTH, player.y + PLAYER_HEIGHT)
+        if here is None or goal is None or goal is here:
+            self.hop = None
+            self.move_to(enemy.x, held)
+            return
+        self.hop = self.route(here, goal)
+        if self.hop is None:
+            self.move_to(enemy.x, held)  # Robots chase the player down
+        else:
+            self.take_off(here, held, keydowns)
+
+    def walk(self, held, keydowns, enemy):
+        """Wander off at random after getting stuck, else walk right"""
+        if self._wander:
+            self._wander -= 1
+            if self._wander == WANDER_FRAMES - 1:
+                self._wander_key = self.rng.choice((self.LEFT_KEY, self.RIGHT_KEY))
+            held.append(self._wander_key)
+            if self.rng.random() < 0.05 and self.game.player.on_ground:
+                self.press(self.JUMP_KEY, held, keydowns)
+        else:
+            held.append(self.RIGHT_KEY)
+
+    def take_off(self, here, held, keydowns):
+        """Walk to where the hop to self.hop starts, and jump (or walk off) there"""
+        player, target = self.game.player, self.hop
+        low, high = here.stand_range()
+        land_low, land_high = target.stand_range()
+        rise = here.top - target.top
+        if rise > 0 and gap((low, high), (land_low, land_high)) == 0:
+            left, right = beside(here, target)
+            spots = [spot for spot in (left, right) if spot is not None]
+            spot = min(spots, key=lambda x: abs(x - player.x))
+        elif rise <= 0 and (land_low < low or land_high > high):
+            # Lower or level: walk off the edge towards it
+            spot = None
+            self.move_to(land_low if land_low < low else land_high, held)
+            return
+        else:
+            # Across a gap: jump from the nearest edge
+            spot = high if land_low > high else low
+        if abs(spot - player.x) > rpg.PLAYER_SPEED:
+            self.move_to(spot, held)
+        elif player.stamina >= player.jump_stamina_cost:
+            self.press(self.JUMP_KEY, held, keydowns)
+            self.jumped = True
+
+    def steer(self, held):
+        """In the air: drift onto the ledge being hopped to without hitting its
+        underside on the way up"""
+        player, target = self.game.player, self.hop
+        if target is None:
+            return
+        low, high = target.stand_range()
+        x = min(max(player.x, low), high)
+        if x == player.x:
+            return
+        step = rpg.PLAYER_SPEED if x > player.x else -rpg.PLAYER_SPEED
+        feet = player.y + PLAYER_HEIGHT
+        if feet > target.top + 4:
+            if player.vel_y >= 0:
+                return  # Fell short; land wherever and route again
+            next_x = player.x + step
+            if next_x < target.right and next_x + PLAYER_WIDTH > target.left:
+                return  # Still below it: moving over now would bump its underside
+        held.append(self.RIGHT_KEY if step > 0 else self.LEFT_KEY)
+
+    def move_to(self, x, held):
+        player = self.game.player
+        if x > player.x + rpg.PLAYER_SPEED:
+            held.append(self.RIGHT_KEY)
+        elif x < player.x - rpg.PLAYER_SPEED:
+            held.append(self.LEFT_KEY)
+
+    def press(self, key, held, keydowns):
+        """A tap, as the window reports it: a KEYDOWN with the key held this frame"""
+        keydowns.append(key)
+        held.append(key)
+
+    def _stuck(self):
+        """True while wandering after STUCK_FRAMES frames without moving,
+        scoring or damaging an enemy"""
+        game, player = self.game, self.game.player
+        if self._wander:
+            return True
+        health = sum(robot.health for robot in game.robots)
+        if game.boss is not None:
+            health += game.boss.health
+        progress = (player.x, game.score, health, game.current_level)
+        last = self._progress
+        if (last is None or abs(progress[0] - last[0]) > 2 * PLAYER_WIDTH
+                or progress[1:] != last[1:]):
+            self._progress = progress
+            self._still = 0
+            return False
+        self._still += 1
+        if self._still >= STUCK_FRAMES:
+            self._still = 0
+            self._wander = WANDER_FRAMES
+            return True
+        return False
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for Retro Platform Fighter - Diamond Quest
+Times headless frames for the real levels and for synthetic stress levels that
+scale robots, diamonds, platforms and world width, plus level build and sound
+synthesis time. Results are compared against a JSON baseline with configurable
+regression thresholds.
+
+Usage:
+    retro-platform bench --save                 # record benchmark_baseline.json
+    retro-platform bench                        # compare against the baseline
+    retro-platform bench --scenarios robots --factors 1,10,100
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform as host_platform
+import random
+import statistics
+import sys
+import time
+
+import pygame
+
+import retro_platform_game as rpg
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+# Width of the real levels - stress scenarios widen rpg.WORLD_WIDTH while running
+BASE_WORLD_WIDTH = rpg.WORLD_WIDTH
+
+# Allowed slowdown before a metric counts as a regression (0.25 = 25% slower)
+DEFAULT_THRESHOLDS = {
+    "default": 0.25,
+    "update_ms.p95": 0.40,
+    "frame_ms.p95": 0.40,
+}
+
+# Synthetic families scale one dimension of level 10 by each factor
+STRESS_FAMILIES = ("robots", "diamonds", "platforms", "width")
+DEFAULT_FACTORS = {
+    "robots": (1, 10, 100),
+    "diamonds": (1, 10, 100),
+    "platforms": (1, 10, 100),
+    "width": (1, 4, 10),
+}
+
+@contextlib.contextmanager
+def world_width(width):
+    """Temporarily widen the world - entities read WORLD_WIDTH every frame"""
+    original = rpg.WORLD_WIDTH
+    rpg.WORLD_WIDTH = width
+    try:
+        yield
+    finally:
+        rpg.WORLD_WIDTH = original
+
+class Scenario:
+    """A named benchmark: builds a seeded game and the world width it runs in"""
+    def __init__(self, name, level=10, family=None, factor=1):
+        self.name = name
+        self.level = level
+        self.family = family
+        self.factor = factor
+
+    @property
+    def world_width(self):
+        return BASE_WORLD_WIDTH * (self.factor if self.family == "width" else 1)
+
+    def build(self, seed):
+        game = rpg.Game(self.level, seed)
+        if self.family is not None and self.factor > 1:
+            rng = random.Random(seed)
+            getattr(self, f"_scale_{self.family}")(game, rng)
+            game.reindex()
+        return game
+
+    def _scale_robots(self, game, rng):
+        originals = list(game.robots)
+        for _ in range(self.factor - 1):
+            for robot in originals:
+                x = rng.uniform(100, BASE_WORLD_WIDTH - 600)
+                game.robots.append(rpg.Robot(x, robot.y, robot.type))
+
+    def _scale_diamonds(self, game, rng):
+        originals = list(game.diamonds)
+        for _ in range(self.factor - 1):
+            for diamond in originals:
+                x = rng.uniform(100, BASE_WORLD_WIDTH - 600)
+                game.diamonds.append(rpg.Diamond(x, diamond.y))
+
+    def _scale_platforms(self, game, rng):
+        originals = list(game.platforms)
+        for _ in range(self.factor - 1):
+            for platform in originals:
+                rect = platform.rect
+                x = rng.randint(0, BASE_WORLD_WIDTH - rect.width)
+                game.platforms.append(rpg.Platform(x, rect.y, rect.width, rect.height))
+
+    def _scale_width(self, game, rng):
+        # Tile the whole level along the wider world and move the boss to the end
+        platforms, robots = list(game.platforms), list(game.robots)
+        diamonds, superdiamonds = list(game.diamonds), list(game.superdiamonds)
+        for tile in range(1, self.factor):
+            offset = tile * BASE_WORLD_WIDTH
+            for platform in platforms:
+                rect = platform.rect
+                game.platforms.append(rpg.Platform(rect.x + offset, rect.y, rect.width, rect.height))
+            for robot in robots:
+                game.robots.append(rpg.Robot(robot.x + offset, robot.y, robot.type))
+            for diamond in diamonds:
+                game.diamonds.append(rpg.Diamond(diamond.x + offset, diamond.y))
+            for superdiamond in superdiamonds:
+                game.superdiamonds.append(
+                    rpg.SuperDiamond(superdiamond.x + offset, superdiamond.y, superdiamond.power_type))
+        if game.boss:
+            game.boss.x += (self.factor - 1) * BASE_WORLD_WIDTH
+
+def all_scenarios(factors=None):
+    scenarios = [Scenario(f"level{level}", level) for level in range(1, 11)]
+    for family in STRESS_FAMILIES:
+        for factor in factors or DEFAULT_FACTORS[family]:
+            scenarios.append(Scenario(f"{family}-x{factor}", 10, family, factor))
+    return scenarios
+
+def summarize(samples):
+    """Mean and percentiles of per-frame times, in milliseconds"""
+    ordered = sorted(samples)
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p / 100.0 * len(ordered)))]
+    return {
+        "mean": round(statistics.fmean(ordered), 4),
+        "p50": round(pct(50), 4),
+        "p95": round(pct(95), 4),
+        "max": round(ordered[-1], 4),
+    }
+
+def time_frames(scenario, frames, warmup, seed, render, renderer="surface", render_scale=1.0):
+    """Per-frame wall time of update (and draw and present with the given
+    renderer and render scale) for a fresh seeded game"""
+    game = scenario.build(seed)  # Built at the real width, then tiled
+    entities = {
+        "robots": len(game.robots),
+        "diamonds": len(game.diamonds),
+        "platforms": len(game.platforms),
+        "world_width": scenario.world_width,
+    }
+    with world_width(scenario.world_width):
+        replay = rpg.Replay.demo(scenario.level, frames + warmup, seed)
+        screen = rpg.offscreen_canvas(renderer, render_scale) if render else None
+        if screen is not None:
+            rpg.events.attach(game.on_events)  # The HUD consumer, as in the game window
+        samples = []
+        perf_counter = time.perf_counter
+        try:
+            for frame in range(frames + warmup):
+                keys, keydowns = replay.inputs(frame)
+                start = perf_counter()
+                game.update(keys)
+                if screen is not None:
+                    rpg.events.dispatch()
+                    game.draw(screen)
+                    screen.present()  # SDL2 renderers execute batched draws here
+                if frame >= warmup:
+                    samples.append((perf_counter() - start) * 1000.0)
+        finally:
+            if screen is not None:
+                rpg.events.detach(game.on_events)
+        return samples, entities
+
+def bench_scenario(scenario, frames, warmup, seed, renderer="surface", render_scale=1.0):
+    update, entities = time_frames(scenario, frames, warmup, seed, render=False)
+    frame, _ = time_frames(scenario, frames, warmup, seed, render=True, renderer=renderer,
+                           render_scale=render_scale)
+    return {
+        "family": scenario.family,
+        "factor": scenario.factor,
+        "entities": entities,
+        "update_ms": summarize(update),
+        "frame_ms": summarize(frame),
+    }
+
+def bench_level_build(repeats, seed):
+    """Wall time of Game.load_level() for every level: a level swap as the game
+    does it, with the previous level's entities back in the pools. One
+    untimed load per level fills the pools first, so the samples reuse
+    entities instead of constructing them."""
+    game = rpg.Game(1, seed)
+    results = {}
+    try:
+        for level in range(1, 11):
+            random.seed(seed)
+            game.load_level(level)  # Warm-up
+            samples = []
+            for _ in range(repeats):
+                random.seed(seed)
+                start = time.perf_counter()
+                game.load_level(level)
+                samples.append((time.perf_counter() - start) * 1000.0)
+            results[f"level{level}"] = summarize(samples)
+    finally:
+        game.release_level()
+    return results
+
+def bench_sound_synthesis(repeats):
+    """Wall time of procedurally generating the full sound set"""
+    if pygame.mixer.get_init() is None:
+        return None  # Creating Sounds needs an initialized mixer
+    manager = rpg.sound_manager
+    sounds, enabled = dict(manager.sounds), manager.sound_enabled
+    samples = []
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(repeats):
+                start = time.perf_counter()
+                manager.generate_sounds()
+                samples.append((time.perf_counter() - start) * 1000.0)
+    finally:
+        manager.sounds, manager.sound_enabled = sounds, enabled
+    return summarize(samples)
+
+def run_benchmarks(args):
+    rpg.quality.set(args.quality)  # Auto stays at high: only the game loop feeds it frame times
+    factors = [int(f) for f in args.factors.split(",")] if args.factors else None
+    scenarios = all_scenarios(factors)
+    if args.scenarios:
+        wanted = args.scenarios.split(",")
+        scenarios = [s for s in scenarios
+                     if s.name in wanted or s.family in wanted
+                     or ("levels" in wanted and s.family is None)]
+
+    results = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "pygame": pygame.version.ver,
+            "machine": host_platform.platform(),
+            "frames": args.frames,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "renderer": args.renderer,
+            "render_scale": args.render_scale,
+            "quality": args.quality,
+        },
+        "scenarios": {},
+        "level_build_ms": {},
+        "sound_synthesis_ms": None,
+    }
+
+    # Keep the benchmark quiet - level code may print diagnostics
+    with contextlib.redirect_stdout(io.StringIO()) if not args.verbose else contextlib.nullcontext():
+        for scenario in scenarios:
+            results["scenarios"][scenario.name] = bench_scenario(
+                scenario, args.frames, args.warmup, args.seed,
+                args.renderer, args.render_scale)
+            sys.stderr.write(f"  {scenario.name} done\n")
+    if not args.skip_build:
+        results["level_build_ms"] = bench_level_build(args.repeats, args.seed)
+        results["sound_synthesis_ms"] = bench_sound_synthesis(args.repeats)
+    return results
+
+def flatten(results):
+    """Flatten results into {"scenario/metric.stat": value} for comparison"""
+    flat = {}
+    for name, data in results["scenarios"].items():
+        for metric in ("update_ms", "frame_ms"):
+            for stat in ("p50", "p95"):
+                flat[f"{name}/{metric}.{stat}"] = data[metric][stat]
+    for name, data in results.get("level_build_ms", {}).items():
+        flat[f"build-{name}/level_build_ms.p50"] = data["p50"]
+    if results.get("sound_synthesis_ms"):
+        flat["sounds/sound_synthesis_ms.p50"] = results["sound_synthesis_ms"]["p50"]
+    return flat
+
+def threshold_for(key, thresholds):
+    """Most specific threshold: "scenario/metric.stat", then "metric.stat", then default"""
+    if key in thresholds:
+        return thresholds[key]
+    metric = key.split("/", 1)[1]
+    return thresholds.get(metric, thresholds.get("default", DEFAULT_THRESHOLDS["default"]))
+
+def compare(results, baseline, thresholds):
+    """Return (key, baseline, current, allowed) for every regressed metric"""
+    regressions = []
+    current = flatten(results)
+    for key, old in flatten(baseline).items():
+        new = current.get(key)
+        if new is None or old <= 0:
+            continue
+        allowed = threshold_for(key, thresholds)
+        if new > old * (1.0 + allowed):
+            regressions.append((key, old, new, allowed))
+    return regressions
+
+def print_report(results):
+    meta = results["meta"]
+    print(f"Frames drawn with the {meta['renderer']} renderer at render scale {meta['render_scale']}, "
+          f"{meta.get('quality', 'auto')} quality")
+    print(f"\n{'scenario':<16} {'robots':>7} {'diamonds':>8} {'platforms':>9} "
+          f"{'update p50':>11} {'p95':>8} {'frame p50':>10} {'p95':>8}")
+    for name, data in results["scenarios"].items():
+        entities = data["entities"]
+        print(f"{name:<16} {entities['robots']:>7} {entities['diamonds']:>8} {entities['platforms']:>9} "
+              f"{data['update_ms']['p50']:>11.3f} {data['update_ms']['p95']:>8.3f} "
+              f"{data['frame_ms']['p50']:>10.3f} {data['frame_ms']['p95']:>8.3f}")
+
+    # Scaling curves: cost of each family relative to its x1 point
+    for family in STRESS_FAMILIES:
+        points = sorted((data["factor"], data) for data in results["scenarios"].values()
+                        if data["family"] == family)
+        if len(points) < 2:
+            continue
+        base_update = points[0][1]["update_ms"]["p50"] or 1e-9
+        base_frame = points[0][1]["frame_ms"]["p50"] or 1e-9
+        curve = ", ".join(
+            f"x{factor}: {data['update_ms']['p50'] / base_update:.1f}/"
+            f"{data['frame_ms']['p50'] / base_frame:.1f}"
+            for factor, data in points)
+        print(f"scaling {family:<9} (update/frame vs x1) {curve}")
+
+    if results["level_build_ms"]:
+        builds = ", ".join(f"{name[5:]}: {data['p50']:.2f}"
+                           for name, data in results["level_build_ms"].items())
+        print(f"\nlevel build ms (p50) {builds}")
+    if results["sound_synthesis_ms"]:
+        print(f"sound synthesis ms (p50) {results['sound_synthesis_ms']['p50']:.1f}")
+
+def run_bench(args):
+    """Entry point for the `bench` subcommand"""
+    results = run_benchmarks(args)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.save:
+        results["thresholds"] = dict(DEFAULT_THRESHOLDS)
+        if os.path.exists(args.baseline):
+            # Keep thresholds that were tuned by hand in the existing baseline
+            with open(args.baseline, "r", encoding="utf-8") as fh:
+                results["thresholds"] = json.load(fh).get("thresholds", results["thresholds"])
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline} - run with --save to create one")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    measured = (baseline["meta"].get("renderer", "surface"), baseline["meta"].get("render_scale", 1.0))
+    if measured != (args.renderer, args.render_scale):
+        print(f"\nNote: baseline frame times were measured with the {measured[0]} "
+              f"renderer at render scale {measured[1]}")
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    thresholds.update(baseline.get("thresholds", {}))
+    if args.threshold is not None:
+        thresholds["default"] = args.threshold
+    regressions = compare(results, baseline, thresholds)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for key, old, new, allowed in regressions:
+            print(f"  {key}: {old:.3f} -> {new:.3f} ms (+{new / old - 1:.0%}, allowed +{allowed:.0%})")
+        return 1
+    print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser(
+        "bench", help="run the benchmark suite",
+        description="Time headless frames, level builds and sound synthesis "
+                    "and compare them with a JSON baseline.")
+    parser.add_argument("--scenarios", metavar="LIST",
+                        help="comma-separated scenario names or families "
+                             "(levels, robots, diamonds, platforms, width)")
+    parser.add_argument("--factors", metavar="LIST",
+                        help="comma-separated scale factors for the stress families")
+    parser.add_argument("--frames", type=int, default=120,
+                        help="timed frames per scenario (default: 120)")
+    parser.add_argument("--warmup", type=int, default=10,
+                        help="untimed frames before measuring (default: 10)")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="repeats for level build and sound synthesis (default: 5)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed for every scenario (default: 0)")
+    rpg.add_render_arguments(parser)
+    parser.add_argument("--skip-build", action="store_true",
+                        help="skip the level build and sound synthesis benchmarks")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help=f"baseline JSON file (default: {DEFAULT_BASELINE})")
+    parser.add_argument("--save", action="store_true",
+                        help="save these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="override the default allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--output", metavar="PATH",
+                        help="also write the full results JSON here")
+    parser.add_argument("--verbose", action="store_true",
+                        help="show game output while benchmarking")
+    parser.set_defaults(handler=run_bench)
+    return parser
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Collision property check for Retro Platform Fighter - Diamond Quest
+Moves the player, a robot and the boss through random vertical moves, some
+far faster than anything in play, against every level's platforms plus
+random thin ones. Each move is resolved once by the game's swept collision
+(move_vertically) and once by a reference that splits it into substeps of at
+most a pixel and tests overlap after each, like the old per-frame check did.
+The two must agree on every move. The report also counts the moves the
+unswept per-frame check (a single step) gets wrong.
+
+Usage:
+    retro-platform check-collision
+    retro-platform check-collision --cases 100000 --max-speed 5000 --seed 3
+"""
+
+import math
+import operator
+import random
+import sys
+
+import pygame
+
+import retro_platform_game as rpg
+
+# Start offsets from resting on a platform: exact contact and the tolerances' edges
+EDGE_OFFSETS = (0, 0, 0.5, -0.5, 1, -1, 4.5, 5, 5.5, -5)
+
+def build_terrains(rng, extra):
+    """Every level's platforms plus `extra` random ones (as thin as 1px), indexed like Game"""
+    terrains = []
+    for level in range(1, 11):
+        platforms = rpg.create_level(level)[0]
+        for _ in range(extra):
+            width, height = rng.randint(20, 250), rng.randint(1, 40)
+            platforms.append(rpg.Platform(rng.randint(0, rpg.WORLD_WIDTH - width),
+                                          rng.randint(100, rpg.SCREEN_HEIGHT - 60), width, height))
+        terrains.append(rpg.XIndex(platforms, operator.attrgetter("rect.x"),
+                                   operator.attrgetter("rect.width")))
+    return terrains
+
+def random_move(rng, entity, terrain, max_speed):
+    """Place entity next to a random platform of terrain with a random vel_y"""
+    rect = rng.choice(terrain.items).rect
+    entity.x = rng.uniform(rect.left - entity.width, rect.right)
+    if rng.random() < 0.3:
+        entity.y = rect.top - entity.height + rng.choice(EDGE_OFFSETS)
+    elif rng.random() < 0.2:
+        entity.y = rect.bottom + rng.choice(EDGE_OFFSETS)
+    else:
+        entity.y = rng.uniform(rect.top - 400, rect.bottom + 400)
+    speed = 30 if rng.random() < 0.5 else max_speed
+    entity.vel_y = rng.uniform(-speed, speed)
+
+def reference(entity, terrain, step):
+    """(y, vel_y, landed) after moving entity by vel_y in substeps of at most
+    step pixels, testing overlap after each and stopping at the nearest
+    platform entity lands on or bumps. Platforms entity already overlapped
+    when the move began only count if it reaches none (as in sweep). Leaves
+    entity where it started."""
+    x, y0, vel_y, height = entity.x, entity.y, entity.vel_y, entity.height
+    rect = pygame.Rect(x, y0, entity.width, height)
+    column = [platform for platform in terrain.items
+              if platform.rect.left < rect.right and platform.rect.right > rect.left]
+    inside = [platform for platform in column
+              if y0 < platform.rect.bottom and y0 + height > platform.rect.top]
+    column = [platform for platform in column if platform not in inside]
+    rects = [platform.rect for platform in column]
+    down = vel_y > 0
+    steps = max(1, math.ceil(abs(vel_y) / step))
+    result = None
+    for i in range(1, steps + 1):
+        old_y = y0 + vel_y * ((i - 1) / steps)
+        entity.y = y0 + vel_y * (i / steps)
+        rect.update(x, entity.y, entity.width, height)  # Truncated like bounds()
+        hits = [column[j] for j in rect.collidelistall(rects)
+                if (entity.lands_on if down else entity.bumps)(column[j], old_y)]
+        if hits:
+            if down:
+                top = min(platform.rect.top for platform in hits)
+                result = (top - height, 0, True)
+            else:
+                result = (max(platform.rect.bottom for platform in hits), 0, False)
+            break
+    if result is None and vel_y:
+        # Walked into: judged on the whole move, nearest edge first
+        if down:
+            hits = [platform for platform in inside
+                    if rect.bottom > platform.rect.top and entity.lands_on(platform, y0)]
+        else:
+            hits = [platform for platform in inside
+                    if rect.top < platform.rect.bottom and entity.bumps(platform, y0)]
+        if down and hits:
+            result = (max(platform.rect.top for platform in hits) - height, 0, True)
+        elif hits:
+            result = (min(platform.rect.bottom for platform in hits), 0, False)
+    if result is None:
+        result = (entity.y, vel_y, False)
+    entity.y, entity.vel_y = y0, vel_y
+    return result
+
+def swept(entity, terrain):
+    """(y, vel_y, landed) from the game's collision; leaves entity where it started"""
+    y, vel_y = entity.y, entity.vel_y
+    landed = rpg.move_vertically(entity, terrain)
+    result = (entity.y, entity.vel_y, landed)
+    entity.y, entity.vel_y = y, vel_y
+    return result
+
+def run_check(args):
+    """Entry point for the `check-collision` subcommand"""
+    rng = random.Random(args.seed)
+    terrains = build_terrains(rng, args.extra)
+    movers = [rpg.Player(0, 0), rpg.Robot(0, 0), rpg.Boss(0, 0, 1)]
+    failures, single_step = [], 0
+    outcomes = {"landed": 0, "bumped": 0, "passed": 0}
+    for case in range(args.cases):
+        entity, terrain = rng.choice(movers), rng.choice(terrains)
+        random_move(rng, entity, terrain, args.max_speed)
+        start = (type(entity).__name__, entity.x, entity.y, entity.vel_y)
+        expected = reference(entity, terrain, args.step)
+        actual = swept(entity, terrain)
+        if actual != expected:
+            failures.append((case, start, expected, actual))
+        if reference(entity, terrain, math.inf) != expected:
+            single_step += 1
+        y, vel_y, landed = expected
+        outcomes["landed" if landed else "bumped" if vel_y != entity.vel_y else "passed"] += 1
+
+    print(f"Checked {args.cases} moves on {len(terrains)} terrains "
+          f"(speeds up to {args.max_speed:g} px/frame, reference substeps of {args.step:g} px)")
+    print("  " + ", ".join(f"{outcome} {count}" for outcome, count in outcomes.items()))
+    print(f"  single-step check differs from the reference on {single_step} moves")
+    for case, (name, x, y, vel_y), expected, actual in failures[:10]:
+        print(f"Case {case}: {name} at ({x:.2f}, {y:.2f}) moving {vel_y:+.2f}: "
+              f"reference {expected}, swept {actual}", file=sys.stderr)
+    print("\nSwept collision: " + (f"FAILED ({len(failures)} moves)" if failures else "ok"))
+    return 1 if failures else 0
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser(
+        "check-collision", help="check swept collision against a substep reference",
+        description="Compare the swept platform collision with a fine-substep reference "
+                    "over random moves at any speed; exits with code 1 on a mismatch.")
+    parser.add_argument("--cases", type=int, default=20000,
+                        help="random moves to check (default: 20000)")
+    parser.add_argument("--max-speed", type=float, default=1000,
+                        help="largest vertical speed in px/frame (default: 1000)")
+    parser.add_argument("--step", type=float, default=1.0,
+                        help="reference substep in pixels (default: 1.0)")
+    parser.add_argument("--extra", type=int, default=30,
+                        help="random platforms added to each level's terrain (default: 30)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed for the moves and extra platforms (default: 0)")
+    parser.set_defaults(handler=run_check)
+    return parser
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Dirty-rectangle renderer for Retro Platform Fighter - Diamond Quest
+DirtyCanvas keeps the previous frame on the display surface instead of
+redrawing it. Platforms are painted into a background layer at an integer
+camera position; when the camera moves the layer is shifted with
+Surface.scroll and only the newly exposed strip is painted. Each frame then
+restores the background under last frame's actors, redraws the actors and the
+HUD fields that changed, and presents only those areas with
+pygame.display.update(rects). Frames where the camera moved still copy the
+whole background to the display, but skip repainting the scenery.
+
+Usage:
+    retro-platform --renderer surface-dirty
+    retro-platform bench --renderer surface-dirty
+"""
+
+import pygame
+
+import retro_platform_game as rpg
+
+SCREEN = pygame.Rect(0, 0, rpg.SCREEN_WIDTH, rpg.SCREEN_HEIGHT)
+
+class DirtyCanvas(rpg.Canvas):
+    """Canvas (scale 1 only) that redraws only what changed since the last frame.
+    Game.draw hands it the whole game (draw_game), which is drawn in layers:
+    the scrolled background, the actors (Game.draw_actors), whose drawn areas
+    are recorded and restored next frame, and the HUD (Game.draw_hud), whose
+    text is recorded first and only redrawn where it changed or where an actor
+    may touch it."""
+    retained = True
+    HUD_MARGIN = 16  # Actors move less than this per frame (see _draw_changes)
+
+    def __init__(self, surface, display=False):
+        super().__init__(surface)
+        self.display = display  # present() updates the pygame display window
+        self.background = pygame.Surface(surface.get_size())
+        self._world = rpg.Canvas(self.background)
+        self.camera = None      # Camera the background was painted at; None = repaint
+        self._level = None      # (platform list, its length, level, quality) of the background
+        self.drawn = []         # Areas changed by actors (and by callers) this frame
+        self.previous = []      # ... and last frame
+        self.restored = []      # Areas restored from the background or redrawn HUD
+        self.full = True        # Present the whole frame
+        self.hud = []           # Last frame's HUD calls: ((method, args), rect)
+        self._message = None    # (game state, score) of the message screen on display
+        self._hud_calls = None  # HUD calls of the frame being recorded
+
+    # Primitives record the area they changed
+    def rect(self, color, rect, width=0):
+        self.drawn.append(pygame.draw.rect(self.surface, color, rect, width))
+
+    def circle(self, color, center, radius, width=0):
+        self.drawn.append(pygame.draw.circle(self.surface, color, center, radius, width))
+
+    def line(self, color, start, end, width=1):
+        self.drawn.append(pygame.draw.line(self.surface, color, start, end, width))
+
+    def polygon(self, color, points, width=0):
+        self.drawn.append(pygame.draw.polygon(self.surface, color, points, width))
+
+    def ellipse(self, color, rect, width=0):
+        self.drawn.append(pygame.draw.ellipse(self.surface, color, rect, width))
+
+    def arc(self, color, rect, start_angle, stop_angle, width=1):
+        self.drawn.append(pygame.draw.arc(self.surface, color, rect, start_angle, stop_angle, width))
+
+    def text(self, text, size, color, pos, anchor="topleft"):
+        if self._hud_calls is not None:
+            surface = self._text_surface(text, size, color)
+            rect = surface.get_rect(**{anchor: pos})
+            self._hud_calls.append((("text", (text, size, color, pos, anchor)), rect))
+            return rect
+        rect = super().text(text, size, color, pos, anchor)
+        self.drawn.append(rect)
+        return rect
+
+    def sprite(self, key, size, paint, pos, alpha=None):
+        self.drawn.append(super().sprite(key, size, paint, pos, alpha))
+
+    def overlay(self, color, alpha):
+        if self._hud_calls is not None:
+            self._hud_calls.append((("overlay", (color, alpha)), SCREEN))
+        else:
+            super().overlay(color, alpha)
+
+    # Frame composition
+    def draw_game(self, game):
+        """Draw game's current frame, touching only what changed"""
+        self.drawn.clear()
+        self.restored.clear()
+        if game.game_state not in game.LEVEL_STATES:
+            # Full-screen messages are drawn once; the level is repainted afterwards
+            message = (game.game_state, game.score)
+            self.full = message != self._message
+            if self.full:
+                self.surface.fill(rpg.BLUE)
+                game.draw_message(self)
+                self.drawn.clear()
+                self._message = message
+                self.camera = None
+                self.hud = []
+            return
+        self._message = None
+
+        camera = round(game.camera_x)  # Whole pixels, so scrolled scenery stays exact
+        self.full = self._update_background(game, camera)
+        self._hud_calls = calls = []
+        try:
+            game.draw_hud(self)
+        finally:
+            self._hud_calls = None
+        if self.full or not self._draw_changes(game, camera, calls):
+            self._draw_all(game, camera, calls)
+        self.hud = calls
+
+    def _update_background(self, game, camera):
+        """Bring the background to camera; returns True when it changed"""
+        background = self.background
+        level = (game.platforms, len(game.platforms), game.current_level, rpg.quality.level)
+        if self.camera is None or level != self._level or abs(camera - self.camera) >= SCREEN.width:
+            background.fill(rpg.BLUE)
+            game.draw_world(self._world, camera)
+        elif camera != self.camera:
+            shift = camera - self.camera
+            background.scroll(-shift, 0)
+            if shift > 0:
+                strip = pygame.Rect(SCREEN.width - shift, 0, shift, SCREEN.height)
+            else:
+                strip = pygame.Rect(0, 0, -shift, SCREEN.height)
+            background.set_clip(strip)
+            background.fill(rpg.BLUE)
+            game.draw_world(self._world, camera, strip.left, strip.right)
+            background.set_clip(None)
+        else:
+            return False
+        self.camera = camera
+        self._level = level
+        return True
+
+    def _draw_all(self, game, camera, calls):
+        self.drawn.clear()
+        self.surface.blit(self.background, (0, 0))
+        game.draw_actors(self, camera)
+        self._replay(calls)
+        self.full = True
+
+    def _draw_changes(self, game, camera, calls):
+        """Restore last frame's actors and changed HUD fields, then redraw them.
+        Returns False (nothing presentable drawn) if an actor overlapped HUD text
+        that was left in place, so the caller redraws the whole frame."""
+        restored = self.restored
+        restored.extend(self.previous)
+        near = [rect.inflate(2 * self.HUD_MARGIN, 2 * self.HUD_MARGIN) for rect in self.previous]
+        old = self.hud
+        kept, redraw = [], []
+        for i, (call, rect) in enumerate(calls):
+            if i < len(old) and old[i] == (call, rect) and rect.collidelist(near) < 0:
+                kept.append((call, rect))
+            else:
+                redraw.append((call, rect))
+                restored.append(rect)
+                if i < len(old):
+                    restored.append(old[i][1])
+        restored.extend(rect for _, rect in old[len(calls):])
+        # Text left in place must not overlap an area being restored
+        moved = True
+        while moved:
+            moved = False
+            for entry in kept:
+                if entry[1].collidelist(restored) >= 0:
+                    kept.remove(entry)
+                    redraw.append(entry)
+                    restored.append(entry[1])
+                    moved = True
+                    break
+
+        surface, background = self.surface, self.background
+        for rect in restored:
+            surface.blit(background, rect, rect)
+        game.draw_actors(self, camera)
+        kept_rects = [rect for _, rect in kept]
+        for rect in self.drawn:
+            if rect.collidelist(kept_rects) >= 0:
+                return False
+        # HUD order matters where fields overlap, so redraw in recorded order
+        self._replay([entry for entry in calls if entry in redraw])
+        return True
+
+    def _replay(self, calls):
+        """Draw recorded HUD calls without recording them as actors"""
+        drawn = self.drawn
+        self.drawn = []
+        for (method, args), _ in calls:
+            getattr(self, method)(*args)
+        self.drawn = drawn
+
+    def invalidate(self):
+        """The display lost its contents: draw and present the next frame in full"""
+        self.camera = None
+        self._message = None
+    
+    def present(self):
+        """Show the frame: the whole display, or only the areas changed this frame"""
+        if self.display:
+            if self.full:
+                pygame.display.flip()
+            else:
+                pygame.display.update(self.restored + self.drawn)
+        self.previous, self.drawn = self.drawn, self.previous
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Metrics export for Retro Platform Fighter - Diamond Quest
+Publishes the engine's hot-path counters (rpg.metrics) from a running game,
+so kiosks can be monitored without attaching a profiler:
+- collision pair tests
+- draw calls and blits
+- entities updated and culled
+- sounds triggered and dropped
+- text renders
+- level builds and their time
+- a frame time histogram
+They are served in the Prometheus text format over HTTP on the loopback
+interface, appended to a JSON lines file every interval, or both. The server
+and the writer run on their own threads. They only read the snapshot the frame
+loop publishes after each frame, so the frame thread never waits for them.
+
+Usage:
+    retro-platform --metrics-port 9108       # curl -s localhost:9108/metrics
+    retro-platform --metrics-file metrics.jsonl --metrics-interval 30
+"""
+
+import http.server
+import json
+import sys
+import threading
+
+import retro_platform_game as rpg
+
+PREFIX = "retro_platform_"
+
+# Counter name -> help text, in rpg.Metrics.COUNTERS order
+COUNTER_HELP = {
+    "collision_tests": "Collision pair tests: swept platforms, pickups and enemies against the "
+                       "player, attack targets",
+    "draw_calls": "Canvas drawing primitives (fill, rect, circle, line, polygon, ellipse, arc)",
+    "blits": "Canvas text and sprite blits",
+    "entities_updated": "Entity updates (player, pickups, robots, boss)",
+    "entities_culled": "Pickups and robots skipped by the draw pass as off screen",
+    "sounds_triggered": "Game events with a sound",
+    "sounds_dropped": "Event sounds not played: repeats within a frame, busy mixer, sound off",
+    "text_renders": "Text rendered with a font (text cache misses)",
+    "level_builds": "Levels built",
+}
+
+def bucket_labels():
+    return [f"{bound:g}" for bound in rpg.Metrics.FRAME_BUCKETS] + ["+Inf"]
+
+def format_prometheus(snapshot):
+    """Prometheus text exposition (version 0.0.4) of a metrics snapshot"""
+    if snapshot is None:
+        return "# No frames presented yet\n"
+    lines = []
+
+    def metric(name, kind, help_text, value):
+        lines.append(f"# HELP {PREFIX}{name} {help_text}")
+        lines.append(f"# TYPE {PREFIX}{name} {kind}")
+        lines.append(f"{PREFIX}{name} {value}")
+
+    for name, help_text in COUNTER_HELP.items():
+        metric(f"{name}_total", "counter", help_text, snapshot["totals"][name])
+    for name, value in snapshot["last_frame"].items():
+        metric(f"frame_{name}", "gauge", f"{COUNTER_HELP[name]}, in the last frame", value)
+    metric("particles", "gauge", "Live visual effect particles", snapshot["particles"])
+    metric("level_build_seconds_total", "counter", "Time spent building levels",
+           snapshot["level_build_seconds"])
+    metric("last_level_build_seconds", "gauge", "Time the last level took to build",
+           snapshot["last_level_build_seconds"])
+
+    name = PREFIX + "frame_seconds"
+    lines.append(f"# HELP {name} Work time of presented frames, excluding the wait for the next")
+    lines.append(f"# TYPE {name} histogram")
+    cumulative = 0
+    for label, count in zip(bucket_labels(), snapshot["frame_buckets"]):
+        cumulative += count
+        lines.append(f'{name}_bucket{{le="{label}"}} {cumulative}')
+    lines.append(f"{name}_sum {snapshot['frame_seconds']}")
+    lines.append(f"{name}_count {snapshot['frames']}")
+    return "\n".join(lines) + "\n"
+
+def json_record(snapshot):
+    """One JSON line for a snapshot, with the histogram buckets by upper bound"""
+    record = dict(snapshot)
+    record["frame_buckets"] = dict(zip(bucket_labels(), snapshot["frame_buckets"]))
+    return json.dumps(record)
+
+class MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = format_prometheus(rpg.metrics.snapshot).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # A scrape every few seconds would flood stderr
+
+class MetricsExporter:
+    """Enables rpg.metrics and exports its snapshots: an HTTP endpoint on
+    host:port (loopback only by default) and/or a JSON line appended to path
+    every interval seconds. Raises OSError if the port or file can't be opened."""
+    def __init__(self, port=None, path=None, interval=10.0, host="127.0.0.1"):
+        self.interval = interval
+        self._server = None
+        self._file = None
+        self._stop = threading.Event()
+        self._threads = []
+        if port is not None:
+            self._server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+            self._server.daemon_threads = True
+            self._threads.append(threading.Thread(target=self._server.serve_forever,
+                                                  name="metrics-http", daemon=True))
+        if path is not None:
+            try:
+                self._file = open(path, "a", encoding="utf-8")
+            except OSError:
+                if self._server is not None:
+                    self._server.server_close()
+                raise
+            self._threads.append(threading.Thread(target=self._write_lines,
+                                                  name="metrics-writer", daemon=True))
+        rpg.metrics.enabled = True
+        for thread in self._threads:
+            thread.start()
+
+    def close(self):
+        """Stop serving, write a last line and stop the writer thread"""
+        rpg.metrics.enabled = False
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+        if self._file is not None:
+            self._write_line()
+            self._file.close()
+
+    def _write_lines(self):
+        while not self._stop.wait(self.interval):
+            self._write_line()
+
+    def _write_line(self):
+        snapshot = rpg.metrics.snapshot  # One read; snapshots are never modified
+        if snapshot is None:
+            return
+        try:
+            self._file.write(json_record(snapshot) + "\n")
+            self._file.flush()
+        except OSError as e:
+            print(f"Warning: Could not write metrics: {e}", file=sys.stderr)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Offline replay renderer for Retro Platform Fighter - Diamond Quest
+Simulates a recorded replay headlessly once to collect save-state keyframes,
+then renders frame ranges in parallel: each worker restores the keyframe at the
+start of its range and renders it to numbered PNGs (or raw RGB for piping).
+The output is identical to rendering the replay sequentially.
+
+Usage:
+    retro-platform render run.json --output frames/
+    retro-platform render run.json --format rgb | \\
+        ffmpeg -f rawvideo -pix_fmt rgb24 -s 1024x768 -r 60 -i - run.mp4
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+
+import retro_platform_game as rpg
+import savestate
+
+class _Offset:
+    """Replay view whose frame 0 is frame `start` of the underlying replay"""
+    def __init__(self, replay, start):
+        self.replay = replay
+        self.start = start
+
+    def inputs(self, frame):
+        return self.replay.inputs(self.start + frame)
+
+def collect_keyframes(replay, frames, interval):
+    """Simulate the replay without drawing; return the state at every range start"""
+    game = rpg.Game(replay.level, replay.seed)
+    keyframes = []
+    rpg.events.attach(game.on_events)  # The HUD damage flash is part of the saved state
+    try:
+        for start in range(0, frames, interval):
+            keyframes.append((start, min(frames, start + interval), savestate.snapshot(game)))
+            rpg.run_headless(game, min(interval, frames - start), _Offset(replay, start))
+    finally:
+        rpg.events.detach(game.on_events)
+    return keyframes
+
+def render_range(replay, start, stop, state, output, fmt):
+    """Restore state and render frames [start, stop); returns raw RGB frames for rgb"""
+    game = rpg.Game(replay.level, replay.seed)
+    savestate.restore(game, state)
+    canvas = rpg.Canvas()
+    frames = []
+    rpg.events.attach(game.on_events)  # Draws the damage flash like the game window
+    try:
+        for frame in range(start, stop):
+            keys, keydowns = replay.inputs(frame)
+            for key in keydowns:
+                game.handle_key(key)
+            game.update(keys)
+            rpg.events.dispatch()
+            game.draw(canvas)
+            if fmt == "png":
+                pygame.image.save(canvas.surface, os.path.join(output, f"frame_{frame:06d}.png"))
+            else:
+                frames.append(pygame.image.tostring(canvas.surface, "RGB"))
+    finally:
+        rpg.events.detach(game.on_events)
+    return frames
+
+_worker_replay = None
+
+def _init_worker(replay):
+    global _worker_replay
+    _worker_replay = replay
+
+def _render_task(task):
+    start, stop, state, output, fmt = task
+    return render_range(_worker_replay, start, stop, state, output, fmt)
+
+def render_replay(replay, frames, output, fmt="png", workers=None, interval=120, emit=None):
+    """Render the replay's frames with a process pool; emit(rgb_bytes) is called in order"""
+    keyframes = collect_keyframes(replay, frames, interval)
+    tasks = [(start, stop, state, output, fmt) for start, stop, state in keyframes]
+
+    if workers == 1:
+        results = (render_range(replay, *task) for task in tasks)
+        for chunk in results:
+            for rgb in chunk:
+                emit(rgb)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(replay,)) as pool:
+        # Bound in-flight ranges so raw RGB output does not pile up in memory
+        limit = 2 * (workers or os.cpu_count() or 1)
+        pending = []
+        for task in tasks:
+            pending.append(pool.submit(_render_task, task))
+            if len(pending) >= limit:
+                for rgb in pending.pop(0).result():
+                    emit(rgb)
+        for future in pending:
+            for rgb in future.result():
+                emit(rgb)
+
+def run_render(args):
+    """Entry point for the `render` subcommand"""
+    replay = rpg.Replay.load(args.replay)
+    frames = min(args.frames or len(replay.frames), len(replay.frames))
+    if args.format == "png":
+        os.makedirs(args.output, exist_ok=True)
+        emit = None
+    else:
+        # Frames own stdout; anything printed from here on (including by workers)
+        # is sent to stderr instead
+        sys.stdout.flush()
+        out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+        emit = out.write
+
+    start = time.perf_counter()
+    render_replay(replay, frames, args.output, args.format, args.workers,
+                  args.keyframe_interval, emit)
+    elapsed = time.perf_counter() - start
+    if emit is not None:
+        out.close()
+
+    # Progress goes to stderr so stdout stays clean for raw RGB
+    sys.stderr.write(f"Rendered {frames} frames in {elapsed:.2f}s "
+                     f"({frames / max(elapsed, 1e-9):.1f} fps, "
+                     f"{args.workers or os.cpu_count()} workers)\n")
+    return 0
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser(
+        "render", help="render a replay to images",
+        description="Render a recorded replay to numbered PNGs or raw RGB frames "
+                    "using a process pool.")
+    parser.add_argument("replay", help="replay file recorded with --record")
+    parser.add_argument("--output", default="frames",
+                        help="directory for PNG frames (default: frames)")
+    parser.add_argument("--format", choices=("png", "rgb"), default="png",
+                        help="numbered PNGs, or raw 24-bit RGB frames on stdout")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count, 1 = in-process)")
+    parser.add_argument("--keyframe-interval", type=int, default=120,
+                        help="frames per keyframe / work unit (default: 120)")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="render only the first N frames")
+    parser.set_defaults(handler=run_render)
+    return parser
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Profiling tools for Retro Platform Fighter - Diamond Quest
+Runs a level headlessly (a recorded replay or N scripted frames) under cProfile
+or an in-process stack sampler and writes pstats and collapsed-stack files.
+The alloc mode measures steady-state memory allocation per frame with
+tracemalloc and can fail the run when it exceeds a budget.
+
+Usage:
+    retro-platform profile --level 10 --frames 1200
+    retro-platform profile --replay run.json --mode sample
+    retro-platform profile --level 10 --mode alloc --check
+    flamegraph.pl profiles/level10.collapsed > flame.svg
+"""
+
+import cProfile
+import gc
+import inspect
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+import retro_platform_game as rpg
+
+# Functions always called out in the summary, even when they are not in the top N
+HOT_PATHS = ("Player.update", "Robot.update", "Boss.update", "Platform.draw",
+             "CombatSystem.resolve", "EventQueue.push")
+
+# Steady-state allocation budget per frame enforced by `--mode alloc --check`
+# (objects: GC-tracked objects a frame leaves allocated, see AllocationTracker)
+ALLOC_BUDGET = {"blocks": 1.0, "bytes": 256, "objects": 0.5, "peak_kb": 64}
+
+def qualified_names(module=rpg):
+    """Map (filename, first line) of every function in module to Class.method names"""
+    names = {}
+    for obj in vars(module).values():
+        if inspect.isclass(obj) and obj.__module__ == module.__name__:
+            for attr, func in vars(obj).items():
+                if inspect.isfunction(func):
+                    code = func.__code__
+                    names[(code.co_filename, code.co_firstlineno)] = f"{obj.__name__}.{attr}"
+        elif inspect.isfunction(obj) and obj.__module__ == module.__name__:
+            code = obj.__code__
+            names[(code.co_filename, code.co_firstlineno)] = obj.__name__
+    return names
+
+def frame_label(frame, names):
+    """Readable Class.method label for a frame of the sampled stack"""
+    code = frame.f_code
+    label = names.get((code.co_filename, code.co_firstlineno))
+    if label is None:
+        label = getattr(code, "co_qualname", code.co_name)
+    return f"{os.path.basename(code.co_filename)}:{label}"
+
+class StackSampler:
+    """Lightweight in-process sampler that collects collapsed stacks of one thread"""
+    def __init__(self, interval=0.001, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks = Counter()
+        self.samples = 0
+        self.names = qualified_names()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        # The sampler only runs when the profiled thread yields the GIL; a short
+        # switch interval keeps samples close to the requested rate
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval / 2))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            sys.setswitchinterval(self._switch_interval)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame, self.names))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def self_counts(self):
+        """Samples where each function was on top of the stack"""
+        counts = Counter()
+        for stack, count in self.stacks.items():
+            counts[stack.rsplit(";", 1)[-1]] += count
+        return counts
+
+    def write_collapsed(self, path):
+        """Write stacks in the collapsed format read by flamegraph.pl / speedscope"""
+        with open(path, "w", encoding="utf-8") as fh:
+            for stack, count in sorted(self.stacks.items()):
+                fh.write(f"{stack} {count}\n")
+
+def load_run(args):
+    """Build the game and input for a profile run from parsed arguments"""
+    if args.replay:
+        replay = rpg.Replay.load(args.replay)
+        frames = args.frames or len(replay.frames)
+    else:
+        frames = args.frames or 600
+        replay = rpg.Replay.demo(args.level, frames, args.seed)
+    game = rpg.Game(replay.level, replay.seed)
+    screen = None if args.no_render else rpg.offscreen_canvas(args.renderer, args.render_scale)
+    return game, replay, frames, screen
+
+def make_rewind(args):
+    """Rewind buffer recording every frame of the run, when --rewind is given"""
+    if not args.rewind:
+        return None, None
+    import rewind
+    buffer = rewind.RewindBuffer(args.rewind)
+    return buffer, buffer.record
+
+def print_rewind(buffer):
+    if buffer is None:
+        return
+    stats = buffer.stats()
+    print(f"\nRewind: {stats['record_us_per_frame']:.1f} us/frame, "
+          f"{stats['bytes_per_frame'] / 1024:.2f} KB/frame, "
+          f"{stats['bytes'] / 1024:.0f} KB held for {stats['frames']} frames "
+          f"({stats['keyframes']} keyframes)")
+
+def attach_telemetry():
+    """Count game events during the run; returns the counter and a detach callback"""
+    counter = rpg.EventCounter()
+    rpg.events.attach(counter)
+    return counter, lambda: rpg.events.detach(counter)
+
+def print_events(counter):
+    total = sum(counter.counts.values())
+    summary = ", ".join(f"{kind} {count}" for kind, count in counter.counts.most_common())
+    print(f"\nEvents: {total} ({summary or 'none'})")
+
+class GCMonitor:
+    """Times every garbage collection (automatic or GCPolicy's) via gc.callbacks"""
+    def __init__(self):
+        self.pauses = ([], [], [])  # Seconds, per generation
+        self._start = 0.0
+
+    def attach(self):
+        gc.callbacks.append(self._callback)
+
+    def detach(self):
+        gc.callbacks.remove(self._callback)
+
+    def _callback(self, phase, info):
+        if phase == "start":
+            self._start = time.perf_counter()
+        else:
+            self.pauses[info["generation"]].append(time.perf_counter() - self._start)
+
+def print_gc(monitor):
+    pauses = [pause for generation in monitor.pauses for pause in generation]
+    policy = "GCPolicy" if rpg.gc_policy.active else "automatic"
+    if not pauses:
+        print(f"\nGC ({policy}): no collections")
+        return
+    detail = ", ".join(f"gen{gen} {len(times)} (max {max(times) * 1000:.2f} ms)"
+                       for gen, times in enumerate(monitor.pauses) if times)
+    print(f"\nGC ({policy}): {len(pauses)} collections, {sum(pauses) * 1000:.2f} ms total, "
+          f"max pause {max(pauses) * 1000:.2f} ms; {detail}")
+
+def print_stats(stats, names, limit):
+    """Print the top functions by total time plus the tracked hot paths"""
+    rows = []
+    for (filename, lineno, funcname), (cc, nc, tt, ct, callers) in stats.stats.items():
+        label = names.get((filename, lineno), funcname)
+        rows.append((tt, ct, nc, label, filename))
+    rows.sort(reverse=True)
+
+    print(f"\n{'tottime':>9} {'cumtime':>9} {'calls':>9}  function")
+    for tt, ct, nc, label, filename in rows[:limit]:
+        print(f"{tt:9.4f} {ct:9.4f} {nc:9d}  {label} ({os.path.basename(filename)})")
+
+    print("\nHot paths:")
+    for hot in HOT_PATHS:
+        matches = [row for row in rows if row[3] == hot]
+        if matches:
+            tt, ct, nc, label, filename = matches[0]
+            print(f"{tt:9.4f} {ct:9.4f} {nc:9d}  {label}")
+        else:
+            print(f"{'-':>9} {'-':>9} {0:9d}  {hot}")
+
+def profile_cprofile(args, path):
+    game, replay, frames, screen = load_run(args)
+    buffer, on_frame = make_rewind(args)
+    counter, detach = attach_telemetry()
+    monitor = GCMonitor()
+    monitor.attach()
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    rpg.run_headless(game, frames, replay, screen, on_frame)
+    profiler.disable()
+    elapsed = time.perf_counter() - start
+    monitor.detach()
+    detach()
+
+    profiler.dump_stats(path)
+    print(f"cProfile: {frames} frames in {elapsed:.2f}s "
+          f"({elapsed / frames * 1000:.2f} ms/frame) -> {path}")
+    print_stats(pstats.Stats(profiler), qualified_names(), args.top)
+    print_events(counter)
+    print_gc(monitor)
+    print_rewind(buffer)
+
+def profile_sample(args, path):
+    game, replay, frames, screen = load_run(args)
+    buffer, on_frame = make_rewind(args)
+    counter, detach = attach_telemetry()
+    sampler = StackSampler(args.interval / 1000.0)
+    monitor = GCMonitor()
+    monitor.attach()
+    start = time.perf_counter()
+    sampler.start()
+    rpg.run_headless(game, frames, replay, screen, on_frame)
+    sampler.stop()
+    elapsed = time.perf_counter() - start
+    monitor.detach()
+    detach()
+
+    sampler.write_collapsed(path)
+    print(f"Sampler: {frames} frames in {elapsed:.2f}s, {sampler.samples} samples -> {path}")
+    print(f"\n{'samples':>9} {'share':>7}  function (self)")
+    for label, count in sampler.self_counts().most_common(args.top):
+        print(f"{count:9d} {count / max(1, sampler.samples):7.1%}  {label}")
+    print_events(counter)
+    print_gc(monitor)
+    print_rewind(buffer)
+
+class AllocationTracker:
+    """on_frame hook measuring steady-state allocations with tracemalloc. The
+    first `warmup` frames fill the text, sprite and particle caches; then the
+    traced heap is snapshotted, and every frame's transient high-water mark
+    above its starting size is recorded. finish() snapshots again, so the
+    difference is what the measured frames retained, by call site.
+    
+    Each frame's count of GC-tracked objects (containers and instances) is
+    taken from gc.get_count()[0]: allocations minus deallocations since the
+    last collection. Collections reset that count, so its value at each
+    collection's start is carried over. CPython keeps no gross allocation
+    count, so objects made and freed within one frame are not counted; the
+    transient peak bounds those by size."""
+    def __init__(self, warmup):
+        self.warmup = warmup
+        self.frame = 0
+        self.start = None
+        self.end = None
+        self.peaks = []
+        self.objects = []  # GC-tracked objects each frame left allocated
+        self.gc = GCMonitor()
+        self._mark = 0
+        self._count = 0
+        self._carry = 0
+        # Allocations made by tracemalloc's own snapshots and by this hook
+        self.filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+                        tracemalloc.Filter(False, __file__)]
+
+    def __call__(self, game):
+        self.frame += 1
+        if self.frame < self.warmup:
+            return
+        count = gc.get_count()[0]
+        if self.start is None:
+            self.start = tracemalloc.take_snapshot()
+            self.gc.attach()
+            gc.callbacks.append(self._collected)
+        else:
+            self.objects.append(count - self._count + self._carry)
+            self.peaks.append(tracemalloc.get_traced_memory()[1] - self._mark)
+        self._carry = 0
+        tracemalloc.reset_peak()
+        self._mark = tracemalloc.get_traced_memory()[0]
+        self._count = gc.get_count()[0]  # Last, so this hook's own objects are left out
+
+    def _collected(self, phase, info):
+        if phase == "start":
+            self._carry += gc.get_count()[0]
+
+    def finish(self):
+        self.end = tracemalloc.take_snapshot()
+        self.gc.detach()
+        gc.callbacks.remove(self._collected)
+        # Filtering compiles patterns, so it waits until both snapshots are taken
+        self.start = self.start.filter_traces(self.filters)
+        self.end = self.end.filter_traces(self.filters)
+
+    def call_sites(self, limit):
+        """Largest retained allocations between the snapshots, grouped by source line"""
+        return self.end.compare_to(self.start, "lineno")[:limit]
+
+    def per_frame(self):
+        """Retained blocks and bytes per measured frame, the mean/max transient
+        peak, and the mean/max GC-tracked objects allocated"""
+        frames = max(1, len(self.peaks))
+        diffs = self.end.compare_to(self.start, "filename")
+        blocks = sum(diff.count_diff for diff in diffs) / frames
+        size = sum(diff.size_diff for diff in diffs) / frames
+        mean_peak = sum(self.peaks) / frames
+        mean_objects = sum(self.objects) / frames
+        return (blocks, size, mean_peak, max(self.peaks, default=0),
+                mean_objects, max(self.objects, default=0))
+
+def profile_alloc(args):
+    game, replay, frames, screen = load_run(args)
+    warmup = min(args.warmup, frames // 2)
+    tracker = AllocationTracker(warmup)
+    tracemalloc.start()
+    rpg.run_headless(game, frames, replay, screen, tracker)
+    tracker.finish()
+    tracemalloc.stop()
+
+    blocks, size, mean_peak, max_peak, mean_objects, max_objects = tracker.per_frame()
+    measured = len(tracker.peaks)
+    print(f"Allocations: {measured} frames measured after {warmup} warm-up frames")
+    print(f"  retained: {blocks:+.2f} blocks, {size:+.0f} B per frame")
+    print(f"  transient: {mean_peak / 1024:.1f} KB mean, {max_peak / 1024:.1f} KB max peak per frame")
+    print(f"  GC-tracked objects allocated (net): {mean_objects:+.2f} mean, {max_objects:+d} max per frame")
+    print(f"\n{'size':>10} {'blocks':>8}  call site (retained over the run)")
+    for diff in tracker.call_sites(args.top):
+        if not diff.size_diff and not diff.count_diff:
+            break
+        frame = diff.traceback[0]
+        print(f"{diff.size_diff:+10d} {diff.count_diff:+8d}  "
+              f"{os.path.basename(frame.filename)}:{frame.lineno}")
+    print_gc(tracker.gc)
+
+    if not args.check:
+        return 0
+    failures = []
+    if blocks > ALLOC_BUDGET["blocks"]:
+        failures.append(f"{blocks:.2f} retained blocks per frame > {ALLOC_BUDGET['blocks']}")
+    if size > ALLOC_BUDGET["bytes"]:
+        failures.append(f"{size:.0f} retained bytes per frame > {ALLOC_BUDGET['bytes']}")
+    if mean_objects > ALLOC_BUDGET["objects"]:
+        failures.append(f"{mean_objects:.2f} GC-tracked objects per frame > {ALLOC_BUDGET['objects']}")
+    if max_peak / 1024 > ALLOC_BUDGET["peak_kb"]:
+        failures.append(f"{max_peak / 1024:.1f} KB transient peak > {ALLOC_BUDGET['peak_kb']} KB")
+    for failure in failures:
+        print(f"Over budget: {failure}", file=sys.stderr)
+    print("\nAllocation budget: " + ("FAILED" if failures else "ok"))
+    return 1 if failures else 0
+
+def run_profile(args):
+    """Entry point for the `profile` subcommand"""
+    os.makedirs(args.output, exist_ok=True)
+    if args.replay:
+        name = os.path.splitext(os.path.basename(args.replay))[0]
+    else:
+        name = f"level{args.level}"
+
+    rpg.quality.set(args.quality)
+    if args.gc_policy:
+        rpg.gc_policy.start()
+    if args.mode == "alloc":
+        return profile_alloc(args)
+    # Each mode runs the same seeded scenario so both profiles describe one run
+    if args.mode in ("cprofile", "both"):
+        profile_cprofile(args, os.path.join(args.output, f"{name}.pstats"))
+    if args.mode in ("sample", "both"):
+        profile_sample(args, os.path.join(args.output, f"{name}.collapsed"))
+    return 0
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser(
+        "profile", help="profile a headless run",
+        description="Run a level headlessly under cProfile and/or a stack sampler.")
+    rpg.add_run_arguments(parser, seed=0)
+    parser.add_argument("--replay", metavar="PATH",
+                        help="replay file to run instead of the scripted demo input")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="frames to simulate (default: 600, or the replay length)")
+    parser.add_argument("--mode", choices=("cprofile", "sample", "both", "alloc"), default="both",
+                        help="profiler to use (default: both, as two identical runs); "
+                             "alloc reports per-frame allocations with tracemalloc")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="sampler interval in milliseconds (default: 1.0)")
+    parser.add_argument("--warmup", type=int, default=120,
+                        help="alloc mode: frames to run before measuring (default: 120)")
+    parser.add_argument("--check", action="store_true",
+                        help="alloc mode: exit with code 1 when a frame exceeds ALLOC_BUDGET")
+    parser.add_argument("--gc-policy", action="store_true",
+                        help="run with the game's GC policy (collections in idle frame time) "
+                             "instead of automatic collection")
+    parser.add_argument("--rewind", type=float, default=0, metavar="SECONDS",
+                        help="record a rewind buffer of this length and report its cost")
+    rpg.add_render_arguments(parser)
+    parser.add_argument("--no-render", action="store_true",
+                        help="profile update only, skip drawing")
+    parser.add_argument("--output", default="profiles",
+                        help="directory for .pstats/.collapsed output (default: profiles)")
+    parser.add_argument("--top", type=int, default=20,
+                        help="functions to list in the summary (default: 20)")
+    parser.set_defaults(handler=run_profile)
+    return parser
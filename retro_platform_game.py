@@ -1,17 +1,38 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Keep stdout clean for piped output
+
 import pygame
 import sys
 import random
 import math
-import os
+import json
+import time
+import argparse
+import asyncio
+import bisect
+import gc
+import mmap
+import operator
+import struct
+from collections import Counter, deque
 
-# Initialize Pygame
+# Sample format of the mixer; `retro-platform pack` converts sounds to it ahead of time
+MIXER_FORMAT = (22050, -16, 2)  # frequency, size (signed 16-bit), channels
+
+# Initialize Pygame - pygame.init() opens the mixer, so its format must be set first
+pygame.mixer.pre_init(*MIXER_FORMAT, buffer=512)
 pygame.init()
-pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+try:
+    pygame.mixer.init()
+except pygame.error as e:
+    # No audio device (headless machines) - SoundManager falls back to silence
+    print(f"Warning: Could not initialize audio: {e}", file=sys.stderr)
 
 # Constants
 SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 768
 FPS = 60
+IDLE_FPS = 4  # Frame rate while the window is unfocused or minimized
 WORLD_WIDTH = 3000  # Much bigger world
 
 # Colors
@@ -35,6 +56,58 @@ GRAVITY = 1.2  # Increased from 1.0 - faster falling, harder to control
 PUNCH_RANGE = 30  # Reduced from 35 - shorter attack range
 KICK_RANGE = 40  # Reduced from 45 - shorter attack range
 
+# Assets live next to this module, so the game runs from any working directory
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+SOUND_DIR = os.path.join(ASSET_DIR, "sounds")
+ASSET_PACK = os.path.join(ASSET_DIR, "assets.pack")
+SOUND_NAMES = ("jump", "punch", "kick", "diamond_collect", "diamond_lost", "robot_hit",
+               "boss_hit", "superdiamond_collect", "speed_boost", "jump_boost", "invincible",
+               "life_lost", "level_complete")
+
+class AssetPack:
+    """Read-only asset pack built by `retro-platform pack`: one memory-mapped
+    file holding an index plus raw sound samples (already in MIXER_FORMAT) and
+    raw RGBA images. Assets are created from views into the mapping, so no
+    file is read or copied into Python bytes."""
+    MAGIC = b"RPAK"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHI")         # magic, version, entry count
+    ENTRY = struct.Struct("<32sB3xIIII")    # name, kind, offset, length, a, b
+    SOUND = 0  # a, b = frequency, channels (signed 16-bit samples)
+    IMAGE = 1  # a, b = width, height (RGBA pixels)
+    ALIGN = 16
+    
+    def __init__(self, path):
+        with open(path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, version, count = self.HEADER.unpack_from(self._map)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"{path} is not a version {self.VERSION} asset pack")
+        self.entries = {}  # name -> (kind, offset, length, a, b)
+        for i in range(count):
+            name, *entry = self.ENTRY.unpack_from(self._map, self.HEADER.size + i * self.ENTRY.size)
+            self.entries[name.rstrip(b"\0").decode()] = tuple(entry)
+    
+    def data(self, name):
+        """Zero-copy view of an asset's bytes"""
+        kind, offset, length, a, b = self.entries[name]
+        return self._view[offset:offset + length]
+    
+    def sound(self, name):
+        """Sound from the packed samples; the mixer keeps its own copy of the view"""
+        kind, offset, length, frequency, channels = self.entries[name]
+        if kind != self.SOUND or (frequency, -16, channels) != pygame.mixer.get_init():
+            raise ValueError(f"{name} is not a sound in the mixer's format")
+        return pygame.mixer.Sound(buffer=self._view[offset:offset + length])
+    
+    def image(self, name):
+        """Surface sharing the packed pixels (read-only: blit it, don't draw on it)"""
+        kind, offset, length, width, height = self.entries[name]
+        if kind != self.IMAGE:
+            raise ValueError(f"{name} is not an image")
+        return pygame.image.frombuffer(self._view[offset:offset + length], (width, height), "RGBA")
+
 # Sound and Music Manager
 class SoundManager:
     def __init__(self):
@@ -42,12 +115,9 @@ class SoundManager:
         self.music_playing = False
         self.sound_enabled = True
         self.music_enabled = True
+        self.pack = None  # AssetPack the sounds were created from, kept mapped
         
-        # Create sound directory if it doesn't exist
-        if not os.path.exists('sounds'):
-            os.makedirs('sounds')
-            
-        # Try to load sound files first, then generate if needed
+        # Try the asset pack, then sound files, then generate what is missing
         self.load_or_generate_sounds()
         
     def create_simple_sound(self, frequency, duration, sample_rate=22050, volume=0.3):
@@ -66,7 +136,7 @@ class SoundManager:
             arr.append(sample)  # Left channel
             arr.append(sample)  # Right channel
         
-        return pygame.sndarray.make_sound(arr)
+        return pygame.mixer.Sound(buffer=arr)  # Interleaved 16-bit stereo samples, matching the mixer
     
     def create_sweep_sound(self, start_freq, end_freq, duration, sample_rate=22050, volume=0.3):
         """Create a frequency sweep sound without numpy"""
@@ -86,7 +156,7 @@ class SoundManager:
             arr.append(sample)
             arr.append(sample)
         
-        return pygame.sndarray.make_sound(arr)
+        return pygame.mixer.Sound(buffer=arr)  # Interleaved 16-bit stereo samples, matching the mixer
     
     def create_noise_sound(self, duration, sample_rate=22050, volume=0.2):
         """Create a noise sound for metallic effects"""
@@ -104,7 +174,7 @@ class SoundManager:
             arr.append(sample)
             arr.append(sample)
         
-        return pygame.sndarray.make_sound(arr)
+        return pygame.mixer.Sound(buffer=arr)  # Interleaved 16-bit stereo samples, matching the mixer
     
     def create_chord_sound(self, frequencies, duration, sample_rate=22050, volume=0.2):
         """Create a chord sound with multiple frequencies"""
@@ -124,27 +194,31 @@ class SoundManager:
             arr.append(sample)
             arr.append(sample)
         
-        return pygame.sndarray.make_sound(arr)
+        return pygame.mixer.Sound(buffer=arr)  # Interleaved 16-bit stereo samples, matching the mixer
         
+    def load_pack(self, path):
+        """Create all sounds from an asset pack; returns False if it cannot be used"""
+        if not os.path.exists(path) or pygame.mixer.get_init() is None:
+            return False
+        try:
+            pack = AssetPack(path)
+            sounds = {name: pack.sound(name) for name in SOUND_NAMES}
+        except (OSError, KeyError, ValueError, pygame.error) as e:
+            print(f"Ignoring asset pack {path}: {e}", file=sys.stderr)
+            return False
+        self.pack = pack
+        self.sounds.update(sounds)
+        print(f"Loaded {len(sounds)} sounds from {os.path.basename(path)}", file=sys.stderr)
+        return True
+    
     def load_or_generate_sounds(self):
-        """Load sound files or generate them if they don't exist"""
+        """Load sounds from the asset pack or sound files, or generate them if they don't exist"""
         try:
+            if self.load_pack(ASSET_PACK):
+                return
+            
             # Try to load existing sound files
-            sound_files = {
-                'jump': 'sounds/jump.wav',
-                'punch': 'sounds/punch.wav',
-                'kick': 'sounds/kick.wav',
-                'diamond_collect': 'sounds/diamond_collect.wav',
-                'diamond_lost': 'sounds/diamond_lost.wav',
-                'robot_hit': 'sounds/robot_hit.wav',
-                'boss_hit': 'sounds/boss_hit.wav',
-                'superdiamond_collect': 'sounds/superdiamond_collect.wav',
-                'speed_boost': 'sounds/speed_boost.wav',
-                'jump_boost': 'sounds/jump_boost.wav',
-                'invincible': 'sounds/invincible.wav',
-                'life_lost': 'sounds/life_lost.wav',
-                'level_complete': 'sounds/level_complete.wav'
-            }
+            sound_files = {name: os.path.join(SOUND_DIR, f"{name}.wav") for name in SOUND_NAMES}
             
             # Check if any sound files exist
             files_exist = any(os.path.exists(file) for file in sound_files.values())
@@ -155,18 +229,18 @@ class SoundManager:
                     if os.path.exists(file_path):
                         try:
                             self.sounds[name] = pygame.mixer.Sound(file_path)
-                            print(f"Loaded {name} from file")
+                            print(f"Loaded {name} from file", file=sys.stderr)
                         except:
-                            print(f"Failed to load {name}, will generate instead")
+                            print(f"Failed to load {name}, will generate instead", file=sys.stderr)
             
             # Generate missing sounds
             if not files_exist or len(self.sounds) < len(sound_files):
-                print("Generating sounds...")
+                print("Generating sounds...", file=sys.stderr)
                 self.generate_sounds()
                 
         except Exception as e:
-            print(f"Error with sound system: {e}")
-            print("Generating basic sounds...")
+            print(f"Error with sound system: {e}", file=sys.stderr)
+            print("Generating basic sounds...", file=sys.stderr)
             self.generate_sounds()
         
     def generate_sounds(self):
@@ -187,21 +261,24 @@ class SoundManager:
             self.sounds['life_lost'] = self.create_sweep_sound(400, 100, 1.0)
             self.sounds['level_complete'] = self.create_chord_sound([400, 500, 600, 800], 1.5)
             
-            print("Generated all sounds successfully!")
+            print("Generated all sounds successfully!", file=sys.stderr)
             
         except Exception as e:
-            print(f"Warning: Could not generate sounds: {e}")
+            print(f"Warning: Could not generate sounds: {e}", file=sys.stderr)
             self.sound_enabled = False
     
     def play_sound(self, sound_name):
         """Play a sound effect"""
         if self.sound_enabled and sound_name in self.sounds:
             try:
-                self.sounds[sound_name].play()
+                if self.sounds[sound_name].play() is None:
+                    metrics.sounds_dropped += 1  # Every mixer channel is busy
             except Exception as e:
-                print(f"Warning: Could not play sound {sound_name}: {e}")
+                metrics.sounds_dropped += 1
+                print(f"Warning: Could not play sound {sound_name}: {e}", file=sys.stderr)
         else:
-            print(f"Sound {sound_name} not found or sound disabled")
+            metrics.sounds_dropped += 1
+            print(f"Sound {sound_name} not found or sound disabled", file=sys.stderr)
     
     def start_background_music(self):
         """Start background music (simple loop)"""
@@ -210,13 +287,722 @@ class SoundManager:
                 # For now, no background music - focus on sound effects
                 pass
             except Exception as e:
-                print(f"Warning: Could not start background music: {e}")
+                print(f"Warning: Could not start background music: {e}", file=sys.stderr)
 
 # Global sound manager
 sound_manager = SoundManager()
 
+# Game events pushed by the simulation as (kind, detail)
+EVENT_JUMP = "jump"                      # detail: None
+EVENT_ATTACK = "attack"                  # "punch" or "kick"
+EVENT_POWER = "power"                    # power type
+EVENT_PICKUP = "pickup"                  # "diamond" or "superdiamond"
+EVENT_HIT = "hit"                        # enemy hit by the player: "robot" or "boss"
+EVENT_PLAYER_HIT = "player_hit"          # enemy that struck the player
+EVENT_DAMAGE = "damage"                  # diamonds lost
+EVENT_LIFE_LOST = "life_lost"            # lives left
+EVENT_LEVEL_COMPLETE = "level_complete"  # level number
+EVENT_PAUSE = "pause"                    # True when pausing, False when resuming
+EVENT_CHEAT = "cheat"                    # level jumped to
+
+# Sound played for each event, by kind or by (kind, detail)
+EVENT_SOUNDS = {
+    EVENT_JUMP: 'jump',
+    EVENT_ATTACK: {"punch": 'punch', "kick": 'kick'},
+    EVENT_POWER: {"speed": 'speed_boost', "jump": 'jump_boost', "invincible": 'invincible',
+                  "strength": 'speed_boost'},  # Reuse speed sound for now
+    EVENT_PICKUP: {"diamond": 'diamond_collect', "superdiamond": 'superdiamond_collect'},
+    EVENT_HIT: {"robot": 'robot_hit', "boss": 'boss_hit'},
+    EVENT_PLAYER_HIT: 'robot_hit',
+    EVENT_DAMAGE: 'diamond_lost',
+    EVENT_LIFE_LOST: 'life_lost',
+    EVENT_LEVEL_COMPLETE: 'level_complete',
+    EVENT_PAUSE: 'jump',  # Use existing sound for pause
+    EVENT_CHEAT: 'superdiamond_collect',  # Special sound for cheat
+}
+
+def play_event_sounds(batch):
+    """Audio consumer: play each event's sound, once per frame per sound"""
+    played = set()
+    triggered = 0
+    for kind, detail in batch:
+        sound = EVENT_SOUNDS.get(kind)
+        if isinstance(sound, dict):
+            sound = sound.get(detail)
+        if sound is None:
+            continue
+        triggered += 1
+        if sound not in played:
+            played.add(sound)
+            sound_manager.play_sound(sound)
+    metrics.sounds_triggered += triggered
+    metrics.sounds_dropped += triggered - len(played)  # Repeats within the frame
+
+class EventQueue:
+    """Frame-batched game events. Simulation code only pushes; consumers
+    (audio, HUD, telemetry) receive the whole batch once per frame from
+    dispatch(). With no consumers attached, push() stores nothing, so
+    headless runs carry no audio or UI work."""
+    def __init__(self):
+        self.consumers = []
+        self.pending = []
+        self._spare = []
+    
+    def attach(self, consumer):
+        """Add a callable that receives each frame's list of (kind, detail) events"""
+        self.consumers.append(consumer)
+    
+    def detach(self, consumer):
+        self.consumers.remove(consumer)
+        if not self.consumers:
+            self.pending.clear()
+    
+    def push(self, kind, detail=None):
+        if self.consumers:
+            self.pending.append((kind, detail))
+    
+    def dispatch(self):
+        """Hand this frame's events to every consumer and start a new batch"""
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, self._spare
+        for consumer in self.consumers:
+            consumer(batch)
+        batch.clear()
+        self._spare = batch
+
+class EventCounter:
+    """Telemetry consumer counting events by kind"""
+    def __init__(self):
+        self.counts = Counter()
+    
+    def __call__(self, batch):
+        for kind, detail in batch:
+            self.counts[kind] += 1
+
+# Global event queue
+events = EventQueue()
+
+class Metrics:
+    """Hot-path counters for monitoring a running game (metrics_exporter.py).
+    Simulation and audio code add to the plain integer totals below, once per
+    loop where they can (a frame's pickup tests, a sweep's candidate
+    platforms), so they cost next to nothing when nobody reads them. Draw
+    calls and blits are only counted on canvases passed to instrument(), which
+    wraps their drawing methods. While enabled, frame() adds each presented
+    frame to the frame time histogram and publishes a snapshot: a new dict,
+    assigned in one step and never modified afterwards, so exporter threads
+    read it without locking."""
+    COUNTERS = ("collision_tests", "draw_calls", "blits", "entities_updated", "entities_culled",
+                "sounds_triggered", "sounds_dropped", "text_renders", "level_builds")
+    PER_FRAME = ("collision_tests", "draw_calls", "blits", "entities_updated", "entities_culled")
+    FRAME_BUCKETS = (0.004, 0.008, 0.0167, 0.025, 0.033, 0.05, 0.1, 0.25)  # Upper bounds, seconds
+    DRAW_CALLS = ("fill", "rect", "circle", "line", "polygon", "ellipse", "arc")
+    BLITS = ("text", "sprite")
+    
+    def __init__(self):
+        self.enabled = False
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        self.level_build_seconds = 0.0
+        self.last_level_build = 0.0
+        self.frames = 0
+        self.frame_seconds = 0.0
+        self.frame_buckets = [0] * (len(self.FRAME_BUCKETS) + 1)  # The last one is +Inf
+        self.snapshot = None
+        self._previous = dict.fromkeys(self.PER_FRAME, 0)
+    
+    def level_built(self, seconds):
+        self.level_builds += 1
+        self.level_build_seconds += seconds
+        self.last_level_build = seconds
+    
+    def instrument(self, canvas):
+        """Count canvas's drawing calls from now on; returns canvas"""
+        for name in self.DRAW_CALLS:
+            setattr(canvas, name, self._count_draw(getattr(canvas, name)))
+        for name in self.BLITS:
+            setattr(canvas, name, self._count_blit(getattr(canvas, name)))
+        return canvas
+    
+    def _count_draw(self, method):
+        def draw(*args, **kwargs):
+            self.draw_calls += 1
+            return method(*args, **kwargs)
+        return draw
+    
+    def _count_blit(self, method):
+        def blit(*args, **kwargs):
+            self.blits += 1
+            return method(*args, **kwargs)
+        return blit
+    
+    def frame(self, seconds):
+        """Record a presented frame's work time and publish a snapshot"""
+        if not self.enabled:
+            return
+        self.frames += 1
+        self.frame_seconds += seconds
+        self.frame_buckets[bisect.bisect_left(self.FRAME_BUCKETS, seconds)] += 1
+        totals = {name: getattr(self, name) for name in self.COUNTERS}
+        previous = self._previous
+        self.snapshot = {
+            "time": time.time(),
+            "totals": totals,
+            "last_frame": {name: totals[name] - previous[name] for name in self.PER_FRAME},
+            "particles": particles.count,
+            "level_build_seconds": self.level_build_seconds,
+            "last_level_build_seconds": self.last_level_build,
+            "frames": self.frames,
+            "frame_seconds": self.frame_seconds,
+            "frame_buckets": tuple(self.frame_buckets),
+        }
+        self._previous = totals
+
+metrics = Metrics()
+
+# Particle kinds
+PARTICLE_PUNCH = 0   # Rings and sparks at the fist; flag = powered
+PARTICLE_KICK = 1    # Arcs and motion lines at the foot; flag = powered
+PARTICLE_POWER = 2   # Ring and label around the player; flag = POWER_NAMES index
+PARTICLE_HIT = 3     # Spark burst on a robot hit
+PARTICLE_IMPACT = 4  # Ring and sparks on a boss hit
+PARTICLE_PICKUP = 5  # Sparkle where a diamond was collected; flag = 1 for superdiamonds
+
+PARTICLE_GROWTH = (1, 1, 2, 2, 2, 1)  # Size added per frame, by kind
+POWER_NAMES = ("speed", "jump", "invincible", "strength")
+POWER_COLORS = ((255, 255, 0), (0, 255, 0), (255, 0, 255), (255, 100, 0))
+
+def _angle_table(count, start=0.0):
+    """Unit (cos, sin) offsets for count evenly spaced sparks"""
+    return tuple((math.cos(start + i * 2 * math.pi / count),
+                  math.sin(start + i * 2 * math.pi / count)) for i in range(count))
+
+SPARKS_8 = _angle_table(8)
+SPARKS_12 = _angle_table(12)
+SPARKS_6 = _angle_table(6, math.pi / 6)
+
+# Visual effect detail tiers; draw code reads the current one from quality.level
+QUALITY_LOW, QUALITY_MEDIUM, QUALITY_HIGH = range(3)
+QUALITY_LEVELS = ("low", "medium", "high")
+
+class ParticlePool:
+    """Fixed-capacity visual effects shared by the player, enemies and pickups.
+    Particles are stored in parallel preallocated lists with the live ones packed
+    at the front: spawning fills the next free slot and expiry moves the last live
+    particle into the freed one, so neither allocates. Spawns beyond capacity are
+    dropped, which bounds the per-frame update and draw cost."""
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.count = 0
+        self.kind = [0] * capacity
+        self.x = [0.0] * capacity
+        self.y = [0.0] * capacity
+        self.timer = [0] * capacity
+        self.size = [0] * capacity
+        self.flag = [0] * capacity
+        self._sparks = []  # Draw buffer reused every frame
+    
+    def spawn(self, kind, x, y, timer, size, flag=0):
+        """Add a particle; returns False if the pool is full"""
+        i = self.count
+        if i >= self.capacity:
+            return False
+        self.kind[i] = kind
+        self.x[i] = x
+        self.y[i] = y
+        self.timer[i] = timer
+        self.size[i] = size
+        self.flag[i] = flag
+        self.count = i + 1
+        return True
+    
+    def clear(self):
+        self.count = 0
+    
+    def update(self):
+        """Age and expand every particle, removing expired ones"""
+        kind, timer, size = self.kind, self.timer, self.size
+        i = 0
+        while i < self.count:
+            timer[i] -= 1
+            if timer[i] > 0:
+                size[i] += PARTICLE_GROWTH[kind[i]]
+                i += 1
+            else:
+                last = self.count - 1
+                if i != last:
+                    kind[i] = kind[last]
+                    self.x[i] = self.x[last]
+                    self.y[i] = self.y[last]
+                    timer[i] = timer[last]
+                    size[i] = size[last]
+                    self.flag[i] = self.flag[last]
+                self.count = last  # The moved particle is updated on the next pass
+    
+    def draw(self, screen, camera_x, anchor_x=0, anchor_y=0):
+        """Draw all particles; power rings are positioned relative to the anchor (the player)"""
+        circle = screen.circle
+        arc = screen.arc
+        line = screen.line
+        sparks = self._sparks  # (x, y, radius, color) drawn in one pass after the shapes
+        sparks.clear()
+        detail = quality.level  # Fewer rings, arcs and sparks below QUALITY_HIGH, no sparks at low
+        
+        for i in range(self.count):
+            kind = self.kind[i]
+            size = self.size[i]
+            flag = self.flag[i]
+            if kind == PARTICLE_POWER:
+                screen_x = anchor_x - camera_x
+                if -50 < screen_x < SCREEN_WIDTH + 50:
+                    color = POWER_COLORS[flag]
+                    circle(color, (int(screen_x + 16), int(anchor_y + 24)), size, 3)
+                    if self.timer[i] > 30:
+                        screen.text(POWER_NAMES[flag].upper(), 24, color, (screen_x - 20, anchor_y - 30))
+                continue
+            
+            screen_x = self.x[i] - camera_x
+            if not -50 < screen_x < SCREEN_WIDTH + 50:
+                continue
+            y = self.y[i]
+            center = (int(screen_x), int(y))
+            
+            if kind == PARTICLE_PUNCH:
+                # Expanding rings plus sparks on the outer edge
+                color = ORANGE if flag else YELLOW
+                width = 3 if flag else 2
+                rings = (4 if flag else 3) if detail == QUALITY_HIGH else detail + 1
+                for ring in range(rings):
+                    circle(color, center, size + ring * 3, width)
+                if detail:
+                    radius = 3 if flag else 2
+                    if detail == QUALITY_HIGH:
+                        offsets = SPARKS_12 if flag else SPARKS_8
+                    else:
+                        offsets = SPARKS_8 if flag else SPARKS_6
+                    for dx, dy in offsets:
+                        sparks.append((screen_x + dx * size, y + dy * size, radius, WHITE))
+            elif kind == PARTICLE_KICK:
+                # Expanding arcs in front of the foot plus motion lines
+                color = ORANGE if flag else RED
+                angle = math.pi / 3 if flag else math.pi / 4
+                width = 4 if flag else 3
+                if detail == QUALITY_HIGH:
+                    arcs, lines = (6, 5) if flag else (5, 3)
+                else:
+                    arcs, lines = (3, 2) if detail else (1, 0)
+                for step in range(arcs):
+                    radius = size + step * 2
+                    arc(color, (screen_x - radius, y - radius, radius * 2, radius * 2),
+                        -angle, angle, width)
+                width = 3 if flag else 2
+                for step in range(lines):
+                    line(color, (screen_x + step * 6, y - 8),
+                         (screen_x + step * 6, y + 8), width)
+            elif not detail:
+                if kind == PARTICLE_IMPACT:
+                    circle(RED, center, size, 2)
+            elif kind == PARTICLE_HIT:
+                for dx, dy in SPARKS_6:
+                    sparks.append((screen_x + dx * size, y + dy * size, 2, YELLOW))
+            elif kind == PARTICLE_IMPACT:
+                circle(RED, center, size, 2)
+                for dx, dy in SPARKS_8:
+                    sparks.append((screen_x + dx * size, y + dy * size, 3, ORANGE))
+            elif kind == PARTICLE_PICKUP:
+                color = PINK if flag else CYAN
+                for dx, dy in SPARKS_6:
+                    sparks.append((screen_x + dx * size, y + dy * size, 2, color))
+        
+        for x, y, radius, color in sparks:
+            circle(color, (int(x), int(y)), radius)
+
+# Global particle pool
+particles = ParticlePool()
+
+class Timer:
+    """A callback scheduled on the TimerWheel; cancelling clears the callback"""
+    __slots__ = ("tick", "callback")
+    
+    def __init__(self, tick, callback):
+        self.tick = tick
+        self.callback = callback
+
+class TimerWheel:
+    """Hierarchical timing wheel for the simulation's timers. Game.update
+    advances it once per simulated frame, right before Player.update, and the
+    entity timers (Countdown, Stopwatch) are stored as the tick they end or
+    started on, so frames left are derived from `now` rather than decremented.
+    Expiry callbacks wait in 64-slot wheels. Level 0 holds the next 64 ticks,
+    and each higher level has slots 64 times as long as the level below. A slot
+    is moved down a level (cascaded) when the level below wraps around. Each
+    tick therefore costs one slot plus the timers that fire or cascade, however
+    many are pending."""
+    SLOT_BITS = 6
+    LEVELS = 4  # 64**4 ticks (77 hours at 60 FPS); later timers wait in _far
+    
+    def __init__(self):
+        self.now = 0
+        self._wheels = [[[] for _ in range(1 << self.SLOT_BITS)] for _ in range(self.LEVELS)]
+        self._far = []
+        self.fired = 0
+    
+    def schedule(self, tick, callback):
+        """Call callback() when the wheel advances to tick (the next tick at the earliest)"""
+        timer = Timer(max(tick, self.now + 1), callback)
+        self._insert(timer)
+        return timer
+    
+    def cancel(self, timer):
+        if timer is not None:
+            timer.callback = None
+    
+    def pending(self):
+        """Timers waiting in the wheel, including cancelled ones not reached yet"""
+        return sum(len(slot) for wheel in self._wheels for slot in wheel) + len(self._far)
+    
+    def _insert(self, timer):
+        delta = timer.tick - self.now
+        bits = self.SLOT_BITS
+        for level, wheel in enumerate(self._wheels):
+            if delta < 1 << (bits * (level + 1)):
+                wheel[(timer.tick >> (bits * level)) & ((1 << bits) - 1)].append(timer)
+                return
+        self._far.append(timer)
+    
+    def advance(self):
+        """Move to the next tick and fire the timers due on it"""
+        now = self.now = self.now + 1
+        bits = self.SLOT_BITS
+        mask = (1 << bits) - 1
+        if not now & mask:
+            # Level 0 wrapped: bring the next slot of each wrapped level down.
+            # Everything in a cascaded slot is due within its span, so it lands
+            # in lower levels and never back in the slot being emptied.
+            for level in range(1, self.LEVELS):
+                index = (now >> (bits * level)) & mask
+                slot = self._wheels[level][index]
+                for timer in slot:
+                    if timer.callback is not None:
+                        self._insert(timer)
+                slot.clear()
+                if index:
+                    break
+            else:
+                far, self._far = self._far, []
+                for timer in far:
+                    if timer.callback is not None:
+                        self._insert(timer)
+        
+        slot = self._wheels[0][now & mask]
+        for timer in slot:
+            callback = timer.callback
+            if callback is not None:
+                timer.callback = None
+                self.fired += 1
+                callback()
+        slot.clear()  # Callbacks schedule for later ticks, never into this slot
+
+# Global simulation clock
+timers = TimerWheel()
+
+class Countdown:
+    """Entity attribute counting frames down to 0, kept as the tick it ends on
+    (<name>_until). Reads give the frames left after the current tick, as the
+    old per-frame decrement did; assigning starts it. With expired, the owner's
+    method of that name is called on the tick after it reaches 0."""
+    def __init__(self, expired=None):
+        self.expired = expired
+    
+    def __set_name__(self, owner, name):
+        self.until = name + "_until"
+        self.timer = "_" + name + "_expiry"
+    
+    def __get__(self, entity, owner=None):
+        if entity is None:
+            return self
+        return max(0, getattr(entity, self.until) - timers.now)
+    
+    def __set__(self, entity, frames):
+        until = timers.now + frames
+        setattr(entity, self.until, until)
+        if self.expired is not None:
+            timers.cancel(getattr(entity, self.timer, None))
+            setattr(entity, self.timer, timers.schedule(until + 1, getattr(entity, self.expired)))
+
+class Stopwatch:
+    """Entity attribute counting frames up from 0, kept as the tick of the
+    owner's clock() it started on (<name>_start); assigning sets the count"""
+    def __set_name__(self, owner, name):
+        self.start = name + "_start"
+    
+    def __get__(self, entity, owner=None):
+        if entity is None:
+            return self
+        return entity.clock() - getattr(entity, self.start)
+    
+    def __set__(self, entity, frames):
+        setattr(entity, self.start, entity.clock() - frames)
+
+class PowerTimers:
+    """Player.powers: frames left per power, stored as the tick each one ends
+    on. Reads like the dict of counters it replaced; setting a power calls
+    on_set(power) so the player can schedule what depends on it."""
+    def __init__(self, on_set=None):
+        self.until = {}
+        self.on_set = on_set
+    
+    def __getitem__(self, power):
+        return max(0, self.until[power] - timers.now)
+    
+    def __setitem__(self, power, frames):
+        self.until[power] = timers.now + frames
+        if self.on_set is not None:
+            self.on_set(power)
+    
+    def __iter__(self):
+        return iter(self.until)
+    
+    def __len__(self):
+        return len(self.until)
+    
+    def items(self):
+        now = timers.now
+        return ((power, max(0, until - now)) for power, until in self.until.items())
+    
+    def values(self):
+        now = timers.now
+        return (max(0, until - now) for until in self.until.values())
+    
+    def update(self, **frames):
+        for power, value in frames.items():
+            self[power] = value
+
+class Canvas:
+    """Drawing target for Game.draw and the entity draw methods. Callers use
+    game coordinates (SCREEN_WIDTH x SCREEN_HEIGHT); the canvas draws into a
+    surface of that size times scale, so scale=0.5 renders a quarter of the
+    pixels. Text and baked sprites are rendered once per scale and cached.
+    
+    This is the software (pygame.Surface) renderer; sdl2_canvas.TextureCanvas
+    implements the same methods on SDL2 textures."""
+    TEXT_CACHE_SIZE = 512
+    retained = False  # True for canvases that keep the previous frame (see Game.draw)
+    SPRITE_CACHE_BYTES = 16 * 1024 * 1024  # Baked platform sizes differ per level
+    
+    def __init__(self, surface=None, scale=1.0, window=None, smooth=False):
+        self.scale = scale
+        if surface is None:
+            surface = pygame.Surface((round(SCREEN_WIDTH * scale), round(SCREEN_HEIGHT * scale)))
+        self.surface = surface
+        self.window = window  # Surface present() scales the frame into, if any
+        self.smooth = smooth
+        self._fonts = {}
+        self._text = {}     # (text, size, color) -> rendered surface
+        self._sprites = {}  # key -> baked surface at this scale
+        self._sprite_bytes = 0
+    
+    # Coordinate conversion
+    def _point(self, point):
+        s = self.scale
+        return (round(point[0] * s), round(point[1] * s))
+    
+    def _rect(self, rect):
+        # Scale both edges so adjacent rects stay seamless
+        s = self.scale
+        x0, y0 = round(rect[0] * s), round(rect[1] * s)
+        return (x0, y0, round((rect[0] + rect[2]) * s) - x0, round((rect[1] + rect[3]) * s) - y0)
+    
+    def _width(self, width):
+        return max(1, round(width * self.scale)) if width else 0
+    
+    # Primitives (same arguments as pygame.draw, minus the surface)
+    def fill(self, color):
+        self.surface.fill(color)
+    
+    def rect(self, color, rect, width=0):
+        if self.scale != 1:
+            rect, width = self._rect(rect), self._width(width)
+        pygame.draw.rect(self.surface, color, rect, width)
+    
+    def circle(self, color, center, radius, width=0):
+        s = self.scale
+        if s != 1:  # Inlined: particles draw hundreds of circles per frame
+            center = (round(center[0] * s), round(center[1] * s))
+            radius = max(1, round(radius * s))
+            width = max(1, round(width * s)) if width else 0
+        pygame.draw.circle(self.surface, color, center, radius, width)
+    
+    def line(self, color, start, end, width=1):
+        if self.scale != 1:
+            start, end, width = self._point(start), self._point(end), self._width(width)
+        pygame.draw.line(self.surface, color, start, end, width)
+    
+    def polygon(self, color, points, width=0):
+        if self.scale != 1:
+            points, width = [self._point(point) for point in points], self._width(width)
+        pygame.draw.polygon(self.surface, color, points, width)
+    
+    def ellipse(self, color, rect, width=0):
+        if self.scale != 1:
+            rect, width = self._rect(rect), self._width(width)
+        pygame.draw.ellipse(self.surface, color, rect, width)
+    
+    def arc(self, color, rect, start_angle, stop_angle, width=1):
+        if self.scale != 1:
+            rect, width = self._rect(rect), self._width(width)
+        pygame.draw.arc(self.surface, color, rect, start_angle, stop_angle, width)
+    
+    # Cached assets
+    def _text_surface(self, text, size, color):
+        key = (text, size, color)
+        surface = self._text.get(key)
+        if surface is None:
+            font = self._fonts.get(size)
+            if font is None:
+                font = self._fonts[size] = pygame.font.Font(None, max(1, round(size * self.scale)))
+            if len(self._text) >= self.TEXT_CACHE_SIZE:
+                self._text.clear()  # Scores and timers change; keep the cache bounded
+            surface = self._text[key] = font.render(text, True, color)
+            metrics.text_renders += 1
+        return surface
+    
+    def text(self, text, size, color, pos, anchor="topleft"):
+        """Draw text with the default font at size (in game units); returns its game-space Rect"""
+        surface = self._text_surface(text, size, color)
+        s = self.scale
+        rect = pygame.Rect(0, 0, round(surface.get_width() / s), round(surface.get_height() / s))
+        setattr(rect, anchor, pos)
+        self.surface.blit(surface, self._point(rect.topleft) if self.scale != 1 else rect)
+        return rect
+    
+    def sprite(self, key, size, paint, pos, alpha=None):
+        """Blit a baked surface of size (game units), drawn by paint(surface) at full
+        resolution the first time key is used and scaled once for this canvas;
+        returns the changed area of the surface"""
+        surface = self._sprites.get(key)
+        if surface is None:
+            surface = pygame.Surface(size)
+            paint(surface)
+            if self.scale != 1:
+                # Round up so neighbouring sprites (ground tiles) never leave a gap
+                surface = pygame.transform.smoothscale(
+                    surface, (math.ceil(size[0] * self.scale), math.ceil(size[1] * self.scale)))
+            if alpha is not None:
+                surface.set_alpha(alpha)
+            nbytes = surface.get_width() * surface.get_height() * surface.get_bytesize()
+            if self._sprite_bytes + nbytes > self.SPRITE_CACHE_BYTES:
+                self._sprites.clear()  # Re-baked on demand; keeps the memory bounded
+                self._sprite_bytes = 0
+            self._sprites[key] = surface
+            self._sprite_bytes += nbytes
+        return self.surface.blit(surface, self._point(pos) if self.scale != 1 else pos)
+    
+    def overlay(self, color, alpha):
+        """Cover the whole canvas with a translucent color"""
+        self.sprite(("overlay", color, alpha), (SCREEN_WIDTH, SCREEN_HEIGHT),
+                    lambda surface: surface.fill(color), (0, 0), alpha)
+    
+    def present(self):
+        """Scale the frame into the window, letterboxed to keep the aspect ratio"""
+        window = self.window
+        if window is None or window is self.surface:
+            return
+        window_width, window_height = window.get_size()
+        fit = min(window_width / SCREEN_WIDTH, window_height / SCREEN_HEIGHT)
+        width, height = round(SCREEN_WIDTH * fit), round(SCREEN_HEIGHT * fit)
+        target = pygame.Rect((window_width - width) // 2, (window_height - height) // 2, width, height)
+        if target.size != (window_width, window_height):
+            window.fill(BLACK)
+        if target.size == self.surface.get_size():
+            window.blit(self.surface, target)
+        elif self.smooth:
+            pygame.transform.smoothscale(self.surface, target.size, window.subsurface(target))
+        else:
+            pygame.transform.scale(self.surface, target.size, window.subsurface(target))
+    
+    def invalidate(self):
+        """The window lost its contents; every frame is drawn in full, so nothing to do"""
+
+def bounds(entity):
+    """entity's current hitbox, updated in its own Rect instead of allocating one per check"""
+    rect = entity.bounds
+    rect.update(entity.x, entity.y, entity.width, entity.height)
+    return rect
+
+def sweep(entity, old_y, terrain):
+    """The platform in terrain (an XIndex of platforms) that entity runs into
+    moving vertically from old_y to entity.y, or None. Platforms are only solid
+    from above and below, so the move is swept along y at entity's new x: going
+    down it reaches a platform when its bottom passes the platform's top, and
+    stops there if entity.lands_on() it; going up, when its top passes the
+    platform's bottom and entity.bumps() it. The platform with the earliest time
+    of impact wins. Platforms entity already overlapped (it walked into their
+    side) only stop it if it reaches none, the nearest first. Every platform in
+    the swept span is tested however far entity moved, so fast movers don't
+    tunnel through thin platforms."""
+    rect = bounds(entity)
+    vel_y = entity.vel_y
+    items = terrain.items
+    reached, reached_at = None, math.inf  # Time of impact, in frames
+    inside, inside_by = None, math.inf    # Frames since entity passed the edge
+    lo, hi = terrain.span(rect.left, rect.right)
+    metrics.collision_tests += hi - lo
+    for i in range(lo, hi):
+        platform = items[i]
+        other = platform.rect
+        if other.left >= rect.right or other.right <= rect.left:
+            continue
+        if vel_y > 0:
+            if not (other.top < rect.bottom and old_y < other.bottom and entity.lands_on(platform, old_y)):
+                continue
+            impact = (other.top - old_y - entity.height) / vel_y
+        elif vel_y < 0:
+            if not (other.bottom > rect.top and old_y + entity.height > other.top and entity.bumps(platform, old_y)):
+                continue
+            impact = (old_y - other.bottom) / -vel_y
+        else:
+            break
+        if impact >= 0:
+            if impact < reached_at:
+                reached, reached_at = platform, impact
+        elif -impact < inside_by:
+            inside, inside_by = platform, -impact
+    return reached if reached is not None else inside
+
+def move_vertically(entity, terrain):
+    """Move entity by vel_y (after its horizontal move), stopping on top of or
+    under the platform it runs into (see sweep); returns True if it landed"""
+    old_y = entity.y
+    entity.y += entity.vel_y
+    platform = sweep(entity, old_y, terrain)
+    if platform is None:
+        return False
+    landed = entity.vel_y > 0
+    entity.y = platform.rect.top - entity.height if landed else platform.rect.bottom
+    entity.vel_y = 0
+    return landed
+
 class Player:
+    # Frames left after this one (see Countdown): an attack can start again,
+    # and punching/kicking end, on the tick after its timer reaches 0
+    punch_timer = Countdown(expired="_end_punch")
+    kick_timer = Countdown(expired="_end_kick")
+    jump_cooldown = Countdown()  # Prevent infinite jumping on enemies
+    power_cooldown = Countdown()
+    CONTACT_TOLERANCE = 5  # Pixels the player may start inside a platform and still land on or bump it
+    
     def __init__(self, x, y):
+        self.powers = PowerTimers(self._power_set)
+        self.bounds = pygame.Rect(0, 0, 0, 0)  # See bounds()
+        self._invulnerable_until = 0
+        self._invulnerable_hold = None  # Frames left, frozen while the invincible power runs
+        self._hold_start = self._hold_end = None
+        self.reset(x, y)
+    
+    def reset(self, x, y):
+        """(Re)initialize for a new level; Game.load_level reuses the player this way"""
         self.x = x
         self.y = y
         self.width = 32
@@ -233,9 +1019,16 @@ class Player:
         self.lives = 3  # Reduced from 3 - fewer lives
         self.invulnerable = 0  # Invulnerability frames after taking damage
         self.animation_frame = 0
-        self.punch_effect = []  # Visual punch effects
-        self.kick_effect = []   # Visual kick effects
         self.jump_cooldown = 0  # Prevent infinite jumping on enemies
+        self.punch_swing = 0  # Swing serial numbers - each swing hits a target once
+        self.kick_swing = 0
+        
+        # Input state: actions held last frame, buffered presses and coyote time
+        self.held_actions = 0
+        self.jump_buffer = 0   # Frames a jump press stays queued
+        self.punch_buffer = 0
+        self.kick_buffer = 0
+        self.coyote_frames = 0  # Frames a jump is still allowed after leaving the ground
         
         # HARDER DIFFICULTY - New challenging mechanics
         self.stamina = 100  # Stamina system for attacks
@@ -246,14 +1039,59 @@ class Player:
         self.low_stamina_penalty = 0.5  # Movement penalty when low stamina
         
         # Power-up system - NERFED
-        self.powers = {
-            "speed": 0,      # Speed boost timer
-            "jump": 0,       # Jump boost timer
-            "invincible": 0, # Invincibility timer
-            "strength": 0    # Strength boost timer
-        }
-        self.power_effects = []  # Visual power effects
+        self.powers.update(
+            speed=0,       # Speed boost timer
+            jump=0,        # Jump boost timer
+            invincible=0,  # Invincibility timer
+            strength=0     # Strength boost timer
+        )
         self.power_cooldown = 300  # 5 second cooldown between power uses
+    
+    def _end_punch(self):
+        self.punching = False
+    
+    def _end_kick(self):
+        self.kicking = False
+    
+    @property
+    def invulnerable(self):
+        """Invulnerability frames after taking damage"""
+        if self._invulnerable_hold is not None:
+            return self._invulnerable_hold
+        return max(0, self._invulnerable_until - timers.now)
+    
+    @invulnerable.setter
+    def invulnerable(self, frames):
+        if self._invulnerable_hold is not None:
+            self._invulnerable_hold = frames
+        else:
+            self._invulnerable_until = timers.now + frames
+    
+    def _power_set(self, power):
+        """Invulnerability stops counting down (and stays at least 1) on every
+        tick the invincible power is still running after, from the next tick
+        until the tick it ends"""
+        if power != "invincible":
+            return
+        if self._invulnerable_hold is not None:
+            self._invulnerable_until = timers.now + self._invulnerable_hold
+            self._invulnerable_hold = None
+        timers.cancel(self._hold_start)
+        timers.cancel(self._hold_end)
+        self._hold_start = self._hold_end = None
+        end = self.powers.until["invincible"]
+        if end > timers.now + 1:
+            self._hold_start = timers.schedule(timers.now + 1, self._start_hold)
+            self._hold_end = timers.schedule(end, self._end_hold)
+    
+    def _start_hold(self):
+        # Frames left before this tick's countdown
+        self._invulnerable_hold = max(1, self._invulnerable_until - timers.now + 1)
+    
+    def _end_hold(self):
+        # Counting resumes on this tick
+        self._invulnerable_until = timers.now + self._invulnerable_hold - 1
+        self._invulnerable_hold = None
         
     def activate_power(self, power_type):
         """Activate a power-up - HARDER DIFFICULTY with cooldowns and nerfs"""
@@ -262,43 +1100,47 @@ class Player:
             
         if power_type == "speed":
             self.powers["speed"] = 180  # Reduced to 3 seconds (from 10)
-            sound_manager.play_sound('speed_boost')
         elif power_type == "jump":
             self.powers["jump"] = 180  # Reduced to 3 seconds (from 10)
-            sound_manager.play_sound('jump_boost')
         elif power_type == "invincible":
             self.powers["invincible"] = 120  # Reduced to 2 seconds (from 5)
-            sound_manager.play_sound('invincible')
         elif power_type == "strength":
             self.powers["strength"] = 180  # Reduced to 3 seconds (from 10)
-            sound_manager.play_sound('speed_boost')  # Reuse speed sound for now
+        events.push(EVENT_POWER, power_type)
         
         # Set cooldown period
         self.power_cooldown = 300  # 5 second cooldown between power uses
         
         # Add visual effect
-        self.power_effects.append({
-            'type': power_type,
-            'timer': 60,
-            'size': 30
-        })
-    
-    def update(self, platforms, camera_x):
-        # Update power timers and cooldowns
-        for power in self.powers:
-            if self.powers[power] > 0:
-                self.powers[power] -= 1
-        
-        if self.power_cooldown > 0:
-            self.power_cooldown -= 1
+        particles.spawn(PARTICLE_POWER, 0, 0, 60, 30, POWER_NAMES.index(power_type))
+    
+    def lands_on(self, platform, old_y):
+        """Whether falling from old_y onto platform lands on top of it (see sweep)"""
+        return old_y + self.height <= platform.rect.top + self.CONTACT_TOLERANCE
+    
+    def bumps(self, platform, old_y):
+        """Whether rising from old_y into platform hits its underside"""
+        return old_y >= platform.rect.bottom - self.CONTACT_TOLERANCE
+    
+    def update(self, terrain, camera_x, actions):
+        # Power, attack and invulnerability timers count down with the timer wheel
         
         # HARDER DIFFICULTY - Stamina system
         # Regenerate stamina slowly
         if self.stamina < self.max_stamina:
             self.stamina = min(self.max_stamina, self.stamina + self.stamina_regen)
         
-        # Handle input
-        keys = pygame.key.get_pressed()
+        # Handle input: held actions move, presses are buffered for a few frames
+        held = actions.held
+        self.held_actions = held
+        if actions.pressed & ACTION_JUMP:
+            self.jump_buffer = INPUT_BUFFER_FRAMES
+        if actions.pressed & ACTION_PUNCH:
+            self.punch_buffer = INPUT_BUFFER_FRAMES
+        if actions.pressed & ACTION_KICK:
+            self.kick_buffer = INPUT_BUFFER_FRAMES
+        if self.on_ground:
+            self.coyote_frames = COYOTE_FRAMES
         
         # Movement with speed boost and stamina penalty
         base_speed = PLAYER_SPEED
@@ -310,10 +1152,10 @@ class Player:
             base_speed = int(base_speed * self.low_stamina_penalty)
         
         self.vel_x = 0
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        if held & ACTION_LEFT:
             self.vel_x = -base_speed
             self.facing_right = False
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        if held & ACTION_RIGHT:
             self.vel_x = base_speed
             self.facing_right = True
             
@@ -322,13 +1164,17 @@ class Player:
         if self.powers["jump"] > 0:
             jump_power = int(JUMP_STRENGTH * 1.25)  # Reduced from 1.4 - less jump boost
             
-        if (keys[pygame.K_SPACE] or keys[pygame.K_UP] or keys[pygame.K_w]) and self.on_ground:
+        # A buffered press jumps on landing; coyote time allows it just after a ledge
+        if self.jump_buffer > 0 and self.coyote_frames > 0:
             # HARDER DIFFICULTY - Stamina cost for jumping
             if self.stamina >= self.jump_stamina_cost:
                 self.vel_y = jump_power
                 self.on_ground = False
+                self.jump_buffer = 0
+                self.coyote_frames = 0
                 self.stamina -= self.jump_stamina_cost
-                sound_manager.play_sound('jump')
+                actions.consume(ACTION_JUMP)
+                events.push(EVENT_JUMP)
             
         # Combat with strength boost and stamina costs
         punch_damage = 15
@@ -337,106 +1183,60 @@ class Player:
             punch_damage = 20  # Reduced from 25 - less damage boost
             kick_damage = 35   # Reduced from 40 - less damage boost
             
-        if keys[pygame.K_x] and self.punch_timer <= 0:
+        # Ready once the previous swing's timer read 0 last frame
+        if self.punch_buffer > 0 and self.punch_timer_until < timers.now:
             # HARDER DIFFICULTY - Stamina cost for attacks
             if self.stamina >= self.attack_stamina_cost:
                 self.punching = True
-                self.punch_timer = 25  # Increased from 20 - slower attacks
+                self.punch_timer = 25 - 1  # 25 frames counting this one (increased from 20 - slower attacks)
+                self.punch_swing += 1
+                self.punch_buffer = 0
+                actions.consume(ACTION_PUNCH)
                 self.stamina -= self.attack_stamina_cost
-                sound_manager.play_sound('punch')
+                events.push(EVENT_ATTACK, "punch")
                 # Add punch visual effect
                 punch_x = self.x + (40 if self.facing_right else -40)
                 punch_y = self.y + 20
                 effect_size = 25 if self.powers["strength"] > 0 else 20
-                self.punch_effect.append({
-                    'x': punch_x, 'y': punch_y, 'timer': 15, 'size': effect_size,
-                    'powered': self.powers["strength"] > 0
-                })
+                particles.spawn(PARTICLE_PUNCH, punch_x, punch_y, 15, effect_size,
+                                self.powers["strength"] > 0)
             
-        if keys[pygame.K_z] and self.kick_timer <= 0:
+        if self.kick_buffer > 0 and self.kick_timer_until < timers.now:
             # HARDER DIFFICULTY - Stamina cost for attacks
             if self.stamina >= self.attack_stamina_cost:
                 self.kicking = True
-                self.kick_timer = 35  # Increased from 25 - slower attacks
+                self.kick_timer = 35 - 1  # 35 frames counting this one (increased from 25 - slower attacks)
+                self.kick_swing += 1
+                self.kick_buffer = 0
+                actions.consume(ACTION_KICK)
                 self.stamina -= self.attack_stamina_cost
-                sound_manager.play_sound('kick')
+                events.push(EVENT_ATTACK, "kick")
                 # Add kick visual effect
                 kick_x = self.x + (50 if self.facing_right else -50)
                 kick_y = self.y + 30
                 effect_size = 30 if self.powers["strength"] > 0 else 25
-                self.kick_effect.append({
-                    'x': kick_x, 'y': kick_y, 'timer': 20, 'size': effect_size,
-                    'powered': self.powers["strength"] > 0
-                })
+                particles.spawn(PARTICLE_KICK, kick_x, kick_y, 20, effect_size,
+                                self.powers["strength"] > 0)
             
         # Update timers
-        if self.punch_timer > 0:
-            self.punch_timer -= 1
-        else:
-            self.punching = False
-            
-        if self.kick_timer > 0:
-            self.kick_timer -= 1
-        else:
-            self.kicking = False
-            
-        # Invincibility handling
-        if self.powers["invincible"] > 0:
-            self.invulnerable = max(self.invulnerable, 1)  # Stay invulnerable
-        elif self.invulnerable > 0:
-            self.invulnerable -= 1
-        
-        if self.jump_cooldown > 0:
-            self.jump_cooldown -= 1
-        
-        # Update visual effects
-        self.punch_effect = [effect for effect in self.punch_effect 
-                           if self.update_effect(effect)]
-        self.kick_effect = [effect for effect in self.kick_effect 
-                          if self.update_effect(effect)]
-        self.power_effects = [effect for effect in self.power_effects 
-                            if self.update_power_effect(effect)]
+        if self.jump_buffer > 0:
+            self.jump_buffer -= 1
+        if self.punch_buffer > 0:
+            self.punch_buffer -= 1
+        if self.kick_buffer > 0:
+            self.kick_buffer -= 1
+        if self.coyote_frames > 0:
+            self.coyote_frames -= 1
         
         # Apply gravity
         self.vel_y += GRAVITY
         
-        # Update position with collision detection
-        # Handle horizontal movement first
-        old_x = self.x
+        # Handle horizontal movement first: platform sides never block the
+        # player, who walks through them and lands on top or bumps underneath
         self.x += self.vel_x
-        player_rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        
-        # Check for horizontal collisions
-        for platform in platforms:
-            if player_rect.colliderect(platform.rect):
-                # Only block horizontal movement if player is not on top of the platform
-                player_bottom = self.y + self.height
-                platform_top = platform.rect.top
-                
-                # If player is significantly above the platform (not walking on it)
-                if player_bottom < platform_top - 10:  # 10 pixel tolerance
-                    # Restore old position to prevent clipping
-                    self.x = old_x
-                    break
         
-        # Handle vertical movement
-        old_y = self.y
-        self.y += self.vel_y
-        player_rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        
-        # Check for vertical collisions
-        self.on_ground = False
-        for platform in platforms:
-            if player_rect.colliderect(platform.rect):
-                # Landing on top of platform
-                if self.vel_y > 0 and old_y + self.height <= platform.rect.top + 5:
-                    self.y = platform.rect.top - self.height
-                    self.vel_y = 0
-                    self.on_ground = True
-                # Hitting platform from below
-                elif self.vel_y < 0 and old_y >= platform.rect.bottom - 5:
-                    self.y = platform.rect.bottom
-                    self.vel_y = 0
+        # Then sweep the vertical movement against the terrain
+        self.on_ground = move_vertically(self, terrain)
         
         # World boundaries
         if self.x < 0:
@@ -452,18 +1252,6 @@ class Player:
         # Animation
         self.animation_frame += 1
     
-    def update_effect(self, effect):
-        """Update visual effect and return True if it should continue"""
-        effect['timer'] -= 1
-        effect['size'] += 1  # Expand effect
-        return effect['timer'] > 0
-    
-    def update_power_effect(self, effect):
-        """Update power activation effect and return True if it should continue"""
-        effect['timer'] -= 1
-        effect['size'] += 2  # Expand effect
-        return effect['timer'] > 0
-    
     def lose_diamonds(self, amount):
         # Invincible players don't lose diamonds
         if self.powers["invincible"] > 0:
@@ -474,14 +1262,14 @@ class Player:
         self.diamonds -= actual_loss
         self.stamina = max(0, self.stamina - 20)  # Lose stamina when taking damage
         
-        sound_manager.play_sound('diamond_lost')
+        events.push(EVENT_DAMAGE, actual_loss)
         if self.diamonds <= 0:
             self.diamonds = 0
             self.lose_life()
     
     def lose_life(self):
         self.lives -= 1
-        sound_manager.play_sound('life_lost')
+        events.push(EVENT_LIFE_LOST, self.lives)
         self.diamonds = 10  # Reduced from 20 - very low health on respawn
         self.stamina = 30   # Reduced stamina on respawn - much lower
         self.respawn()
@@ -500,35 +1288,36 @@ class Player:
         # Don't draw if off screen
         if screen_x < -50 or screen_x > SCREEN_WIDTH + 50:
             return
+        detail = quality.level
             
-        # Power-up glow effects
+        # Power-up glow effects (only invincibility is shown at low quality)
         if self.powers["invincible"] > 0:
             # Invincible glow - pulsing magenta
             pulse = int(abs(math.sin(self.animation_frame * 0.3)) * 100) + 155
             glow_color = (pulse, 0, pulse)
-            pygame.draw.circle(screen, glow_color, 
+            screen.circle(glow_color, 
                              (int(screen_x + 16), int(self.y + 24)), 35, 3)
         
         if self.powers["speed"] > 0:
             # Speed trails
-            for i in range(3):
+            for i in range(3 if detail == QUALITY_HIGH else detail):
                 trail_x = screen_x - (i + 1) * 8 * (1 if self.facing_right else -1)
                 trail_alpha = 100 - i * 30
                 trail_color = (255, 255, 0, trail_alpha)
-                pygame.draw.circle(screen, (255, 255, 0), 
+                screen.circle((255, 255, 0), 
                                  (int(trail_x + 16), int(self.y + 24)), 20, 2)
         
-        if self.powers["jump"] > 0:
+        if self.powers["jump"] > 0 and detail:
             # Jump boost - green aura
-            pygame.draw.circle(screen, (0, 255, 0), 
+            screen.circle((0, 255, 0), 
                              (int(screen_x + 16), int(self.y + 24)), 30, 2)
         
-        if self.powers["strength"] > 0:
+        if self.powers["strength"] > 0 and detail:
             # Strength boost - orange glow around fists
             fist_color = (255, 100, 0)
-            pygame.draw.circle(screen, fist_color, 
+            screen.circle(fist_color, 
                              (int(screen_x + 6), int(self.y + 20)), 8, 2)
-            pygame.draw.circle(screen, fist_color, 
+            screen.circle(fist_color, 
                              (int(screen_x + 26), int(self.y + 20)), 8, 2)
         
         # HARDER DIFFICULTY - Show stamina bar above player
@@ -539,12 +1328,12 @@ class Player:
             bar_y = self.y - 10
             
             # Background bar
-            pygame.draw.rect(screen, RED, (bar_x, bar_y, bar_width, bar_height))
+            screen.rect(RED, (bar_x, bar_y, bar_width, bar_height))
             
             # Stamina bar
             stamina_width = int((self.stamina / self.max_stamina) * bar_width)
             stamina_color = GREEN if self.stamina > 50 else YELLOW if self.stamina > 20 else RED
-            pygame.draw.rect(screen, stamina_color, (bar_x, bar_y, stamina_width, bar_height))
+            screen.rect(stamina_color, (bar_x, bar_y, stamina_width, bar_height))
             
         # Flicker when invulnerable (but not when invincible power is active)
         if self.invulnerable > 0 and self.powers["invincible"] == 0 and self.invulnerable % 10 < 5:
@@ -552,22 +1341,22 @@ class Player:
         
         # Body (boy character)
         body_color = (100, 150, 255)  # Blue shirt
-        pygame.draw.rect(screen, body_color, (screen_x + 8, self.y + 16, 16, 20))
+        screen.rect(body_color, (screen_x + 8, self.y + 16, 16, 20))
         
         # Pants
-        pygame.draw.rect(screen, (50, 50, 150), (screen_x + 8, self.y + 36, 16, 12))
+        screen.rect((50, 50, 150), (screen_x + 8, self.y + 36, 16, 12))
         
         # Head
-        pygame.draw.circle(screen, (255, 220, 177), 
+        screen.circle((255, 220, 177), 
                          (int(screen_x + 16), int(self.y + 12)), 10)
         
         # Hair
-        pygame.draw.arc(screen, BROWN, 
+        screen.arc(BROWN, 
                        (screen_x + 6, self.y + 2, 20, 16), 0, math.pi, 3)
         
         # Eyes
         eye_x = screen_x + 16 + (2 if self.facing_right else -2)
-        pygame.draw.circle(screen, BLACK, (int(eye_x), int(self.y + 10)), 2)
+        screen.circle(BLACK, (int(eye_x), int(self.y + 10)), 2)
         
         # Arms with enhanced combat visualization
         arm_y = self.y + 20
@@ -575,18 +1364,18 @@ class Player:
             # Extended arm for punch with more detail
             arm_x = screen_x + (28 if self.facing_right else 4)
             # Upper arm
-            pygame.draw.line(screen, (255, 220, 177), 
+            screen.line((255, 220, 177), 
                            (screen_x + 16, arm_y), (arm_x - 8, arm_y), 4)
             # Forearm
-            pygame.draw.line(screen, (255, 220, 177), 
+            screen.line((255, 220, 177), 
                            (arm_x - 8, arm_y), (arm_x, arm_y), 4)
             # Fist
-            pygame.draw.circle(screen, (255, 200, 150), (int(arm_x), int(arm_y)), 5)
+            screen.circle((255, 200, 150), (int(arm_x), int(arm_y)), 5)
         else:
             # Normal arms
-            pygame.draw.circle(screen, (255, 220, 177), 
+            screen.circle((255, 220, 177), 
                              (int(screen_x + 6), int(arm_y)), 3)
-            pygame.draw.circle(screen, (255, 220, 177), 
+            screen.circle((255, 220, 177), 
                              (int(screen_x + 26), int(arm_y)), 3)
         
         # Legs with enhanced kicking visualization
@@ -595,111 +1384,32 @@ class Player:
             # Extended leg for kick with more detail
             leg_x = screen_x + (32 if self.facing_right else 0)
             # Thigh
-            pygame.draw.line(screen, (255, 220, 177), 
+            screen.line((255, 220, 177), 
                            (screen_x + 16, leg_y - 5), (leg_x - 8, leg_y), 5)
             # Shin
-            pygame.draw.line(screen, (255, 220, 177), 
+            screen.line((255, 220, 177), 
                            (leg_x - 8, leg_y), (leg_x, leg_y), 5)
             # Foot
-            pygame.draw.ellipse(screen, (50, 50, 50), 
+            screen.ellipse((50, 50, 50), 
                               (leg_x - 2, leg_y - 2, 8, 4))
             # Other leg (standing)
             other_leg_x = screen_x + (8 if self.facing_right else 24)
-            pygame.draw.circle(screen, (255, 220, 177), 
+            screen.circle((255, 220, 177), 
                              (int(other_leg_x), int(leg_y)), 3)
         else:
             # Normal legs with walking animation
             offset = math.sin(self.animation_frame * 0.3) * 2 if abs(self.vel_x) > 0 else 0
-            pygame.draw.circle(screen, (255, 220, 177), 
+            screen.circle((255, 220, 177), 
                              (int(screen_x + 10 + offset), int(leg_y)), 3)
-            pygame.draw.circle(screen, (255, 220, 177), 
+            screen.circle((255, 220, 177), 
                              (int(screen_x + 22 - offset), int(leg_y)), 3)
-        
-        # Draw visual effects
-        self.draw_effects(screen, camera_x)
-    
-    def draw_effects(self, screen, camera_x):
-        """Draw punch and kick visual effects"""
-        # Draw punch effects
-        for effect in self.punch_effect:
-            screen_x = effect['x'] - camera_x
-            if -50 < screen_x < SCREEN_WIDTH + 50:
-                # Expanding circle effect
-                base_color = ORANGE if effect.get('powered', False) else YELLOW
-                
-                # Create multiple rings for impact effect
-                for i in range(4 if effect.get('powered', False) else 3):
-                    radius = effect['size'] + i * 3
-                    if radius > 0:
-                        pygame.draw.circle(screen, base_color, 
-                                         (int(screen_x), int(effect['y'])), 
-                                         radius, 3 if effect.get('powered', False) else 2)
-                
-                # Add spark effects
-                spark_count = 12 if effect.get('powered', False) else 8
-                for i in range(spark_count):
-                    angle = (i * (360 / spark_count)) * math.pi / 180
-                    spark_x = screen_x + math.cos(angle) * effect['size']
-                    spark_y = effect['y'] + math.sin(angle) * effect['size']
-                    spark_size = 3 if effect.get('powered', False) else 2
-                    pygame.draw.circle(screen, WHITE, 
-                                     (int(spark_x), int(spark_y)), spark_size)
-        
-        # Draw kick effects
-        for effect in self.kick_effect:
-            screen_x = effect['x'] - camera_x
-            if -50 < screen_x < SCREEN_WIDTH + 50:
-                # Expanding arc effect for kick
-                base_color = ORANGE if effect.get('powered', False) else RED
-                
-                # Create arc effect
-                arc_count = 6 if effect.get('powered', False) else 5
-                for i in range(arc_count):
-                    radius = effect['size'] + i * 2
-                    if radius > 0:
-                        # Draw arc
-                        start_angle = -math.pi/3 if effect.get('powered', False) else -math.pi/4
-                        end_angle = math.pi/3 if effect.get('powered', False) else math.pi/4
-                        pygame.draw.arc(screen, base_color, 
-                                      (screen_x - radius, effect['y'] - radius, 
-                                       radius * 2, radius * 2),
-                                      start_angle, end_angle, 4 if effect.get('powered', False) else 3)
-                
-                # Add motion lines
-                line_count = 5 if effect.get('powered', False) else 3
-                for i in range(line_count):
-                    line_x = screen_x + i * 6
-                    line_width = 3 if effect.get('powered', False) else 2
-                    pygame.draw.line(screen, base_color, 
-                                   (line_x, effect['y'] - 8), 
-                                   (line_x, effect['y'] + 8), line_width)
-        
-        # Draw power activation effects
-        for effect in self.power_effects:
-            screen_x = self.x - camera_x
-            if -50 < screen_x < SCREEN_WIDTH + 50:
-                colors = {
-                    "speed": (255, 255, 0),
-                    "jump": (0, 255, 0),
-                    "invincible": (255, 0, 255),
-                    "strength": (255, 100, 0)
-                }
-                color = colors.get(effect['type'], WHITE)
-                
-                # Expanding ring effect
-                pygame.draw.circle(screen, color, 
-                                 (int(screen_x + 16), int(self.y + 24)), 
-                                 effect['size'], 3)
-                
-                # Power type text
-                if effect['timer'] > 30:
-                    font = pygame.font.Font(None, 24)
-                    text = font.render(effect['type'].upper(), True, color)
-                    screen.blit(text, (screen_x - 20, self.y - 30))
 
 class Platform:
     def __init__(self, x, y, width, height):
         self.rect = pygame.Rect(x, y, width, height)
+    
+    def reset(self, x, y, width, height):
+        self.rect.update(x, y, width, height)
         
     def draw(self, screen, camera_x):
         # Calculate screen position
@@ -709,23 +1419,33 @@ class Platform:
         if screen_x + self.rect.width < 0 or screen_x > SCREEN_WIDTH:
             return
             
+        # Dirt, grass and texture are baked once per platform size (and quality)
+        textured = quality.level > QUALITY_LOW
+        screen.sprite(("platform", self.rect.width, self.rect.height, textured), self.rect.size,
+                      self.paint_textured if textured else self.paint, (screen_x, self.rect.y))
+    
+    def paint(self, surface):
+        width, height = self.rect.size
         # Dirt base
-        dirt_rect = pygame.Rect(screen_x, self.rect.y, self.rect.width, self.rect.height)
-        pygame.draw.rect(screen, BROWN, dirt_rect)
+        surface.fill(BROWN)
         
         # Grass top
-        grass_rect = pygame.Rect(screen_x, self.rect.y, self.rect.width, 8)
-        pygame.draw.rect(screen, GREEN, grass_rect)
+        pygame.draw.rect(surface, GREEN, (0, 0, width, 8))
+    
+    def paint_textured(self, surface):
+        width, height = self.rect.size
+        self.paint(surface)
         
         # Add some texture
-        for i in range(0, self.rect.width, 16):
-            if screen_x + i >= 0 and screen_x + i <= SCREEN_WIDTH:
-                pygame.draw.line(screen, (100, 50, 0), 
-                               (screen_x + i, self.rect.y + 8), 
-                               (screen_x + i, self.rect.y + self.rect.height), 1)
+        for i in range(0, width, 16):
+            pygame.draw.line(surface, (100, 50, 0), (i, 8), (i, height), 1)
 
 class Diamond:
     def __init__(self, x, y):
+        self.bounds = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, y)
+    
+    def reset(self, x, y):
         self.x = x
         self.y = y
         self.width = 16
@@ -740,13 +1460,11 @@ class Diamond:
         self.animation += 0.2
         
         # Check collision with player
-        diamond_rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        player_rect = pygame.Rect(player.x, player.y, player.width, player.height)
-        
-        if diamond_rect.colliderect(player_rect):
+        if bounds(self).colliderect(bounds(player)):
             self.collected = True
             player.diamonds += 1
-            sound_manager.play_sound('diamond_collect')
+            events.push(EVENT_PICKUP, "diamond")
+            particles.spawn(PARTICLE_PICKUP, self.x + 8, self.y + 8, 12, 4)
     
     def draw(self, screen, camera_x):
         if self.collected:
@@ -764,11 +1482,22 @@ class Diamond:
             (screen_x + 8, self.y + 12 + offset_y),
             (screen_x + 12, self.y + 6 + offset_y)
         ]
-        pygame.draw.polygon(screen, CYAN, points)
-        pygame.draw.polygon(screen, WHITE, points, 2)
+        screen.polygon(CYAN, points)
+        screen.polygon(WHITE, points, 2)
 
 class SuperDiamond:
+    COLORS = {
+        "speed": (255, 255, 0),      # Yellow
+        "jump": (0, 255, 0),         # Green
+        "invincible": (255, 0, 255), # Magenta
+        "strength": (255, 100, 0)    # Orange
+    }
+    
     def __init__(self, x, y, power_type):
+        self.bounds = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, y, power_type)
+    
+    def reset(self, x, y, power_type):
         self.x = x
         self.y = y
         self.width = 24
@@ -776,12 +1505,6 @@ class SuperDiamond:
         self.collected = False
         self.animation = 0
         self.power_type = power_type  # "speed", "jump", "invincible", "strength"
-        self.colors = {
-            "speed": (255, 255, 0),      # Yellow
-            "jump": (0, 255, 0),         # Green
-            "invincible": (255, 0, 255), # Magenta
-            "strength": (255, 100, 0)    # Orange
-        }
         
     def update(self, player):
         if self.collected:
@@ -790,14 +1513,12 @@ class SuperDiamond:
         self.animation += 0.3
         
         # Check collision with player
-        diamond_rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        player_rect = pygame.Rect(player.x, player.y, player.width, player.height)
-        
-        if diamond_rect.colliderect(player_rect):
+        if bounds(self).colliderect(bounds(player)):
             self.collected = True
             player.diamonds += 5  # SuperDiamonds are worth more
             player.activate_power(self.power_type)
-            sound_manager.play_sound('superdiamond_collect')
+            events.push(EVENT_PICKUP, "superdiamond")
+            particles.spawn(PARTICLE_PICKUP, self.x + 12, self.y + 12, 12, 6, 1)
     
     def draw(self, screen, camera_x):
         if self.collected:
@@ -809,10 +1530,11 @@ class SuperDiamond:
             
         # Animated superdiamond with glow effect
         offset_y = math.sin(self.animation) * 4
-        color = self.colors[self.power_type]
+        color = self.COLORS[self.power_type]
+        detail = quality.level
         
         # Glow effect
-        for i in range(3):
+        for i in range(3 if detail == QUALITY_HIGH else detail):
             glow_size = 8 + i * 4
             glow_alpha = 100 - i * 30
             glow_points = [
@@ -821,11 +1543,9 @@ class SuperDiamond:
                 (screen_x + 12, self.y + 12 + offset_y + glow_size//2),
                 (screen_x + 12 + glow_size//2, self.y + 6 + offset_y)
             ]
-            # Create a surface for the glow effect
-            glow_surf = pygame.Surface((glow_size * 2, glow_size * 2))
-            glow_surf.set_alpha(glow_alpha)
-            glow_surf.fill(color)
-            screen.blit(glow_surf, (screen_x + 12 - glow_size, self.y + offset_y + 6 - glow_size))
+            screen.sprite(("glow", color, glow_size), (glow_size * 2, glow_size * 2),
+                          lambda surface: surface.fill(color),
+                          (screen_x + 12 - glow_size, self.y + offset_y + 6 - glow_size), glow_alpha)
         
         # Main diamond
         points = [
@@ -834,18 +1554,44 @@ class SuperDiamond:
             (screen_x + 12, self.y + 16 + offset_y),
             (screen_x + 18, self.y + 8 + offset_y)
         ]
-        pygame.draw.polygon(screen, color, points)
-        pygame.draw.polygon(screen, WHITE, points, 3)
+        screen.polygon(color, points)
+        screen.polygon(WHITE, points, 3)
         
         # Sparkle effects
-        for i in range(4):
-            angle = (self.animation * 2 + i * 90) * math.pi / 180
+        sparkles = 4 if detail == QUALITY_HIGH else detail * 2
+        for i in range(sparkles):
+            angle = (self.animation * 2 + i * 360 / sparkles) * math.pi / 180
             sparkle_x = screen_x + 12 + math.cos(angle) * 15
             sparkle_y = self.y + 8 + offset_y + math.sin(angle) * 15
-            pygame.draw.circle(screen, WHITE, (int(sparkle_x), int(sparkle_y)), 2)
+            screen.circle(WHITE, (int(sparkle_x), int(sparkle_y)), 2)
 
 class Robot:
+    # How the robot reacts to player attacks (see CombatSystem)
+    HIT_HEIGHT = 60  # Must be within reasonable height
+    DAMAGE = {"punch": (15, 25), "kick": (25, 40), "stomp": (20, 20)}  # (normal, strength)
+    KNOCKBACK = {"punch": (5, None), "kick": (8, -5)}  # (vel_x away from player, vel_y)
+    STOMP_COOLDOWN = 10  # Prevent infinite bouncing
+    STOMP_CLEARANCE = 1  # Push the player up slightly to prevent getting stuck
+    HIT_EVENT = "robot"
+    HIT_PARTICLE = (PARTICLE_HIT, 10, 4)  # kind, timer, size
+    aggression_timer = Countdown()  # Frames the robot keeps chasing after losing the player
+    
+    def lands_on(self, platform, old_y):
+        """Robots land on a platform they fall onto, or one they walked into
+        while their top is still above it after the move (see sweep)"""
+        top = platform.rect.top
+        return old_y + self.height <= top or self.y < top
+    
+    def bumps(self, platform, old_y):
+        return False  # Robots pass up through platforms
+    
     def __init__(self, x, y, robot_type="normal"):
+        self.bounds = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, y, robot_type)
+    
+    def reset(self, x, y, robot_type="normal"):
+        """Same as construction, including the random patrol direction, so a
+        pooled robot is indistinguishable from a new one"""
         self.x = x
         self.y = y
         self.width = 28
@@ -864,7 +1610,7 @@ class Robot:
         self.detection_range = 300  # Much wider detection range
         self.aggression_timer = 0  # New aggression system
         
-    def update(self, platforms, player):
+    def update(self, terrain, player):
         if not self.alive:
             return
             
@@ -877,14 +1623,13 @@ class Robot:
                 self.vel_x = self.speed
             else:
                 self.vel_x = -self.speed
-            self.aggression_timer = 120  # Stay aggressive for 2 seconds
-        elif self.aggression_timer > 0:
+            self.aggression_timer_until = timers.now + 120  # Stay aggressive for 2 seconds
+        elif self.aggression_timer_until >= timers.now:
             # Continue chasing even if player moves away (for a short time)
             if player.x > self.x:
                 self.vel_x = self.speed
             else:
                 self.vel_x = -self.speed
-            self.aggression_timer -= 1
         else:
             # Patrol
             if abs(self.x - self.start_x) > self.patrol_distance:
@@ -893,20 +1638,9 @@ class Robot:
         # Apply gravity
         self.vel_y += GRAVITY
         
-        # Update position
+        # Update position, landing on platforms
         self.x += self.vel_x
-        self.y += self.vel_y
-        
-        # Platform collision
-        robot_rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        on_ground = False
-        
-        for platform in platforms:
-            if robot_rect.colliderect(platform.rect):
-                if self.vel_y > 0 and self.y < platform.rect.top:
-                    self.y = platform.rect.top - self.height
-                    self.vel_y = 0
-                    on_ground = True
+        on_ground = move_vertically(self, terrain)
                     
         # Turn around at edges
         if not on_ground and self.vel_y >= 0:
@@ -920,45 +1654,6 @@ class Robot:
                 player.lose_diamonds(self.attack_damage)
                 player.invulnerable = 60  # 1 second invulnerability
                 self.attack_timer = 0
-        
-        # Check if hit by player (with proper range and height checking)
-        vertical_distance = abs(self.y - player.y)
-        if (distance_to_player < PUNCH_RANGE and 
-            vertical_distance < 60 and  # Must be within reasonable height
-            player.punching):
-            damage = 25 if player.powers["strength"] > 0 else 15
-            self.health -= damage
-            self.vel_x = 5 if player.facing_right else -5
-            sound_manager.play_sound('robot_hit')
-            
-        if (distance_to_player < KICK_RANGE and 
-            vertical_distance < 60 and  # Must be within reasonable height
-            player.kicking):
-            damage = 40 if player.powers["strength"] > 0 else 25
-            self.health -= damage
-            self.vel_x = 8 if player.facing_right else -8
-            self.vel_y = -5
-            sound_manager.play_sound('robot_hit')
-            
-        # Check if jumped on
-        player_rect = pygame.Rect(player.x, player.y, player.width, player.height)
-        robot_rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        
-        # Check if player is above the robot and moving downward
-        if (player_rect.colliderect(robot_rect) and 
-            player_rect.bottom < robot_rect.centery and 
-            player.vel_y > 0 and 
-            player.jump_cooldown == 0):
-            self.health -= 20
-            player.vel_y = -12  # Bounce player up more
-            sound_manager.play_sound('robot_hit')
-            # Add cooldown to prevent infinite bouncing
-            player.jump_cooldown = 10
-            # Push the player up slightly to prevent getting stuck
-            player.y = self.y - player.height - 1
-            
-        if self.health <= 0:
-            self.alive = False
     
     def draw(self, screen, camera_x):
         if not self.alive:
@@ -970,24 +1665,63 @@ class Robot:
             
         # Robot body
         color = GRAY if self.type == "normal" else (150, 50, 50)
-        pygame.draw.rect(screen, color, (screen_x, self.y, self.width, self.height))
+        screen.rect(color, (screen_x, self.y, self.width, self.height))
         
         # Robot head
-        pygame.draw.rect(screen, (150, 150, 150), 
+        screen.rect((150, 150, 150), 
                         (screen_x + 4, self.y - 8, self.width - 8, 12))
         
         # Evil red eyes
-        pygame.draw.circle(screen, RED, (int(screen_x + 8), int(self.y - 2)), 3)
-        pygame.draw.circle(screen, RED, (int(screen_x + self.width - 8), int(self.y - 2)), 3)
+        screen.circle(RED, (int(screen_x + 8), int(self.y - 2)), 3)
+        screen.circle(RED, (int(screen_x + self.width - 8), int(self.y - 2)), 3)
         
         # Health bar
         if self.health < self.max_health:
             bar_width = int((self.health / self.max_health) * self.width)
-            pygame.draw.rect(screen, RED, (screen_x, self.y - 15, self.width, 4))
-            pygame.draw.rect(screen, GREEN, (screen_x, self.y - 15, bar_width, 4))
+            screen.rect(RED, (screen_x, self.y - 15, self.width, 4))
+            screen.rect(GREEN, (screen_x, self.y - 15, bar_width, 4))
 
 class Boss:
+    HIT_HEIGHT = 80  # Bosses are taller, so slightly more range
+    DAMAGE = {"punch": (10, 20), "kick": (20, 35), "stomp": (15, 15)}
+    KNOCKBACK = {"punch": (3, None), "kick": (5, -3)}
+    STOMP_COOLDOWN = 15
+    STOMP_CLEARANCE = 2
+    HIT_EVENT = "boss"
+    HIT_PARTICLE = (PARTICLE_IMPACT, 14, 8)
+    # Frames since the last attack, move and jump, and left in the current charge
+    attack_timer = Stopwatch()
+    move_timer = Stopwatch()
+    jump_timer = Stopwatch()
+    charge_timer = Countdown()
+    
     def __init__(self, x, y, level):
+        self.bounds = pygame.Rect(0, 0, 0, 0)
+        self._alive = True
+        self._stopped_at = None  # Tick the boss was defeated on
+        self._clock_offset = 0   # Ticks spent defeated (the boss can be restored to life)
+        self.reset(x, y, level)
+    
+    def clock(self):
+        """Timer wheel ticks, not counting the time the boss spent defeated"""
+        stopped_at = self._stopped_at
+        return (timers.now if stopped_at is None else stopped_at) - self._clock_offset
+    
+    @property
+    def alive(self):
+        return self._alive
+    
+    @alive.setter
+    def alive(self, alive):
+        # The AI counters stand still while the boss is defeated, as update() stops
+        if alive and self._stopped_at is not None:
+            self._clock_offset += timers.now - self._stopped_at
+            self._stopped_at = None
+        elif not alive and self._stopped_at is None:
+            self._stopped_at = timers.now
+        self._alive = alive
+    
+    def reset(self, x, y, level):
         self.x = x
         self.y = y
         self.width = 60
@@ -1008,18 +1742,22 @@ class Boss:
         self.is_charging = False
         self.base_damage = 8 + (level * 2)  # Damage scales with level
         
-    def update(self, platforms, player):
+    def lands_on(self, platform, old_y):
+        """Like robots, the boss lands on platforms it falls onto or walked
+        into with its top still above them"""
+        top = platform.rect.top
+        return old_y + self.height <= top or self.y < top
+    
+    def bumps(self, platform, old_y):
+        return False
+    
+    def update(self, terrain, player):
         if not self.alive:
             return
             
         self.animation += 0.1
         distance_to_player = abs(self.x - player.x)
         
-        # Update timers
-        self.attack_timer += 1
-        self.move_timer += 1
-        self.jump_timer += 1
-        
         # Boss AI based on level and health percentage
         health_percentage = self.health / self.max_health
         
@@ -1031,12 +1769,12 @@ class Boss:
                     if player.invulnerable == 0 and not (player.punching or player.kicking):
                         player.lose_diamonds(self.base_damage)
                         player.invulnerable = 60
-                        sound_manager.play_sound('robot_hit')
+                        events.push(EVENT_PLAYER_HIT, "boss")
                     self.attack_timer = 0
                 elif distance_to_player < 150:
                     # Charge at player
                     self.is_charging = True
-                    self.charge_timer = 30
+                    self.charge_timer = 30 - 1  # Counting this frame
                     if player.x > self.x:
                         self.vel_x = 4
                     else:
@@ -1068,7 +1806,7 @@ class Boss:
                     if not (player.punching or player.kicking):
                         player.lose_diamonds(self.base_damage + 2)
                         player.invulnerable = 45
-                        sound_manager.play_sound('robot_hit')
+                        events.push(EVENT_PLAYER_HIT, "boss")
                         
             elif self.attack_pattern == 1:  # Jump attack
                 if self.jump_timer > 60 and distance_to_player < 200:
@@ -1080,11 +1818,11 @@ class Boss:
                         player.invulnerable == 0):
                         player.lose_diamonds(self.base_damage + 5)
                         player.invulnerable = 90
-                        sound_manager.play_sound('robot_hit')
+                        events.push(EVENT_PLAYER_HIT, "boss")
                         
             elif self.attack_pattern == 2:  # Charge attack
                 self.is_charging = True
-                self.charge_timer = 45
+                self.charge_timer = 45 - 1  # Counting this frame
                 charge_speed = 5 + self.level
                 if player.x > self.x:
                     self.vel_x = charge_speed
@@ -1097,7 +1835,7 @@ class Boss:
                     not (player.punching or player.kicking)):
                     player.lose_diamonds(self.base_damage + 3)
                     player.invulnerable = 60
-                    sound_manager.play_sound('robot_hit')
+                    events.push(EVENT_PLAYER_HIT, "boss")
                     
             else:  # Defensive pattern with occasional strikes
                 self.vel_x *= 0.8  # Slow down
@@ -1106,15 +1844,13 @@ class Boss:
                     if player.invulnerable == 0:
                         player.lose_diamonds(self.base_damage)
                         player.invulnerable = 75
-                        sound_manager.play_sound('robot_hit')
+                        events.push(EVENT_PLAYER_HIT, "boss")
                     self.move_timer = 0
         
         # Handle charging state
-        if self.is_charging:
-            self.charge_timer -= 1
-            if self.charge_timer <= 0:
-                self.is_charging = False
-                self.vel_x *= 0.5  # Slow down after charge
+        if self.is_charging and self.charge_timer == 0:
+            self.is_charging = False
+            self.vel_x *= 0.5  # Slow down after charge
         
         # Enraged mode when health is low
         if health_percentage < 0.3:
@@ -1125,24 +1861,15 @@ class Boss:
                     not (player.punching or player.kicking)):
                     player.lose_diamonds(self.base_damage - 2)  # Slightly less damage but more frequent
                     player.invulnerable = 30
-                    sound_manager.play_sound('robot_hit')
+                    events.push(EVENT_PLAYER_HIT, "boss")
                     self.attack_timer = 0
         
         # Apply gravity
         self.vel_y += GRAVITY
         
-        # Update position
+        # Update position, landing on platforms
         self.x += self.vel_x
-        self.y += self.vel_y
-        
-        # Platform collision
-        boss_rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        
-        for platform in platforms:
-            if boss_rect.colliderect(platform.rect):
-                if self.vel_y > 0 and self.y < platform.rect.top:
-                    self.y = platform.rect.top - self.height
-                    self.vel_y = 0
+        move_vertically(self, terrain)
         
         # Keep boss in boss area (don't let it wander too far)
         if self.x < WORLD_WIDTH - 600:
@@ -1151,43 +1878,6 @@ class Boss:
         elif self.x > WORLD_WIDTH - 100:
             self.x = WORLD_WIDTH - 100
             self.vel_x = -abs(self.vel_x)  # Turn around
-                    
-        # Check if hit by player (with proper range and height checking)
-        vertical_distance = abs(self.y - player.y)
-        if (distance_to_player < PUNCH_RANGE and 
-            vertical_distance < 80 and  # Bosses are taller, so slightly more range
-            player.punching):
-            damage = 20 if player.powers["strength"] > 0 else 10
-            self.health -= damage
-            self.vel_x = 3 if player.facing_right else -3
-            sound_manager.play_sound('boss_hit')
-            
-        if (distance_to_player < KICK_RANGE and 
-            vertical_distance < 80 and  # Bosses are taller, so slightly more range
-            player.kicking):
-            damage = 35 if player.powers["strength"] > 0 else 20
-            self.health -= damage
-            self.vel_x = 5 if player.facing_right else -5
-            self.vel_y = -3
-            sound_manager.play_sound('boss_hit')
-            
-        # Check if jumped on (with cooldown to prevent infinite bouncing)
-        player_rect = pygame.Rect(player.x, player.y, player.width, player.height)
-        boss_rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        
-        if (player_rect.colliderect(boss_rect) and 
-            player_rect.bottom < boss_rect.centery and 
-            player.vel_y > 0 and 
-            player.jump_cooldown == 0):
-            self.health -= 15
-            player.vel_y = -12  # Bounce player up
-            player.jump_cooldown = 15  # Prevent immediate re-bounce
-            # Push the player up slightly to prevent getting stuck
-            player.y = self.y - player.height - 2
-            sound_manager.play_sound('boss_hit')
-            
-        if self.health <= 0:
-            self.alive = False
     
     def draw(self, screen, camera_x):
         if not self.alive:
@@ -1214,8 +1904,9 @@ class Boss:
                          boss_color[1], boss_color[2])
         
         # Pulsing effect
-        pulse = int(math.sin(self.animation) * 3)
-        pygame.draw.rect(screen, boss_color, 
+        detail = quality.level
+        pulse = int(math.sin(self.animation) * 3) if detail else 0
+        screen.rect(boss_color, 
                         (screen_x - pulse, self.y - pulse, 
                          self.width + pulse*2, self.height + pulse*2))
         
@@ -1223,7 +1914,7 @@ class Boss:
         head_color = (200, 200, 200)
         if self.is_charging:
             head_color = (255, 200, 200)
-        pygame.draw.rect(screen, head_color, 
+        screen.rect(head_color, 
                         (screen_x + 10, self.y - 15, self.width - 20, 20))
         
         # Glowing eyes - more intense when attacking
@@ -1237,21 +1928,21 @@ class Boss:
             eye_color = (255, 0, 0) if self.animation % 1 < 0.5 else (255, 100, 100)
             eye_size = 5
             
-        pygame.draw.circle(screen, eye_color, (int(screen_x + 20), int(self.y - 5)), eye_size)
-        pygame.draw.circle(screen, eye_color, (int(screen_x + self.width - 20), int(self.y - 5)), eye_size)
+        screen.circle(eye_color, (int(screen_x + 20), int(self.y - 5)), eye_size)
+        screen.circle(eye_color, (int(screen_x + self.width - 20), int(self.y - 5)), eye_size)
         
         # Attack pattern indicator
         if self.attack_pattern == 1:  # Jump attack mode
             # Show jump preparation
             for i in range(3):
-                pygame.draw.circle(screen, (255, 255, 0), 
+                screen.circle((255, 255, 0), 
                                  (int(screen_x + self.width//2), int(self.y + self.height + 5 + i*3)), 
                                  2)
         elif self.attack_pattern == 2 or self.is_charging:  # Charge mode
             # Show charge lines
-            for i in range(5):
+            for i in range(5 if detail == QUALITY_HIGH else detail * 2 + 1):
                 line_x = screen_x - 10 - i*5
-                pygame.draw.line(screen, (255, 100, 0), 
+                screen.line((255, 100, 0), 
                                (line_x, self.y + 20), (line_x, self.y + 60), 2)
         
         # Health bar
@@ -1262,13 +1953,11 @@ class Boss:
         if health_percentage < 0.3:
             bar_color = RED
             
-        pygame.draw.rect(screen, RED, (screen_x, self.y - 25, self.width, 6))
-        pygame.draw.rect(screen, bar_color, (screen_x, self.y - 25, bar_width, 6))
+        screen.rect(RED, (screen_x, self.y - 25, self.width, 6))
+        screen.rect(bar_color, (screen_x, self.y - 25, bar_width, 6))
         
         # Boss level indicator
-        font = pygame.font.Font(None, 24)
-        level_text = font.render(f"BOSS LV.{self.level}", True, WHITE)
-        screen.blit(level_text, (screen_x, self.y - 45))
+        screen.text(f"BOSS LV.{self.level}", 24, WHITE, (screen_x, self.y - 45))
         
         # Attack mode indicator
         if self.level > 2:
@@ -1285,9 +1974,274 @@ class Boss:
             if health_percentage < 0.3:
                 mode_text = "ENRAGED!"
                 
-            mode_font = pygame.font.Font(None, 18)
-            mode_surface = mode_font.render(mode_text, True, YELLOW)
-            screen.blit(mode_surface, (screen_x, self.y - 65))
+            screen.text(mode_text, 18, YELLOW, (screen_x, self.y - 65))
+
+class CombatSystem:
+    """Resolves the player's attacks against robots and the boss once per frame.
+    Active punches and kicks are hitboxes reaching PUNCH_RANGE/KICK_RANGE around
+    the player, and the player's body is a stomp volume while falling. Candidate
+    targets come from bisecting the x-sorted robot index, so the cost follows the
+    enemies near the player. Each swing keeps a registry of the targets it hit and
+    damages each of them once."""
+    ATTACKS = (("punch", PUNCH_RANGE), ("kick", KICK_RANGE))
+    
+    def __init__(self):
+        self.registries = {}  # attack -> (swing serial, set of targets already hit)
+        self.reset()
+    
+    def reset(self):
+        self.registries = {"punch": (0, set()), "kick": (0, set())}
+    
+    def _hitboxes(self, player):
+        """Attacks active this frame, with their registries reset on a new swing"""
+        active = []
+        for attack, reach in self.ATTACKS:
+            swinging = player.punching if attack == "punch" else player.kicking
+            if not swinging:
+                continue
+            swing = player.punch_swing if attack == "punch" else player.kick_swing
+            registry = self.registries[attack]
+            if registry[0] != swing:
+                registry = self.registries[attack] = (swing, set())
+            active.append((attack, reach, registry[1]))
+        return active
+    
+    def resolve(self, player, robot_index, boss):
+        """Apply this frame's hits; returns the targets defeated by them"""
+        hitboxes = self._hitboxes(player)
+        if not hitboxes and not (player.vel_y > 0 and player.jump_cooldown == 0):
+            return []
+        
+        # Broadphase: robots whose x is close enough for a hitbox or the stomp volume
+        reach = max((attack_reach for _, attack_reach, _ in hitboxes), default=0)
+        targets = robot_index.between(player.x - reach, player.x + max(reach, player.width))
+        if boss and boss.alive:
+            targets.append(boss)
+        metrics.collision_tests += len(targets)
+        
+        defeated = []
+        for target in targets:
+            if not target.alive:
+                continue
+            vertical_distance = abs(target.y - player.y)
+            for attack, attack_reach, hits in hitboxes:
+                if (target not in hits and abs(target.x - player.x) < attack_reach and
+                        vertical_distance < target.HIT_HEIGHT):
+                    hits.add(target)
+                    self._hit(target, attack, player)
+            
+            # Stomp: player above the target and moving downward
+            if player.vel_y > 0 and player.jump_cooldown == 0:
+                player_rect, target_rect = bounds(player), bounds(target)
+                if player_rect.colliderect(target_rect) and player_rect.bottom < target_rect.centery:
+                    self._hit(target, "stomp", player)
+                    player.vel_y = -12  # Bounce player up
+                    player.jump_cooldown = target.STOMP_COOLDOWN
+                    player.y = target.y - player.height - target.STOMP_CLEARANCE
+            
+            if target.health <= 0:
+                target.alive = False
+                defeated.append(target)
+                # Every registry, not just this frame's: defeated robots are
+                # recycled, and the save state packs registries by robot index
+                for _, hits in self.registries.values():
+                    hits.discard(target)
+        return defeated
+    
+    def _hit(self, target, attack, player):
+        """Apply damage, knockback, hit event and particles from the target's tables"""
+        normal, strong = target.DAMAGE[attack]
+        target.health -= strong if player.powers["strength"] > 0 else normal
+        knockback = target.KNOCKBACK.get(attack)
+        if knockback is not None:
+            vel_x, vel_y = knockback
+            target.vel_x = vel_x if player.facing_right else -vel_x
+            if vel_y is not None:
+                target.vel_y = vel_y
+        events.push(EVENT_HIT, target.HIT_EVENT)
+        kind, timer, size = target.HIT_PARTICLE
+        particles.spawn(kind, target.x + target.width / 2, target.y + target.height / 2, timer, size)
+
+class EntityPool:
+    """Free list for one entity class. Level loads acquire entities here and
+    Game hands them back when a level is unloaded or an entity is removed, so
+    level swaps reset existing objects instead of allocating new ones.
+    acquire(*args) is equivalent to cls(*args): entities implement reset(*args)
+    with the same arguments (and random draws) as their constructor."""
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+        self.created = 0  # Entities constructed because the pool was empty
+        self.reused = 0
+    
+    def acquire(self, *args):
+        if self.free:
+            entity = self.free.pop()
+            entity.reset(*args)
+            self.reused += 1
+            return entity
+        self.created += 1
+        return self.cls(*args)
+    
+    def release(self, entity):
+        """Return an entity nothing references any more"""
+        self.free.append(entity)
+    
+    def release_all(self, entities):
+        self.free.extend(entities)
+
+platform_pool = EntityPool(Platform)
+robot_pool = EntityPool(Robot)
+diamond_pool = EntityPool(Diamond)
+superdiamond_pool = EntityPool(SuperDiamond)
+boss_pool = EntityPool(Boss)
+
+class GCPolicy:
+    """Keeps cyclic garbage collection out of the simulation and render phases.
+    While active, automatic collection is disabled. Young generations are
+    collected at the end of a frame when their estimated cost fits in the time
+    left before the frame's deadline, and everything (including frozen objects)
+    is swept once per pause, level-complete or game-over screen. Level objects
+    are moved to the permanent generation with gc.freeze() after each load, so
+    collections only traverse objects created since. If frames never leave idle
+    time, a young collection is forced once garbage piles up past FORCE_FACTOR
+    thresholds, so memory stays bounded."""
+    IDLE_FRACTION = 0.75  # Share of the frame budget the frame may use before GC runs
+    FORCE_FACTOR = 8
+    
+    def __init__(self):
+        self.active = False
+        self.budget = self.IDLE_FRACTION / FPS
+        self.thresholds = gc.get_threshold()
+        self.cost = [0.0, 0.0, 0.0]  # Last measured pause per generation, in seconds
+        self.collections = [0, 0, 0]
+        self.pause_total = 0.0
+        self.pause_max = 0.0
+        self._swept = False
+    
+    def start(self):
+        self.thresholds = gc.get_threshold()
+        gc.disable()
+        self.active = True
+        self.level_loaded()
+    
+    def stop(self):
+        if self.active:
+            self.active = False
+            gc.enable()
+    
+    def level_loaded(self):
+        """Freeze everything alive now - modules, caches and the new level's objects"""
+        if self.active:
+            gc.freeze()
+    
+    def idle(self, deadline, transition=False):
+        """End-of-frame hook: collect what fits before deadline (a perf_counter
+        time); on transition screens, sweep the whole heap once"""
+        if not self.active:
+            return
+        if transition:
+            if not self._swept:
+                self._swept = True
+                gc.unfreeze()
+                self._collect(2)
+                gc.freeze()
+            return
+        self._swept = False
+        
+        count0, count1, count2 = gc.get_count()
+        threshold0, threshold1, threshold2 = self.thresholds
+        if count0 < threshold0:
+            return
+        if count1 >= threshold1 and count2 >= threshold2:
+            generation = 2
+        elif count1 >= threshold1:
+            generation = 1
+        else:
+            generation = 0
+        if time.perf_counter() + self.cost[generation] < deadline:
+            self._collect(generation)
+        elif count0 >= threshold0 * self.FORCE_FACTOR:
+            self._collect(generation)
+    
+    def _collect(self, generation):
+        start = time.perf_counter()
+        gc.collect(generation)
+        pause = time.perf_counter() - start
+        self.cost[generation] = pause
+        self.collections[generation] += 1
+        self.pause_total += pause
+        self.pause_max = max(self.pause_max, pause)
+
+gc_policy = GCPolicy()
+
+class QualityGovernor:
+    """Picks the visual effect tier (QUALITY_LEVELS) from recent frame times.
+    In auto mode the game loop reports each presented frame's work time (not
+    the sleep after it). The tier steps down when most of the last DOWN_FRAMES
+    frames used over DOWN_LOAD of the frame budget. It steps back up after
+    up_frames frames of which 90% stayed under UP_LOAD. Stepping down soon
+    after stepping up doubles up_frames (up to 8x), so a machine at the edge
+    of a tier does not flip between tiers. A manual setting stays fixed."""
+    DOWN_LOAD = 0.85
+    UP_LOAD = 0.5
+    DOWN_FRAMES = 30
+    UP_FRAMES = 180
+    
+    def __init__(self):
+        self.budget = 1.0 / FPS
+        self.set("auto")
+    
+    def set(self, setting):
+        """"auto", or a fixed tier name from QUALITY_LEVELS"""
+        self.auto = setting == "auto"
+        self.level = QUALITY_HIGH if self.auto else QUALITY_LEVELS.index(setting)
+        self.up_frames = self.UP_FRAMES
+        self.frames = 0
+        self.changes = 0
+        self._raised = None  # Frame the tier last stepped up on
+        self._reset()
+    
+    def _reset(self):
+        self._recent = deque(maxlen=self.DOWN_FRAMES)  # Over DOWN_LOAD?
+        self._slow = 0
+        self._window = 0
+        self._calm = 0
+    
+    def frame(self, seconds):
+        """Record the work time of a presented frame and step the tier if needed"""
+        if not self.auto:
+            return
+        self.frames += 1
+        recent = self._recent
+        if len(recent) == recent.maxlen:
+            self._slow -= recent[0]
+        slow = seconds > self.DOWN_LOAD * self.budget
+        recent.append(slow)
+        self._slow += slow
+        if self._slow > recent.maxlen // 2 and self.level > QUALITY_LOW:
+            if self._raised is not None and self.frames - self._raised < self.up_frames:
+                self.up_frames = min(self.up_frames * 2, self.UP_FRAMES * 8)
+                self._raised = None
+            self._change(-1)
+            return
+        
+        self._window += 1
+        self._calm += seconds < self.UP_LOAD * self.budget
+        if self._window >= self.up_frames:
+            if self._calm >= 0.9 * self._window and self.level < QUALITY_HIGH:
+                self._raised = self.frames
+                self._change(1)
+            else:
+                self._window = self._calm = 0
+    
+    def _change(self, step):
+        self.level += step
+        self.changes += 1
+        self._reset()
+        print(f"Visual quality: {QUALITY_LEVELS[self.level]}", file=sys.stderr)
+
+quality = QualityGovernor()
 
 def create_level(level_num):
     platforms = []
@@ -1298,518 +2252,518 @@ def create_level(level_num):
     
     # Base ground platforms - connected with no gaps
     for i in range(0, WORLD_WIDTH, 200):
-        platforms.append(Platform(i, SCREEN_HEIGHT - 40, 200, 40))  # Changed from 180 to 200 to eliminate gaps
+        platforms.append(platform_pool.acquire(i, SCREEN_HEIGHT - 40, 200, 40))  # Changed from 180 to 200 to eliminate gaps
     
     # Boss platform at the very end
     boss_platform_x = WORLD_WIDTH - 300
-    platforms.append(Platform(boss_platform_x, SCREEN_HEIGHT - 100, 250, 60))
+    platforms.append(platform_pool.acquire(boss_platform_x, SCREEN_HEIGHT - 100, 250, 60))
     
     if level_num == 1:
         # Level 1 - HARDER: Increased gaps and more challenging jumps
         platforms.extend([
-            Platform(250, SCREEN_HEIGHT - 150, 100, 30),  # Smaller platform
-            Platform(450, SCREEN_HEIGHT - 220, 120, 30),  # Higher and further
-            Platform(700, SCREEN_HEIGHT - 180, 80, 30),   # Smaller and further
-            Platform(950, SCREEN_HEIGHT - 280, 100, 30),  # High jump (reduced from 300)
-            Platform(1200, SCREEN_HEIGHT - 320, 120, 30), # Higher still (reduced from 350)
-            Platform(1450, SCREEN_HEIGHT - 250, 80, 30),  # Smaller platform
-            Platform(1700, SCREEN_HEIGHT - 310, 100, 30), # High jump (reduced from 350 to 310 - accessible with boost)
+            platform_pool.acquire(250, SCREEN_HEIGHT - 150, 100, 30),  # Smaller platform
+            platform_pool.acquire(450, SCREEN_HEIGHT - 220, 120, 30),  # Higher and further
+            platform_pool.acquire(700, SCREEN_HEIGHT - 180, 80, 30),   # Smaller and further
+            platform_pool.acquire(950, SCREEN_HEIGHT - 280, 100, 30),  # High jump (reduced from 300)
+            platform_pool.acquire(1200, SCREEN_HEIGHT - 320, 120, 30), # Higher still (reduced from 350)
+            platform_pool.acquire(1450, SCREEN_HEIGHT - 250, 80, 30),  # Smaller platform
+            platform_pool.acquire(1700, SCREEN_HEIGHT - 310, 100, 30), # High jump (reduced from 350 to 310 - accessible with boost)
         ])
         
         # Robots (not near boss area)
         robots.extend([
-            Robot(250, SCREEN_HEIGHT - 80),
-            Robot(400, SCREEN_HEIGHT - 80),
-            Robot(650, SCREEN_HEIGHT - 210),
-            Robot(850, SCREEN_HEIGHT - 310),
-            Robot(1050, SCREEN_HEIGHT - 350),
-            Robot(1250, SCREEN_HEIGHT - 280),
+            robot_pool.acquire(250, SCREEN_HEIGHT - 80),
+            robot_pool.acquire(400, SCREEN_HEIGHT - 80),
+            robot_pool.acquire(650, SCREEN_HEIGHT - 210),
+            robot_pool.acquire(850, SCREEN_HEIGHT - 310),
+            robot_pool.acquire(1050, SCREEN_HEIGHT - 350),
+            robot_pool.acquire(1250, SCREEN_HEIGHT - 280),
         ])
         
-        boss = Boss(boss_platform_x + 50, SCREEN_HEIGHT - 160, 1)
+        boss = boss_pool.acquire(boss_platform_x + 50, SCREEN_HEIGHT - 160, 1)
         
     elif level_num == 2:
         # Level 2 - HARDER: More complex with challenging gaps
         platforms.extend([
-            Platform(200, SCREEN_HEIGHT - 120, 80, 30),   # Smaller platform
-            Platform(380, SCREEN_HEIGHT - 220, 100, 30),  # Higher gap
-            Platform(580, SCREEN_HEIGHT - 160, 70, 30),   # Very small platform
-            Platform(750, SCREEN_HEIGHT - 280, 90, 30),   # High jump required (reduced from 300)
-            Platform(950, SCREEN_HEIGHT - 240, 100, 30),  # Wide gap
-            Platform(1150, SCREEN_HEIGHT - 310, 80, 30),  # High jump (reduced from 350 to 310 - accessible with boost)
-            Platform(1350, SCREEN_HEIGHT - 200, 120, 30), # Big drop then climb
-            Platform(1550, SCREEN_HEIGHT - 310, 100, 30), # High jump (reduced from 380 to 310 - accessible with boost)
-            Platform(1750, SCREEN_HEIGHT - 280, 80, 30),  # Reduced from 320 for easier access
-            Platform(1950, SCREEN_HEIGHT - 310, 100, 30), # High jump (reduced from 380 to 310 - accessible with boost)
-            Platform(2150, SCREEN_HEIGHT - 280, 90, 30),  # Long gap
+            platform_pool.acquire(200, SCREEN_HEIGHT - 120, 80, 30),   # Smaller platform
+            platform_pool.acquire(380, SCREEN_HEIGHT - 220, 100, 30),  # Higher gap
+            platform_pool.acquire(580, SCREEN_HEIGHT - 160, 70, 30),   # Very small platform
+            platform_pool.acquire(750, SCREEN_HEIGHT - 280, 90, 30),   # High jump required (reduced from 300)
+            platform_pool.acquire(950, SCREEN_HEIGHT - 240, 100, 30),  # Wide gap
+            platform_pool.acquire(1150, SCREEN_HEIGHT - 310, 80, 30),  # High jump (reduced from 350 to 310 - accessible with boost)
+            platform_pool.acquire(1350, SCREEN_HEIGHT - 200, 120, 30), # Big drop then climb
+            platform_pool.acquire(1550, SCREEN_HEIGHT - 310, 100, 30), # High jump (reduced from 380 to 310 - accessible with boost)
+            platform_pool.acquire(1750, SCREEN_HEIGHT - 280, 80, 30),  # Reduced from 320 for easier access
+            platform_pool.acquire(1950, SCREEN_HEIGHT - 310, 100, 30), # High jump (reduced from 380 to 310 - accessible with boost)
+            platform_pool.acquire(2150, SCREEN_HEIGHT - 280, 90, 30),  # Long gap
         ])
         
         # Robots (not near boss area)
         robots.extend([
-            Robot(200, SCREEN_HEIGHT - 80),
-            Robot(350, SCREEN_HEIGHT - 230),
-            Robot(500, SCREEN_HEIGHT - 190),
-            Robot(650, SCREEN_HEIGHT - 310),
-            Robot(800, SCREEN_HEIGHT - 250),
-            Robot(950, SCREEN_HEIGHT - 380),
-            Robot(1100, SCREEN_HEIGHT - 210),
-            Robot(1250, SCREEN_HEIGHT - 330),
-            Robot(1400, SCREEN_HEIGHT - 480),
+            robot_pool.acquire(200, SCREEN_HEIGHT - 80),
+            robot_pool.acquire(350, SCREEN_HEIGHT - 230),
+            robot_pool.acquire(500, SCREEN_HEIGHT - 190),
+            robot_pool.acquire(650, SCREEN_HEIGHT - 310),
+            robot_pool.acquire(800, SCREEN_HEIGHT - 250),
+            robot_pool.acquire(950, SCREEN_HEIGHT - 380),
+            robot_pool.acquire(1100, SCREEN_HEIGHT - 210),
+            robot_pool.acquire(1250, SCREEN_HEIGHT - 330),
+            robot_pool.acquire(1400, SCREEN_HEIGHT - 480),
         ])
         
-        boss = Boss(boss_platform_x + 50, SCREEN_HEIGHT - 160, 2)
+        boss = boss_pool.acquire(boss_platform_x + 50, SCREEN_HEIGHT - 160, 2)
         
     elif level_num == 3:
         # Level 3 - Vertical challenges
         platforms.extend([
-            Platform(150, SCREEN_HEIGHT - 100, 80, 30),
-            Platform(300, SCREEN_HEIGHT - 180, 100, 30),
-            Platform(500, SCREEN_HEIGHT - 260, 80, 30),
-            Platform(700, SCREEN_HEIGHT - 340, 100, 30),
-            Platform(900, SCREEN_HEIGHT - 420, 80, 30),
-            Platform(1100, SCREEN_HEIGHT - 400, 100, 30),  # Reduced from 500 to 400 for accessibility
-            Platform(1300, SCREEN_HEIGHT - 380, 120, 30),
-            Platform(1500, SCREEN_HEIGHT - 280, 100, 30),
-            Platform(1700, SCREEN_HEIGHT - 200, 80, 30),
-            Platform(1900, SCREEN_HEIGHT - 320, 100, 30),
-            Platform(2100, SCREEN_HEIGHT - 450, 120, 30),
-            Platform(2300, SCREEN_HEIGHT - 350, 100, 30),
+            platform_pool.acquire(150, SCREEN_HEIGHT - 100, 80, 30),
+            platform_pool.acquire(300, SCREEN_HEIGHT - 180, 100, 30),
+            platform_pool.acquire(500, SCREEN_HEIGHT - 260, 80, 30),
+            platform_pool.acquire(700, SCREEN_HEIGHT - 340, 100, 30),
+            platform_pool.acquire(900, SCREEN_HEIGHT - 420, 80, 30),
+            platform_pool.acquire(1100, SCREEN_HEIGHT - 400, 100, 30),  # Reduced from 500 to 400 for accessibility
+            platform_pool.acquire(1300, SCREEN_HEIGHT - 380, 120, 30),
+            platform_pool.acquire(1500, SCREEN_HEIGHT - 280, 100, 30),
+            platform_pool.acquire(1700, SCREEN_HEIGHT - 200, 80, 30),
+            platform_pool.acquire(1900, SCREEN_HEIGHT - 320, 100, 30),
+            platform_pool.acquire(2100, SCREEN_HEIGHT - 450, 120, 30),
+            platform_pool.acquire(2300, SCREEN_HEIGHT - 350, 100, 30),
         ])
         
         robots.extend([
-            Robot(200, SCREEN_HEIGHT - 130),
-            Robot(350, SCREEN_HEIGHT - 210),
-            Robot(550, SCREEN_HEIGHT - 290),
-            Robot(750, SCREEN_HEIGHT - 370),
-            Robot(950, SCREEN_HEIGHT - 450),
-            Robot(1150, SCREEN_HEIGHT - 530),
-            Robot(1350, SCREEN_HEIGHT - 410),
-            Robot(1550, SCREEN_HEIGHT - 310),
-            Robot(1950, SCREEN_HEIGHT - 350),
-            Robot(2150, SCREEN_HEIGHT - 480),
-            Robot(2350, SCREEN_HEIGHT - 380),
+            robot_pool.acquire(200, SCREEN_HEIGHT - 130),
+            robot_pool.acquire(350, SCREEN_HEIGHT - 210),
+            robot_pool.acquire(550, SCREEN_HEIGHT - 290),
+            robot_pool.acquire(750, SCREEN_HEIGHT - 370),
+            robot_pool.acquire(950, SCREEN_HEIGHT - 450),
+            robot_pool.acquire(1150, SCREEN_HEIGHT - 530),
+            robot_pool.acquire(1350, SCREEN_HEIGHT - 410),
+            robot_pool.acquire(1550, SCREEN_HEIGHT - 310),
+            robot_pool.acquire(1950, SCREEN_HEIGHT - 350),
+            robot_pool.acquire(2150, SCREEN_HEIGHT - 480),
+            robot_pool.acquire(2350, SCREEN_HEIGHT - 380),
         ])
         
-        boss = Boss(boss_platform_x + 50, SCREEN_HEIGHT - 160, 3)
+        boss = boss_pool.acquire(boss_platform_x + 50, SCREEN_HEIGHT - 160, 3)
         
     elif level_num == 4:
         # Level 4 - Mixed challenges with tougher robots
         platforms.extend([
-            Platform(100, SCREEN_HEIGHT - 120, 100, 30),
-            Platform(250, SCREEN_HEIGHT - 200, 80, 30),
-            Platform(400, SCREEN_HEIGHT - 150, 120, 30),
-            Platform(600, SCREEN_HEIGHT - 280, 100, 30),
-            Platform(800, SCREEN_HEIGHT - 200, 80, 30),
-            Platform(1000, SCREEN_HEIGHT - 350, 120, 30),
-            Platform(1200, SCREEN_HEIGHT - 250, 100, 30),
-            Platform(1400, SCREEN_HEIGHT - 400, 80, 30),
-            Platform(1600, SCREEN_HEIGHT - 180, 120, 30),
-            Platform(1800, SCREEN_HEIGHT - 320, 100, 30),
-            Platform(2000, SCREEN_HEIGHT - 450, 120, 30),
-            Platform(2200, SCREEN_HEIGHT - 280, 100, 30),
-            Platform(2400, SCREEN_HEIGHT - 380, 80, 30),
+            platform_pool.acquire(100, SCREEN_HEIGHT - 120, 100, 30),
+            platform_pool.acquire(250, SCREEN_HEIGHT - 200, 80, 30),
+            platform_pool.acquire(400, SCREEN_HEIGHT - 150, 120, 30),
+            platform_pool.acquire(600, SCREEN_HEIGHT - 280, 100, 30),
+            platform_pool.acquire(800, SCREEN_HEIGHT - 200, 80, 30),
+            platform_pool.acquire(1000, SCREEN_HEIGHT - 350, 120, 30),
+            platform_pool.acquire(1200, SCREEN_HEIGHT - 250, 100, 30),
+            platform_pool.acquire(1400, SCREEN_HEIGHT - 400, 80, 30),
+            platform_pool.acquire(1600, SCREEN_HEIGHT - 180, 120, 30),
+            platform_pool.acquire(1800, SCREEN_HEIGHT - 320, 100, 30),
+            platform_pool.acquire(2000, SCREEN_HEIGHT - 450, 120, 30),
+            platform_pool.acquire(2200, SCREEN_HEIGHT - 280, 100, 30),
+            platform_pool.acquire(2400, SCREEN_HEIGHT - 380, 80, 30),
         ])
         
         robots.extend([
-            Robot(150, SCREEN_HEIGHT - 80, "tough"),
-            Robot(300, SCREEN_HEIGHT - 230, "normal"),
-            Robot(450, SCREEN_HEIGHT - 180, "tough"),
-            Robot(650, SCREEN_HEIGHT - 310, "normal"),
-            Robot(850, SCREEN_HEIGHT - 230, "tough"),
-            Robot(1050, SCREEN_HEIGHT - 380, "normal"),
-            Robot(1250, SCREEN_HEIGHT - 280, "tough"),
-            Robot(1450, SCREEN_HEIGHT - 430, "normal"),
-            Robot(1650, SCREEN_HEIGHT - 210, "tough"),
-            Robot(1850, SCREEN_HEIGHT - 350, "normal"),
-            Robot(2050, SCREEN_HEIGHT - 480, "tough"),
-            Robot(2250, SCREEN_HEIGHT - 310, "normal"),
+            robot_pool.acquire(150, SCREEN_HEIGHT - 80, "tough"),
+            robot_pool.acquire(300, SCREEN_HEIGHT - 230, "normal"),
+            robot_pool.acquire(450, SCREEN_HEIGHT - 180, "tough"),
+            robot_pool.acquire(650, SCREEN_HEIGHT - 310, "normal"),
+            robot_pool.acquire(850, SCREEN_HEIGHT - 230, "tough"),
+            robot_pool.acquire(1050, SCREEN_HEIGHT - 380, "normal"),
+            robot_pool.acquire(1250, SCREEN_HEIGHT - 280, "tough"),
+            robot_pool.acquire(1450, SCREEN_HEIGHT - 430, "normal"),
+            robot_pool.acquire(1650, SCREEN_HEIGHT - 210, "tough"),
+            robot_pool.acquire(1850, SCREEN_HEIGHT - 350, "normal"),
+            robot_pool.acquire(2050, SCREEN_HEIGHT - 480, "tough"),
+            robot_pool.acquire(2250, SCREEN_HEIGHT - 310, "normal"),
         ])
         
-        boss = Boss(boss_platform_x + 50, SCREEN_HEIGHT - 160, 4)
+        boss = boss_pool.acquire(boss_platform_x + 50, SCREEN_HEIGHT - 160, 4)
         
     elif level_num == 5:  # Level 5 - Ultimate challenge
         # Level 5 - Ultimate challenge
         platforms.extend([
-            Platform(80, SCREEN_HEIGHT - 100, 80, 30),
-            Platform(200, SCREEN_HEIGHT - 180, 60, 30),
-            Platform(320, SCREEN_HEIGHT - 260, 80, 30),
-            Platform(480, SCREEN_HEIGHT - 340, 60, 30),
-            Platform(600, SCREEN_HEIGHT - 420, 80, 30),
-            Platform(750, SCREEN_HEIGHT - 400, 60, 30),   # Reduced from 500 to 400 for accessibility
-            Platform(900, SCREEN_HEIGHT - 380, 80, 30),
-            Platform(1050, SCREEN_HEIGHT - 280, 60, 30),
-            Platform(1200, SCREEN_HEIGHT - 200, 80, 30),
-            Platform(1350, SCREEN_HEIGHT - 320, 60, 30),
-            Platform(1500, SCREEN_HEIGHT - 450, 80, 30),
-            Platform(1650, SCREEN_HEIGHT - 350, 60, 30),
-            Platform(1800, SCREEN_HEIGHT - 250, 80, 30),
-            Platform(1950, SCREEN_HEIGHT - 400, 60, 30),
-            Platform(2100, SCREEN_HEIGHT - 300, 80, 30),
-            Platform(2250, SCREEN_HEIGHT - 400, 60, 30),  # Reduced from 480 to 400 for accessibility
-            Platform(2400, SCREEN_HEIGHT - 380, 80, 30),
+            platform_pool.acquire(80, SCREEN_HEIGHT - 100, 80, 30),
+            platform_pool.acquire(200, SCREEN_HEIGHT - 180, 60, 30),
+            platform_pool.acquire(320, SCREEN_HEIGHT - 260, 80, 30),
+            platform_pool.acquire(480, SCREEN_HEIGHT - 340, 60, 30),
+            platform_pool.acquire(600, SCREEN_HEIGHT - 420, 80, 30),
+            platform_pool.acquire(750, SCREEN_HEIGHT - 400, 60, 30),   # Reduced from 500 to 400 for accessibility
+            platform_pool.acquire(900, SCREEN_HEIGHT - 380, 80, 30),
+            platform_pool.acquire(1050, SCREEN_HEIGHT - 280, 60, 30),
+            platform_pool.acquire(1200, SCREEN_HEIGHT - 200, 80, 30),
+            platform_pool.acquire(1350, SCREEN_HEIGHT - 320, 60, 30),
+            platform_pool.acquire(1500, SCREEN_HEIGHT - 450, 80, 30),
+            platform_pool.acquire(1650, SCREEN_HEIGHT - 350, 60, 30),
+            platform_pool.acquire(1800, SCREEN_HEIGHT - 250, 80, 30),
+            platform_pool.acquire(1950, SCREEN_HEIGHT - 400, 60, 30),
+            platform_pool.acquire(2100, SCREEN_HEIGHT - 300, 80, 30),
+            platform_pool.acquire(2250, SCREEN_HEIGHT - 400, 60, 30),  # Reduced from 480 to 400 for accessibility
+            platform_pool.acquire(2400, SCREEN_HEIGHT - 380, 80, 30),
         ])
         
         robots.extend([
-            Robot(130, SCREEN_HEIGHT - 80, "tough"),
-            Robot(250, SCREEN_HEIGHT - 210, "tough"),
-            Robot(370, SCREEN_HEIGHT - 290, "tough"),
-            Robot(530, SCREEN_HEIGHT - 370, "tough"),
-            Robot(650, SCREEN_HEIGHT - 450, "tough"),
-            Robot(800, SCREEN_HEIGHT - 530, "tough"),
-            Robot(950, SCREEN_HEIGHT - 410, "tough"),
-            Robot(1100, SCREEN_HEIGHT - 310, "tough"),
-            Robot(1250, SCREEN_HEIGHT - 230, "tough"),
-            Robot(1400, SCREEN_HEIGHT - 350, "tough"),
-            Robot(1550, SCREEN_HEIGHT - 480, "tough"),
-            Robot(1700, SCREEN_HEIGHT - 380, "tough"),
-            Robot(1850, SCREEN_HEIGHT - 280, "tough"),
-            Robot(2000, SCREEN_HEIGHT - 430, "tough"),
-            Robot(2150, SCREEN_HEIGHT - 330, "tough"),
-            Robot(2300, SCREEN_HEIGHT - 510, "tough"),
+            robot_pool.acquire(130, SCREEN_HEIGHT - 80, "tough"),
+            robot_pool.acquire(250, SCREEN_HEIGHT - 210, "tough"),
+            robot_pool.acquire(370, SCREEN_HEIGHT - 290, "tough"),
+            robot_pool.acquire(530, SCREEN_HEIGHT - 370, "tough"),
+            robot_pool.acquire(650, SCREEN_HEIGHT - 450, "tough"),
+            robot_pool.acquire(800, SCREEN_HEIGHT - 530, "tough"),
+            robot_pool.acquire(950, SCREEN_HEIGHT - 410, "tough"),
+            robot_pool.acquire(1100, SCREEN_HEIGHT - 310, "tough"),
+            robot_pool.acquire(1250, SCREEN_HEIGHT - 230, "tough"),
+            robot_pool.acquire(1400, SCREEN_HEIGHT - 350, "tough"),
+            robot_pool.acquire(1550, SCREEN_HEIGHT - 480, "tough"),
+            robot_pool.acquire(1700, SCREEN_HEIGHT - 380, "tough"),
+            robot_pool.acquire(1850, SCREEN_HEIGHT - 280, "tough"),
+            robot_pool.acquire(2000, SCREEN_HEIGHT - 430, "tough"),
+            robot_pool.acquire(2150, SCREEN_HEIGHT - 330, "tough"),
+            robot_pool.acquire(2300, SCREEN_HEIGHT - 510, "tough"),
         ])
         
-        boss = Boss(boss_platform_x + 50, SCREEN_HEIGHT - 160, 5)
+        boss = boss_pool.acquire(boss_platform_x + 50, SCREEN_HEIGHT - 160, 5)
         
     elif level_num == 6:
         # Level 6 - Narrow platforms challenge
         platforms.extend([
-            Platform(120, SCREEN_HEIGHT - 100, 60, 30),
-            Platform(220, SCREEN_HEIGHT - 180, 60, 30),
-            Platform(350, SCREEN_HEIGHT - 260, 60, 30),
-            Platform(480, SCREEN_HEIGHT - 340, 60, 30),
-            Platform(610, SCREEN_HEIGHT - 420, 60, 30),
-            Platform(740, SCREEN_HEIGHT - 400, 60, 30),   # Reduced from 500 to 400 for accessibility
-            Platform(870, SCREEN_HEIGHT - 420, 60, 30),
-            Platform(1000, SCREEN_HEIGHT - 340, 60, 30),
-            Platform(1130, SCREEN_HEIGHT - 260, 60, 30),
-            Platform(1260, SCREEN_HEIGHT - 180, 60, 30),
-            Platform(1390, SCREEN_HEIGHT - 100, 60, 30),
-            Platform(1520, SCREEN_HEIGHT - 200, 80, 30),
-            Platform(1650, SCREEN_HEIGHT - 350, 60, 30),
-            Platform(1780, SCREEN_HEIGHT - 450, 60, 30),
-            Platform(1910, SCREEN_HEIGHT - 350, 60, 30),
-            Platform(2040, SCREEN_HEIGHT - 250, 80, 30),
-            Platform(2170, SCREEN_HEIGHT - 400, 60, 30),
-            Platform(2300, SCREEN_HEIGHT - 300, 60, 30),
-            Platform(2430, SCREEN_HEIGHT - 200, 80, 30),
+            platform_pool.acquire(120, SCREEN_HEIGHT - 100, 60, 30),
+            platform_pool.acquire(220, SCREEN_HEIGHT - 180, 60, 30),
+            platform_pool.acquire(350, SCREEN_HEIGHT - 260, 60, 30),
+            platform_pool.acquire(480, SCREEN_HEIGHT - 340, 60, 30),
+            platform_pool.acquire(610, SCREEN_HEIGHT - 420, 60, 30),
+            platform_pool.acquire(740, SCREEN_HEIGHT - 400, 60, 30),   # Reduced from 500 to 400 for accessibility
+            platform_pool.acquire(870, SCREEN_HEIGHT - 420, 60, 30),
+            platform_pool.acquire(1000, SCREEN_HEIGHT - 340, 60, 30),
+            platform_pool.acquire(1130, SCREEN_HEIGHT - 260, 60, 30),
+            platform_pool.acquire(1260, SCREEN_HEIGHT - 180, 60, 30),
+            platform_pool.acquire(1390, SCREEN_HEIGHT - 100, 60, 30),
+            platform_pool.acquire(1520, SCREEN_HEIGHT - 200, 80, 30),
+            platform_pool.acquire(1650, SCREEN_HEIGHT - 350, 60, 30),
+            platform_pool.acquire(1780, SCREEN_HEIGHT - 450, 60, 30),
+            platform_pool.acquire(1910, SCREEN_HEIGHT - 350, 60, 30),
+            platform_pool.acquire(2040, SCREEN_HEIGHT - 250, 80, 30),
+            platform_pool.acquire(2170, SCREEN_HEIGHT - 400, 60, 30),
+            platform_pool.acquire(2300, SCREEN_HEIGHT - 300, 60, 30),
+            platform_pool.acquire(2430, SCREEN_HEIGHT - 200, 80, 30),
         ])
         
         robots.extend([
-            Robot(150, SCREEN_HEIGHT - 80, "tough"),
-            Robot(250, SCREEN_HEIGHT - 210, "tough"),
-            Robot(380, SCREEN_HEIGHT - 290, "tough"),
-            Robot(510, SCREEN_HEIGHT - 370, "tough"),
-            Robot(640, SCREEN_HEIGHT - 450, "tough"),
-            Robot(770, SCREEN_HEIGHT - 530, "tough"),
-            Robot(900, SCREEN_HEIGHT - 450, "tough"),
-            Robot(1030, SCREEN_HEIGHT - 370, "tough"),
-            Robot(1160, SCREEN_HEIGHT - 290, "tough"),
-            Robot(1290, SCREEN_HEIGHT - 210, "tough"),
-            Robot(1420, SCREEN_HEIGHT - 130, "tough"),
-            Robot(1550, SCREEN_HEIGHT - 230, "tough"),
-            Robot(1680, SCREEN_HEIGHT - 380, "tough"),
-            Robot(1810, SCREEN_HEIGHT - 480, "tough"),
-            Robot(1940, SCREEN_HEIGHT - 380, "tough"),
-            Robot(2070, SCREEN_HEIGHT - 280, "tough"),
-            Robot(2200, SCREEN_HEIGHT - 430, "tough"),
-            Robot(2330, SCREEN_HEIGHT - 330, "tough"),
+            robot_pool.acquire(150, SCREEN_HEIGHT - 80, "tough"),
+            robot_pool.acquire(250, SCREEN_HEIGHT - 210, "tough"),
+            robot_pool.acquire(380, SCREEN_HEIGHT - 290, "tough"),
+            robot_pool.acquire(510, SCREEN_HEIGHT - 370, "tough"),
+            robot_pool.acquire(640, SCREEN_HEIGHT - 450, "tough"),
+            robot_pool.acquire(770, SCREEN_HEIGHT - 530, "tough"),
+            robot_pool.acquire(900, SCREEN_HEIGHT - 450, "tough"),
+            robot_pool.acquire(1030, SCREEN_HEIGHT - 370, "tough"),
+            robot_pool.acquire(1160, SCREEN_HEIGHT - 290, "tough"),
+            robot_pool.acquire(1290, SCREEN_HEIGHT - 210, "tough"),
+            robot_pool.acquire(1420, SCREEN_HEIGHT - 130, "tough"),
+            robot_pool.acquire(1550, SCREEN_HEIGHT - 230, "tough"),
+            robot_pool.acquire(1680, SCREEN_HEIGHT - 380, "tough"),
+            robot_pool.acquire(1810, SCREEN_HEIGHT - 480, "tough"),
+            robot_pool.acquire(1940, SCREEN_HEIGHT - 380, "tough"),
+            robot_pool.acquire(2070, SCREEN_HEIGHT - 280, "tough"),
+            robot_pool.acquire(2200, SCREEN_HEIGHT - 430, "tough"),
+            robot_pool.acquire(2330, SCREEN_HEIGHT - 330, "tough"),
         ])
         
-        boss = Boss(boss_platform_x + 50, SCREEN_HEIGHT - 160, 6)
+        boss = boss_pool.acquire(boss_platform_x + 50, SCREEN_HEIGHT - 160, 6)
         
     elif level_num == 7:
         # Level 7 - Speed and agility test
         platforms.extend([
-            Platform(100, SCREEN_HEIGHT - 120, 80, 30),
-            Platform(250, SCREEN_HEIGHT - 200, 70, 30),
-            Platform(380, SCREEN_HEIGHT - 280, 60, 30),
-            Platform(500, SCREEN_HEIGHT - 360, 70, 30),
-            Platform(650, SCREEN_HEIGHT - 440, 60, 30),
-            Platform(780, SCREEN_HEIGHT - 400, 70, 30),   # Reduced from 520 to 400 for accessibility
-            Platform(920, SCREEN_HEIGHT - 440, 60, 30),
-            Platform(1050, SCREEN_HEIGHT - 360, 70, 30),
-            Platform(1200, SCREEN_HEIGHT - 280, 60, 30),
-            Platform(1330, SCREEN_HEIGHT - 200, 70, 30),
-            Platform(1480, SCREEN_HEIGHT - 120, 80, 30),
-            Platform(1630, SCREEN_HEIGHT - 240, 60, 30),
-            Platform(1750, SCREEN_HEIGHT - 360, 70, 30),
-            Platform(1900, SCREEN_HEIGHT - 480, 60, 30),
-            Platform(2030, SCREEN_HEIGHT - 360, 70, 30),
-            Platform(2180, SCREEN_HEIGHT - 240, 60, 30),
-            Platform(2310, SCREEN_HEIGHT - 120, 80, 30),
-            Platform(2460, SCREEN_HEIGHT - 280, 60, 30),
+            platform_pool.acquire(100, SCREEN_HEIGHT - 120, 80, 30),
+            platform_pool.acquire(250, SCREEN_HEIGHT - 200, 70, 30),
+            platform_pool.acquire(380, SCREEN_HEIGHT - 280, 60, 30),
+            platform_pool.acquire(500, SCREEN_HEIGHT - 360, 70, 30),
+            platform_pool.acquire(650, SCREEN_HEIGHT - 440, 60, 30),
+            platform_pool.acquire(780, SCREEN_HEIGHT - 400, 70, 30),   # Reduced from 520 to 400 for accessibility
+            platform_pool.acquire(920, SCREEN_HEIGHT - 440, 60, 30),
+            platform_pool.acquire(1050, SCREEN_HEIGHT - 360, 70, 30),
+            platform_pool.acquire(1200, SCREEN_HEIGHT - 280, 60, 30),
+            platform_pool.acquire(1330, SCREEN_HEIGHT - 200, 70, 30),
+            platform_pool.acquire(1480, SCREEN_HEIGHT - 120, 80, 30),
+            platform_pool.acquire(1630, SCREEN_HEIGHT - 240, 60, 30),
+            platform_pool.acquire(1750, SCREEN_HEIGHT - 360, 70, 30),
+            platform_pool.acquire(1900, SCREEN_HEIGHT - 480, 60, 30),
+            platform_pool.acquire(2030, SCREEN_HEIGHT - 360, 70, 30),
+            platform_pool.acquire(2180, SCREEN_HEIGHT - 240, 60, 30),
+            platform_pool.acquire(2310, SCREEN_HEIGHT - 120, 80, 30),
+            platform_pool.acquire(2460, SCREEN_HEIGHT - 280, 60, 30),
         ])
         
         # More robots with faster movement
         robots.extend([
-            Robot(130, SCREEN_HEIGHT - 80, "tough"),
-            Robot(280, SCREEN_HEIGHT - 230, "tough"),
-            Robot(410, SCREEN_HEIGHT - 310, "tough"),
-            Robot(530, SCREEN_HEIGHT - 390, "tough"),
-            Robot(680, SCREEN_HEIGHT - 470, "tough"),
-            Robot(810, SCREEN_HEIGHT - 550, "tough"),
-            Robot(950, SCREEN_HEIGHT - 470, "tough"),
-            Robot(1080, SCREEN_HEIGHT - 390, "tough"),
-            Robot(1230, SCREEN_HEIGHT - 310, "tough"),
-            Robot(1360, SCREEN_HEIGHT - 230, "tough"),
-            Robot(1510, SCREEN_HEIGHT - 150, "tough"),
-            Robot(1660, SCREEN_HEIGHT - 270, "tough"),
-            Robot(1780, SCREEN_HEIGHT - 390, "tough"),
-            Robot(1930, SCREEN_HEIGHT - 510, "tough"),
-            Robot(2060, SCREEN_HEIGHT - 390, "tough"),
-            Robot(2210, SCREEN_HEIGHT - 270, "tough"),
-            Robot(2340, SCREEN_HEIGHT - 150, "tough"),
-            Robot(2490, SCREEN_HEIGHT - 310, "tough"),
+            robot_pool.acquire(130, SCREEN_HEIGHT - 80, "tough"),
+            robot_pool.acquire(280, SCREEN_HEIGHT - 230, "tough"),
+            robot_pool.acquire(410, SCREEN_HEIGHT - 310, "tough"),
+            robot_pool.acquire(530, SCREEN_HEIGHT - 390, "tough"),
+            robot_pool.acquire(680, SCREEN_HEIGHT - 470, "tough"),
+            robot_pool.acquire(810, SCREEN_HEIGHT - 550, "tough"),
+            robot_pool.acquire(950, SCREEN_HEIGHT - 470, "tough"),
+            robot_pool.acquire(1080, SCREEN_HEIGHT - 390, "tough"),
+            robot_pool.acquire(1230, SCREEN_HEIGHT - 310, "tough"),
+            robot_pool.acquire(1360, SCREEN_HEIGHT - 230, "tough"),
+            robot_pool.acquire(1510, SCREEN_HEIGHT - 150, "tough"),
+            robot_pool.acquire(1660, SCREEN_HEIGHT - 270, "tough"),
+            robot_pool.acquire(1780, SCREEN_HEIGHT - 390, "tough"),
+            robot_pool.acquire(1930, SCREEN_HEIGHT - 510, "tough"),
+            robot_pool.acquire(2060, SCREEN_HEIGHT - 390, "tough"),
+            robot_pool.acquire(2210, SCREEN_HEIGHT - 270, "tough"),
+            robot_pool.acquire(2340, SCREEN_HEIGHT - 150, "tough"),
+            robot_pool.acquire(2490, SCREEN_HEIGHT - 310, "tough"),
         ])
         
-        boss = Boss(boss_platform_x + 50, SCREEN_HEIGHT - 160, 7)
+        boss = boss_pool.acquire(boss_platform_x + 50, SCREEN_HEIGHT - 160, 7)
         
     elif level_num == 8:
         # Level 8 - Extreme vertical challenge
         platforms.extend([
-            Platform(80, SCREEN_HEIGHT - 80, 60, 30),
-            Platform(180, SCREEN_HEIGHT - 140, 50, 30),
-            Platform(270, SCREEN_HEIGHT - 220, 50, 30),
-            Platform(360, SCREEN_HEIGHT - 300, 50, 30),
-            Platform(450, SCREEN_HEIGHT - 380, 50, 30),
-            Platform(540, SCREEN_HEIGHT - 460, 50, 30),
-            Platform(630, SCREEN_HEIGHT - 400, 50, 30),   # Reduced from 540 to 400 for accessibility
-            Platform(720, SCREEN_HEIGHT - 460, 50, 30),
-            Platform(810, SCREEN_HEIGHT - 380, 50, 30),
-            Platform(900, SCREEN_HEIGHT - 300, 50, 30),
-            Platform(990, SCREEN_HEIGHT - 220, 50, 30),
-            Platform(1080, SCREEN_HEIGHT - 140, 50, 30),
-            Platform(1170, SCREEN_HEIGHT - 80, 60, 30),
-            Platform(1280, SCREEN_HEIGHT - 180, 50, 30),
-            Platform(1370, SCREEN_HEIGHT - 280, 50, 30),
-            Platform(1460, SCREEN_HEIGHT - 380, 50, 30),
-            Platform(1550, SCREEN_HEIGHT - 480, 50, 30),
-            Platform(1640, SCREEN_HEIGHT - 380, 50, 30),
-            Platform(1730, SCREEN_HEIGHT - 280, 50, 30),
-            Platform(1820, SCREEN_HEIGHT - 180, 50, 30),
-            Platform(1910, SCREEN_HEIGHT - 80, 60, 30),
-            Platform(2020, SCREEN_HEIGHT - 200, 50, 30),
-            Platform(2110, SCREEN_HEIGHT - 320, 50, 30),
-            Platform(2200, SCREEN_HEIGHT - 440, 50, 30),
-            Platform(2290, SCREEN_HEIGHT - 320, 50, 30),
-            Platform(2380, SCREEN_HEIGHT - 200, 50, 30),
-            Platform(2470, SCREEN_HEIGHT - 80, 60, 30),
+            platform_pool.acquire(80, SCREEN_HEIGHT - 80, 60, 30),
+            platform_pool.acquire(180, SCREEN_HEIGHT - 140, 50, 30),
+            platform_pool.acquire(270, SCREEN_HEIGHT - 220, 50, 30),
+            platform_pool.acquire(360, SCREEN_HEIGHT - 300, 50, 30),
+            platform_pool.acquire(450, SCREEN_HEIGHT - 380, 50, 30),
+            platform_pool.acquire(540, SCREEN_HEIGHT - 460, 50, 30),
+            platform_pool.acquire(630, SCREEN_HEIGHT - 400, 50, 30),   # Reduced from 540 to 400 for accessibility
+            platform_pool.acquire(720, SCREEN_HEIGHT - 460, 50, 30),
+            platform_pool.acquire(810, SCREEN_HEIGHT - 380, 50, 30),
+            platform_pool.acquire(900, SCREEN_HEIGHT - 300, 50, 30),
+            platform_pool.acquire(990, SCREEN_HEIGHT - 220, 50, 30),
+            platform_pool.acquire(1080, SCREEN_HEIGHT - 140, 50, 30),
+            platform_pool.acquire(1170, SCREEN_HEIGHT - 80, 60, 30),
+            platform_pool.acquire(1280, SCREEN_HEIGHT - 180, 50, 30),
+            platform_pool.acquire(1370, SCREEN_HEIGHT - 280, 50, 30),
+            platform_pool.acquire(1460, SCREEN_HEIGHT - 380, 50, 30),
+            platform_pool.acquire(1550, SCREEN_HEIGHT - 480, 50, 30),
+            platform_pool.acquire(1640, SCREEN_HEIGHT - 380, 50, 30),
+            platform_pool.acquire(1730, SCREEN_HEIGHT - 280, 50, 30),
+            platform_pool.acquire(1820, SCREEN_HEIGHT - 180, 50, 30),
+            platform_pool.acquire(1910, SCREEN_HEIGHT - 80, 60, 30),
+            platform_pool.acquire(2020, SCREEN_HEIGHT - 200, 50, 30),
+            platform_pool.acquire(2110, SCREEN_HEIGHT - 320, 50, 30),
+            platform_pool.acquire(2200, SCREEN_HEIGHT - 440, 50, 30),
+            platform_pool.acquire(2290, SCREEN_HEIGHT - 320, 50, 30),
+            platform_pool.acquire(2380, SCREEN_HEIGHT - 200, 50, 30),
+            platform_pool.acquire(2470, SCREEN_HEIGHT - 80, 60, 30),
         ])
         
         # Maximum robot density
         robots.extend([
-            Robot(110, SCREEN_HEIGHT - 80, "tough"),
-            Robot(210, SCREEN_HEIGHT - 170, "tough"),
-            Robot(300, SCREEN_HEIGHT - 250, "tough"),
-            Robot(390, SCREEN_HEIGHT - 330, "tough"),
-            Robot(480, SCREEN_HEIGHT - 410, "tough"),
-            Robot(570, SCREEN_HEIGHT - 490, "tough"),
-            Robot(660, SCREEN_HEIGHT - 570, "tough"),
-            Robot(750, SCREEN_HEIGHT - 490, "tough"),
-            Robot(840, SCREEN_HEIGHT - 410, "tough"),
-            Robot(930, SCREEN_HEIGHT - 330, "tough"),
-            Robot(1020, SCREEN_HEIGHT - 250, "tough"),
-            Robot(1110, SCREEN_HEIGHT - 170, "tough"),
-            Robot(1200, SCREEN_HEIGHT - 110, "tough"),
-            Robot(1310, SCREEN_HEIGHT - 210, "tough"),
-            Robot(1400, SCREEN_HEIGHT - 310, "tough"),
-            Robot(1490, SCREEN_HEIGHT - 410, "tough"),
-            Robot(1580, SCREEN_HEIGHT - 510, "tough"),
-            Robot(1670, SCREEN_HEIGHT - 410, "tough"),
-            Robot(1760, SCREEN_HEIGHT - 310, "tough"),
-            Robot(1850, SCREEN_HEIGHT - 210, "tough"),
-            Robot(1940, SCREEN_HEIGHT - 110, "tough"),
-            Robot(2050, SCREEN_HEIGHT - 230, "tough"),
-            Robot(2140, SCREEN_HEIGHT - 350, "tough"),
-            Robot(2230, SCREEN_HEIGHT - 470, "tough"),
-            Robot(2320, SCREEN_HEIGHT - 350, "tough"),
-            Robot(2410, SCREEN_HEIGHT - 230, "tough"),
-            Robot(2500, SCREEN_HEIGHT - 110, "tough"),
+            robot_pool.acquire(110, SCREEN_HEIGHT - 80, "tough"),
+            robot_pool.acquire(210, SCREEN_HEIGHT - 170, "tough"),
+            robot_pool.acquire(300, SCREEN_HEIGHT - 250, "tough"),
+            robot_pool.acquire(390, SCREEN_HEIGHT - 330, "tough"),
+            robot_pool.acquire(480, SCREEN_HEIGHT - 410, "tough"),
+            robot_pool.acquire(570, SCREEN_HEIGHT - 490, "tough"),
+            robot_pool.acquire(660, SCREEN_HEIGHT - 570, "tough"),
+            robot_pool.acquire(750, SCREEN_HEIGHT - 490, "tough"),
+            robot_pool.acquire(840, SCREEN_HEIGHT - 410, "tough"),
+            robot_pool.acquire(930, SCREEN_HEIGHT - 330, "tough"),
+            robot_pool.acquire(1020, SCREEN_HEIGHT - 250, "tough"),
+            robot_pool.acquire(1110, SCREEN_HEIGHT - 170, "tough"),
+            robot_pool.acquire(1200, SCREEN_HEIGHT - 110, "tough"),
+            robot_pool.acquire(1310, SCREEN_HEIGHT - 210, "tough"),
+            robot_pool.acquire(1400, SCREEN_HEIGHT - 310, "tough"),
+            robot_pool.acquire(1490, SCREEN_HEIGHT - 410, "tough"),
+            robot_pool.acquire(1580, SCREEN_HEIGHT - 510, "tough"),
+            robot_pool.acquire(1670, SCREEN_HEIGHT - 410, "tough"),
+            robot_pool.acquire(1760, SCREEN_HEIGHT - 310, "tough"),
+            robot_pool.acquire(1850, SCREEN_HEIGHT - 210, "tough"),
+            robot_pool.acquire(1940, SCREEN_HEIGHT - 110, "tough"),
+            robot_pool.acquire(2050, SCREEN_HEIGHT - 230, "tough"),
+            robot_pool.acquire(2140, SCREEN_HEIGHT - 350, "tough"),
+            robot_pool.acquire(2230, SCREEN_HEIGHT - 470, "tough"),
+            robot_pool.acquire(2320, SCREEN_HEIGHT - 350, "tough"),
+            robot_pool.acquire(2410, SCREEN_HEIGHT - 230, "tough"),
+            robot_pool.acquire(2500, SCREEN_HEIGHT - 110, "tough"),
         ])
         
-        boss = Boss(boss_platform_x + 50, SCREEN_HEIGHT - 160, 8)
+        boss = boss_pool.acquire(boss_platform_x + 50, SCREEN_HEIGHT - 160, 8)
         
     elif level_num == 9:
         # Level 9 - Gauntlet of death
         platforms.extend([
-            Platform(60, SCREEN_HEIGHT - 100, 50, 30),
-            Platform(140, SCREEN_HEIGHT - 160, 40, 30),
-            Platform(210, SCREEN_HEIGHT - 240, 40, 30),
-            Platform(280, SCREEN_HEIGHT - 320, 40, 30),
-            Platform(350, SCREEN_HEIGHT - 400, 40, 30),
-            Platform(420, SCREEN_HEIGHT - 480, 40, 30),
-            Platform(490, SCREEN_HEIGHT - 400, 40, 30),   # Reduced from 560 to 400 for accessibility
-            Platform(560, SCREEN_HEIGHT - 480, 40, 30),
-            Platform(630, SCREEN_HEIGHT - 400, 40, 30),
-            Platform(700, SCREEN_HEIGHT - 320, 40, 30),
-            Platform(770, SCREEN_HEIGHT - 240, 40, 30),
-            Platform(840, SCREEN_HEIGHT - 160, 40, 30),
-            Platform(910, SCREEN_HEIGHT - 100, 50, 30),
-            Platform(990, SCREEN_HEIGHT - 180, 40, 30),
-            Platform(1060, SCREEN_HEIGHT - 260, 40, 30),
-            Platform(1130, SCREEN_HEIGHT - 340, 40, 30),
-            Platform(1200, SCREEN_HEIGHT - 420, 40, 30),
-            Platform(1270, SCREEN_HEIGHT - 400, 40, 30),  # Reduced from 500 to 400 for accessibility
-            Platform(1340, SCREEN_HEIGHT - 420, 40, 30),
-            Platform(1410, SCREEN_HEIGHT - 340, 40, 30),
-            Platform(1480, SCREEN_HEIGHT - 260, 40, 30),
-            Platform(1550, SCREEN_HEIGHT - 180, 40, 30),
-            Platform(1620, SCREEN_HEIGHT - 100, 50, 30),
-            Platform(1700, SCREEN_HEIGHT - 200, 40, 30),
-            Platform(1770, SCREEN_HEIGHT - 300, 40, 30),
-            Platform(1840, SCREEN_HEIGHT - 400, 40, 30),
-            Platform(1910, SCREEN_HEIGHT - 400, 40, 30),  # Reduced from 500 to 400 for accessibility
-            Platform(1980, SCREEN_HEIGHT - 400, 40, 30),
-            Platform(2050, SCREEN_HEIGHT - 300, 40, 30),
-            Platform(2120, SCREEN_HEIGHT - 200, 40, 30),
-            Platform(2190, SCREEN_HEIGHT - 100, 50, 30),
-            Platform(2270, SCREEN_HEIGHT - 220, 40, 30),
-            Platform(2340, SCREEN_HEIGHT - 340, 40, 30),
-            Platform(2410, SCREEN_HEIGHT - 460, 40, 30),
-            Platform(2480, SCREEN_HEIGHT - 340, 40, 30),
-            Platform(2550, SCREEN_HEIGHT - 220, 40, 30),
+            platform_pool.acquire(60, SCREEN_HEIGHT - 100, 50, 30),
+            platform_pool.acquire(140, SCREEN_HEIGHT - 160, 40, 30),
+            platform_pool.acquire(210, SCREEN_HEIGHT - 240, 40, 30),
+            platform_pool.acquire(280, SCREEN_HEIGHT - 320, 40, 30),
+            platform_pool.acquire(350, SCREEN_HEIGHT - 400, 40, 30),
+            platform_pool.acquire(420, SCREEN_HEIGHT - 480, 40, 30),
+            platform_pool.acquire(490, SCREEN_HEIGHT - 400, 40, 30),   # Reduced from 560 to 400 for accessibility
+            platform_pool.acquire(560, SCREEN_HEIGHT - 480, 40, 30),
+            platform_pool.acquire(630, SCREEN_HEIGHT - 400, 40, 30),
+            platform_pool.acquire(700, SCREEN_HEIGHT - 320, 40, 30),
+            platform_pool.acquire(770, SCREEN_HEIGHT - 240, 40, 30),
+            platform_pool.acquire(840, SCREEN_HEIGHT - 160, 40, 30),
+            platform_pool.acquire(910, SCREEN_HEIGHT - 100, 50, 30),
+            platform_pool.acquire(990, SCREEN_HEIGHT - 180, 40, 30),
+            platform_pool.acquire(1060, SCREEN_HEIGHT - 260, 40, 30),
+            platform_pool.acquire(1130, SCREEN_HEIGHT - 340, 40, 30),
+            platform_pool.acquire(1200, SCREEN_HEIGHT - 420, 40, 30),
+            platform_pool.acquire(1270, SCREEN_HEIGHT - 400, 40, 30),  # Reduced from 500 to 400 for accessibility
+            platform_pool.acquire(1340, SCREEN_HEIGHT - 420, 40, 30),
+            platform_pool.acquire(1410, SCREEN_HEIGHT - 340, 40, 30),
+            platform_pool.acquire(1480, SCREEN_HEIGHT - 260, 40, 30),
+            platform_pool.acquire(1550, SCREEN_HEIGHT - 180, 40, 30),
+            platform_pool.acquire(1620, SCREEN_HEIGHT - 100, 50, 30),
+            platform_pool.acquire(1700, SCREEN_HEIGHT - 200, 40, 30),
+            platform_pool.acquire(1770, SCREEN_HEIGHT - 300, 40, 30),
+            platform_pool.acquire(1840, SCREEN_HEIGHT - 400, 40, 30),
+            platform_pool.acquire(1910, SCREEN_HEIGHT - 400, 40, 30),  # Reduced from 500 to 400 for accessibility
+            platform_pool.acquire(1980, SCREEN_HEIGHT - 400, 40, 30),
+            platform_pool.acquire(2050, SCREEN_HEIGHT - 300, 40, 30),
+            platform_pool.acquire(2120, SCREEN_HEIGHT - 200, 40, 30),
+            platform_pool.acquire(2190, SCREEN_HEIGHT - 100, 50, 30),
+            platform_pool.acquire(2270, SCREEN_HEIGHT - 220, 40, 30),
+            platform_pool.acquire(2340, SCREEN_HEIGHT - 340, 40, 30),
+            platform_pool.acquire(2410, SCREEN_HEIGHT - 460, 40, 30),
+            platform_pool.acquire(2480, SCREEN_HEIGHT - 340, 40, 30),
+            platform_pool.acquire(2550, SCREEN_HEIGHT - 220, 40, 30),
         ])
         
         # Overwhelming robot army
         robots.extend([
-            Robot(90, SCREEN_HEIGHT - 80, "tough"),
-            Robot(170, SCREEN_HEIGHT - 190, "tough"),
-            Robot(240, SCREEN_HEIGHT - 270, "tough"),
-            Robot(310, SCREEN_HEIGHT - 350, "tough"),
-            Robot(380, SCREEN_HEIGHT - 430, "tough"),
-            Robot(450, SCREEN_HEIGHT - 510, "tough"),
-            Robot(520, SCREEN_HEIGHT - 590, "tough"),
-            Robot(590, SCREEN_HEIGHT - 510, "tough"),
-            Robot(660, SCREEN_HEIGHT - 430, "tough"),
-            Robot(730, SCREEN_HEIGHT - 350, "tough"),
-            Robot(800, SCREEN_HEIGHT - 270, "tough"),
-            Robot(870, SCREEN_HEIGHT - 190, "tough"),
-            Robot(940, SCREEN_HEIGHT - 130, "tough"),
-            Robot(1020, SCREEN_HEIGHT - 210, "tough"),
-            Robot(1090, SCREEN_HEIGHT - 290, "tough"),
-            Robot(1160, SCREEN_HEIGHT - 370, "tough"),
-            Robot(1230, SCREEN_HEIGHT - 450, "tough"),
-            Robot(1300, SCREEN_HEIGHT - 530, "tough"),
-            Robot(1370, SCREEN_HEIGHT - 450, "tough"),
-            Robot(1440, SCREEN_HEIGHT - 370, "tough"),
-            Robot(1510, SCREEN_HEIGHT - 290, "tough"),
-            Robot(1580, SCREEN_HEIGHT - 210, "tough"),
-            Robot(1650, SCREEN_HEIGHT - 130, "tough"),
-            Robot(1730, SCREEN_HEIGHT - 230, "tough"),
-            Robot(1800, SCREEN_HEIGHT - 330, "tough"),
-            Robot(1870, SCREEN_HEIGHT - 430, "tough"),
-            Robot(1940, SCREEN_HEIGHT - 530, "tough"),
-            Robot(2010, SCREEN_HEIGHT - 430, "tough"),
-            Robot(2080, SCREEN_HEIGHT - 330, "tough"),
-            Robot(2150, SCREEN_HEIGHT - 230, "tough"),
-            Robot(2220, SCREEN_HEIGHT - 130, "tough"),
-            Robot(2300, SCREEN_HEIGHT - 250, "tough"),
-            Robot(2370, SCREEN_HEIGHT - 370, "tough"),
-            Robot(2440, SCREEN_HEIGHT - 490, "tough"),
-            Robot(2510, SCREEN_HEIGHT - 370, "tough"),
-            Robot(2580, SCREEN_HEIGHT - 250, "tough"),
+            robot_pool.acquire(90, SCREEN_HEIGHT - 80, "tough"),
+            robot_pool.acquire(170, SCREEN_HEIGHT - 190, "tough"),
+            robot_pool.acquire(240, SCREEN_HEIGHT - 270, "tough"),
+            robot_pool.acquire(310, SCREEN_HEIGHT - 350, "tough"),
+            robot_pool.acquire(380, SCREEN_HEIGHT - 430, "tough"),
+            robot_pool.acquire(450, SCREEN_HEIGHT - 510, "tough"),
+            robot_pool.acquire(520, SCREEN_HEIGHT - 590, "tough"),
+            robot_pool.acquire(590, SCREEN_HEIGHT - 510, "tough"),
+            robot_pool.acquire(660, SCREEN_HEIGHT - 430, "tough"),
+            robot_pool.acquire(730, SCREEN_HEIGHT - 350, "tough"),
+            robot_pool.acquire(800, SCREEN_HEIGHT - 270, "tough"),
+            robot_pool.acquire(870, SCREEN_HEIGHT - 190, "tough"),
+            robot_pool.acquire(940, SCREEN_HEIGHT - 130, "tough"),
+            robot_pool.acquire(1020, SCREEN_HEIGHT - 210, "tough"),
+            robot_pool.acquire(1090, SCREEN_HEIGHT - 290, "tough"),
+            robot_pool.acquire(1160, SCREEN_HEIGHT - 370, "tough"),
+            robot_pool.acquire(1230, SCREEN_HEIGHT - 450, "tough"),
+            robot_pool.acquire(1300, SCREEN_HEIGHT - 530, "tough"),
+            robot_pool.acquire(1370, SCREEN_HEIGHT - 450, "tough"),
+            robot_pool.acquire(1440, SCREEN_HEIGHT - 370, "tough"),
+            robot_pool.acquire(1510, SCREEN_HEIGHT - 290, "tough"),
+            robot_pool.acquire(1580, SCREEN_HEIGHT - 210, "tough"),
+            robot_pool.acquire(1650, SCREEN_HEIGHT - 130, "tough"),
+            robot_pool.acquire(1730, SCREEN_HEIGHT - 230, "tough"),
+            robot_pool.acquire(1800, SCREEN_HEIGHT - 330, "tough"),
+            robot_pool.acquire(1870, SCREEN_HEIGHT - 430, "tough"),
+            robot_pool.acquire(1940, SCREEN_HEIGHT - 530, "tough"),
+            robot_pool.acquire(2010, SCREEN_HEIGHT - 430, "tough"),
+            robot_pool.acquire(2080, SCREEN_HEIGHT - 330, "tough"),
+            robot_pool.acquire(2150, SCREEN_HEIGHT - 230, "tough"),
+            robot_pool.acquire(2220, SCREEN_HEIGHT - 130, "tough"),
+            robot_pool.acquire(2300, SCREEN_HEIGHT - 250, "tough"),
+            robot_pool.acquire(2370, SCREEN_HEIGHT - 370, "tough"),
+            robot_pool.acquire(2440, SCREEN_HEIGHT - 490, "tough"),
+            robot_pool.acquire(2510, SCREEN_HEIGHT - 370, "tough"),
+            robot_pool.acquire(2580, SCREEN_HEIGHT - 250, "tough"),
         ])
         
-        boss = Boss(boss_platform_x + 50, SCREEN_HEIGHT - 160, 9)
+        boss = boss_pool.acquire(boss_platform_x + 50, SCREEN_HEIGHT - 160, 9)
         
     else:  # Level 10 - Final ultimate challenge
         # Level 10 - The ultimate test
         platforms.extend([
-            Platform(50, SCREEN_HEIGHT - 80, 40, 30),
-            Platform(120, SCREEN_HEIGHT - 140, 35, 30),
-            Platform(180, SCREEN_HEIGHT - 200, 35, 30),
-            Platform(240, SCREEN_HEIGHT - 260, 35, 30),
-            Platform(300, SCREEN_HEIGHT - 320, 35, 30),
-            Platform(360, SCREEN_HEIGHT - 380, 35, 30),
-            Platform(420, SCREEN_HEIGHT - 440, 35, 30),
-            Platform(480, SCREEN_HEIGHT - 500, 35, 30),
-            Platform(540, SCREEN_HEIGHT - 400, 35, 30),   # Reduced from 560 to 400 for accessibility
-            Platform(600, SCREEN_HEIGHT - 500, 35, 30),
-            Platform(660, SCREEN_HEIGHT - 440, 35, 30),
-            Platform(720, SCREEN_HEIGHT - 380, 35, 30),
-            Platform(780, SCREEN_HEIGHT - 320, 35, 30),
-            Platform(840, SCREEN_HEIGHT - 260, 35, 30),
-            Platform(900, SCREEN_HEIGHT - 200, 35, 30),
-            Platform(960, SCREEN_HEIGHT - 140, 35, 30),
-            Platform(1020, SCREEN_HEIGHT - 80, 40, 30),
-            Platform(1090, SCREEN_HEIGHT - 160, 35, 30),
-            Platform(1150, SCREEN_HEIGHT - 240, 35, 30),
-            Platform(1210, SCREEN_HEIGHT - 320, 35, 30),
-            Platform(1270, SCREEN_HEIGHT - 400, 35, 30),
-            Platform(1330, SCREEN_HEIGHT - 480, 35, 30),
-            Platform(1390, SCREEN_HEIGHT - 400, 35, 30),  # Reduced from 560 to 400 for accessibility
-            Platform(1450, SCREEN_HEIGHT - 480, 35, 30),
-            Platform(1510, SCREEN_HEIGHT - 400, 35, 30),
-            Platform(1570, SCREEN_HEIGHT - 320, 35, 30),
-            Platform(1630, SCREEN_HEIGHT - 240, 35, 30),
-            Platform(1690, SCREEN_HEIGHT - 160, 35, 30),
-            Platform(1750, SCREEN_HEIGHT - 80, 40, 30),
-            Platform(1820, SCREEN_HEIGHT - 180, 35, 30),
-            Platform(1880, SCREEN_HEIGHT - 280, 35, 30),
-            Platform(1940, SCREEN_HEIGHT - 380, 35, 30),
-            Platform(2000, SCREEN_HEIGHT - 480, 35, 30),
-            Platform(2060, SCREEN_HEIGHT - 400, 35, 30),  # Reduced from 580 to 400 for accessibility
-            Platform(2120, SCREEN_HEIGHT - 480, 35, 30),
-            Platform(2180, SCREEN_HEIGHT - 380, 35, 30),
-            Platform(2240, SCREEN_HEIGHT - 280, 35, 30),
-            Platform(2300, SCREEN_HEIGHT - 180, 35, 30),
-            Platform(2360, SCREEN_HEIGHT - 80, 40, 30),
-            Platform(2430, SCREEN_HEIGHT - 200, 35, 30),
-            Platform(2490, SCREEN_HEIGHT - 320, 35, 30),
-            Platform(2550, SCREEN_HEIGHT - 440, 35, 30),
-            Platform(2610, SCREEN_HEIGHT - 320, 35, 30),
-            Platform(2670, SCREEN_HEIGHT - 200, 35, 30),
+            platform_pool.acquire(50, SCREEN_HEIGHT - 80, 40, 30),
+            platform_pool.acquire(120, SCREEN_HEIGHT - 140, 35, 30),
+            platform_pool.acquire(180, SCREEN_HEIGHT - 200, 35, 30),
+            platform_pool.acquire(240, SCREEN_HEIGHT - 260, 35, 30),
+            platform_pool.acquire(300, SCREEN_HEIGHT - 320, 35, 30),
+            platform_pool.acquire(360, SCREEN_HEIGHT - 380, 35, 30),
+            platform_pool.acquire(420, SCREEN_HEIGHT - 440, 35, 30),
+            platform_pool.acquire(480, SCREEN_HEIGHT - 500, 35, 30),
+            platform_pool.acquire(540, SCREEN_HEIGHT - 400, 35, 30),   # Reduced from 560 to 400 for accessibility
+            platform_pool.acquire(600, SCREEN_HEIGHT - 500, 35, 30),
+            platform_pool.acquire(660, SCREEN_HEIGHT - 440, 35, 30),
+            platform_pool.acquire(720, SCREEN_HEIGHT - 380, 35, 30),
+            platform_pool.acquire(780, SCREEN_HEIGHT - 320, 35, 30),
+            platform_pool.acquire(840, SCREEN_HEIGHT - 260, 35, 30),
+            platform_pool.acquire(900, SCREEN_HEIGHT - 200, 35, 30),
+            platform_pool.acquire(960, SCREEN_HEIGHT - 140, 35, 30),
+            platform_pool.acquire(1020, SCREEN_HEIGHT - 80, 40, 30),
+            platform_pool.acquire(1090, SCREEN_HEIGHT - 160, 35, 30),
+            platform_pool.acquire(1150, SCREEN_HEIGHT - 240, 35, 30),
+            platform_pool.acquire(1210, SCREEN_HEIGHT - 320, 35, 30),
+            platform_pool.acquire(1270, SCREEN_HEIGHT - 400, 35, 30),
+            platform_pool.acquire(1330, SCREEN_HEIGHT - 480, 35, 30),
+            platform_pool.acquire(1390, SCREEN_HEIGHT - 400, 35, 30),  # Reduced from 560 to 400 for accessibility
+            platform_pool.acquire(1450, SCREEN_HEIGHT - 480, 35, 30),
+            platform_pool.acquire(1510, SCREEN_HEIGHT - 400, 35, 30),
+            platform_pool.acquire(1570, SCREEN_HEIGHT - 320, 35, 30),
+            platform_pool.acquire(1630, SCREEN_HEIGHT - 240, 35, 30),
+            platform_pool.acquire(1690, SCREEN_HEIGHT - 160, 35, 30),
+            platform_pool.acquire(1750, SCREEN_HEIGHT - 80, 40, 30),
+            platform_pool.acquire(1820, SCREEN_HEIGHT - 180, 35, 30),
+            platform_pool.acquire(1880, SCREEN_HEIGHT - 280, 35, 30),
+            platform_pool.acquire(1940, SCREEN_HEIGHT - 380, 35, 30),
+            platform_pool.acquire(2000, SCREEN_HEIGHT - 480, 35, 30),
+            platform_pool.acquire(2060, SCREEN_HEIGHT - 400, 35, 30),  # Reduced from 580 to 400 for accessibility
+            platform_pool.acquire(2120, SCREEN_HEIGHT - 480, 35, 30),
+            platform_pool.acquire(2180, SCREEN_HEIGHT - 380, 35, 30),
+            platform_pool.acquire(2240, SCREEN_HEIGHT - 280, 35, 30),
+            platform_pool.acquire(2300, SCREEN_HEIGHT - 180, 35, 30),
+            platform_pool.acquire(2360, SCREEN_HEIGHT - 80, 40, 30),
+            platform_pool.acquire(2430, SCREEN_HEIGHT - 200, 35, 30),
+            platform_pool.acquire(2490, SCREEN_HEIGHT - 320, 35, 30),
+            platform_pool.acquire(2550, SCREEN_HEIGHT - 440, 35, 30),
+            platform_pool.acquire(2610, SCREEN_HEIGHT - 320, 35, 30),
+            platform_pool.acquire(2670, SCREEN_HEIGHT - 200, 35, 30),
         ])
         
         # Maximum difficulty - robot army
         robots.extend([
-            Robot(80, SCREEN_HEIGHT - 80, "tough"),
-            Robot(150, SCREEN_HEIGHT - 170, "tough"),
-            Robot(210, SCREEN_HEIGHT - 230, "tough"),
-            Robot(270, SCREEN_HEIGHT - 290, "tough"),
-            Robot(330, SCREEN_HEIGHT - 350, "tough"),
-            Robot(390, SCREEN_HEIGHT - 410, "tough"),
-            Robot(450, SCREEN_HEIGHT - 470, "tough"),
-            Robot(510, SCREEN_HEIGHT - 530, "tough"),
-            Robot(570, SCREEN_HEIGHT - 590, "tough"),
-            Robot(630, SCREEN_HEIGHT - 530, "tough"),
-            Robot(690, SCREEN_HEIGHT - 470, "tough"),
-            Robot(750, SCREEN_HEIGHT - 410, "tough"),
-            Robot(810, SCREEN_HEIGHT - 350, "tough"),
-            Robot(870, SCREEN_HEIGHT - 290, "tough"),
-            Robot(930, SCREEN_HEIGHT - 230, "tough"),
-            Robot(990, SCREEN_HEIGHT - 170, "tough"),
-            Robot(1050, SCREEN_HEIGHT - 110, "tough"),
-            Robot(1120, SCREEN_HEIGHT - 190, "tough"),
-            Robot(1180, SCREEN_HEIGHT - 270, "tough"),
-            Robot(1240, SCREEN_HEIGHT - 350, "tough"),
-            Robot(1300, SCREEN_HEIGHT - 430, "tough"),
-            Robot(1360, SCREEN_HEIGHT - 510, "tough"),
-            Robot(1420, SCREEN_HEIGHT - 590, "tough"),
-            Robot(1480, SCREEN_HEIGHT - 510, "tough"),
-            Robot(1540, SCREEN_HEIGHT - 430, "tough"),
-            Robot(1600, SCREEN_HEIGHT - 350, "tough"),
-            Robot(1660, SCREEN_HEIGHT - 270, "tough"),
-            Robot(1720, SCREEN_HEIGHT - 190, "tough"),
-            Robot(1780, SCREEN_HEIGHT - 110, "tough"),
-            Robot(1850, SCREEN_HEIGHT - 210, "tough"),
-            Robot(1910, SCREEN_HEIGHT - 310, "tough"),
-            Robot(1970, SCREEN_HEIGHT - 410, "tough"),
-            Robot(2030, SCREEN_HEIGHT - 510, "tough"),
-            Robot(2090, SCREEN_HEIGHT - 610, "tough"),
-            Robot(2150, SCREEN_HEIGHT - 510, "tough"),
-            Robot(2210, SCREEN_HEIGHT - 410, "tough"),
-            Robot(2270, SCREEN_HEIGHT - 310, "tough"),
-            Robot(2330, SCREEN_HEIGHT - 210, "tough"),
-            Robot(2390, SCREEN_HEIGHT - 110, "tough"),
-            Robot(2460, SCREEN_HEIGHT - 230, "tough"),
-            Robot(2520, SCREEN_HEIGHT - 350, "tough"),
-            Robot(2580, SCREEN_HEIGHT - 470, "tough"),
-            Robot(2640, SCREEN_HEIGHT - 350, "tough"),
-            Robot(2700, SCREEN_HEIGHT - 230, "tough"),
+            robot_pool.acquire(80, SCREEN_HEIGHT - 80, "tough"),
+            robot_pool.acquire(150, SCREEN_HEIGHT - 170, "tough"),
+            robot_pool.acquire(210, SCREEN_HEIGHT - 230, "tough"),
+            robot_pool.acquire(270, SCREEN_HEIGHT - 290, "tough"),
+            robot_pool.acquire(330, SCREEN_HEIGHT - 350, "tough"),
+            robot_pool.acquire(390, SCREEN_HEIGHT - 410, "tough"),
+            robot_pool.acquire(450, SCREEN_HEIGHT - 470, "tough"),
+            robot_pool.acquire(510, SCREEN_HEIGHT - 530, "tough"),
+            robot_pool.acquire(570, SCREEN_HEIGHT - 590, "tough"),
+            robot_pool.acquire(630, SCREEN_HEIGHT - 530, "tough"),
+            robot_pool.acquire(690, SCREEN_HEIGHT - 470, "tough"),
+            robot_pool.acquire(750, SCREEN_HEIGHT - 410, "tough"),
+            robot_pool.acquire(810, SCREEN_HEIGHT - 350, "tough"),
+            robot_pool.acquire(870, SCREEN_HEIGHT - 290, "tough"),
+            robot_pool.acquire(930, SCREEN_HEIGHT - 230, "tough"),
+            robot_pool.acquire(990, SCREEN_HEIGHT - 170, "tough"),
+            robot_pool.acquire(1050, SCREEN_HEIGHT - 110, "tough"),
+            robot_pool.acquire(1120, SCREEN_HEIGHT - 190, "tough"),
+            robot_pool.acquire(1180, SCREEN_HEIGHT - 270, "tough"),
+            robot_pool.acquire(1240, SCREEN_HEIGHT - 350, "tough"),
+            robot_pool.acquire(1300, SCREEN_HEIGHT - 430, "tough"),
+            robot_pool.acquire(1360, SCREEN_HEIGHT - 510, "tough"),
+            robot_pool.acquire(1420, SCREEN_HEIGHT - 590, "tough"),
+            robot_pool.acquire(1480, SCREEN_HEIGHT - 510, "tough"),
+            robot_pool.acquire(1540, SCREEN_HEIGHT - 430, "tough"),
+            robot_pool.acquire(1600, SCREEN_HEIGHT - 350, "tough"),
+            robot_pool.acquire(1660, SCREEN_HEIGHT - 270, "tough"),
+            robot_pool.acquire(1720, SCREEN_HEIGHT - 190, "tough"),
+            robot_pool.acquire(1780, SCREEN_HEIGHT - 110, "tough"),
+            robot_pool.acquire(1850, SCREEN_HEIGHT - 210, "tough"),
+            robot_pool.acquire(1910, SCREEN_HEIGHT - 310, "tough"),
+            robot_pool.acquire(1970, SCREEN_HEIGHT - 410, "tough"),
+            robot_pool.acquire(2030, SCREEN_HEIGHT - 510, "tough"),
+            robot_pool.acquire(2090, SCREEN_HEIGHT - 610, "tough"),
+            robot_pool.acquire(2150, SCREEN_HEIGHT - 510, "tough"),
+            robot_pool.acquire(2210, SCREEN_HEIGHT - 410, "tough"),
+            robot_pool.acquire(2270, SCREEN_HEIGHT - 310, "tough"),
+            robot_pool.acquire(2330, SCREEN_HEIGHT - 210, "tough"),
+            robot_pool.acquire(2390, SCREEN_HEIGHT - 110, "tough"),
+            robot_pool.acquire(2460, SCREEN_HEIGHT - 230, "tough"),
+            robot_pool.acquire(2520, SCREEN_HEIGHT - 350, "tough"),
+            robot_pool.acquire(2580, SCREEN_HEIGHT - 470, "tough"),
+            robot_pool.acquire(2640, SCREEN_HEIGHT - 350, "tough"),
+            robot_pool.acquire(2700, SCREEN_HEIGHT - 230, "tough"),
         ])
         
-        boss = Boss(boss_platform_x + 50, SCREEN_HEIGHT - 160, 10)
+        boss = boss_pool.acquire(boss_platform_x + 50, SCREEN_HEIGHT - 160, 10)
     
     # Add diamonds throughout the level (but not in boss area)
     diamond_positions = []
@@ -1828,7 +2782,7 @@ def create_level(level_num):
         diamond_positions.append((x, y))
     
     for pos in diamond_positions:
-        diamonds.append(Diamond(pos[0], pos[1]))
+        diamonds.append(diamond_pool.acquire(pos[0], pos[1]))
     
     # Add SuperDiamonds (fewer, more strategic placement)
     power_types = ["speed", "jump", "invincible", "strength"]
@@ -1843,129 +2797,410 @@ def create_level(level_num):
             power_type = power_types[i % len(power_types)]
             superdiamond_x = platform.rect.x + platform.rect.width // 2
             superdiamond_y = platform.rect.y - 30
-            superdiamonds.append(SuperDiamond(superdiamond_x, superdiamond_y, power_type))
+            superdiamonds.append(superdiamond_pool.acquire(superdiamond_x, superdiamond_y, power_type))
     
     return platforms, robots, diamonds, superdiamonds, boss
 
-def main():
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Retro Platform Fighter - Diamond Quest")
-    clock = pygame.time.Clock()
+
+# Keys polled by Player.update - the only held keys a replay needs to record
+# Player actions as bits, and the keys bound to each
+ACTION_LEFT = 1
+ACTION_RIGHT = 2
+ACTION_JUMP = 4
+ACTION_PUNCH = 8
+ACTION_KICK = 16
+ACTION_KEYS = (
+    (ACTION_LEFT, (pygame.K_LEFT, pygame.K_a)),
+    (ACTION_RIGHT, (pygame.K_RIGHT, pygame.K_d)),
+    (ACTION_JUMP, (pygame.K_SPACE, pygame.K_UP, pygame.K_w)),
+    (ACTION_PUNCH, (pygame.K_x,)),
+    (ACTION_KICK, (pygame.K_z,)),
+)
+KEY_ACTIONS = {key: action for action, keys in ACTION_KEYS for key in keys}
+CONTROL_KEYS = tuple(KEY_ACTIONS)
+
+# Window-only keys stepping the time scale (see TimeScale): slower, faster, normal
+TIME_SCALE_KEYS = {pygame.K_LEFTBRACKET: -1, pygame.K_RIGHTBRACKET: 1, pygame.K_BACKSLASH: 0}
+
+INPUT_BUFFER_FRAMES = 6  # A jump or attack pressed this early still happens
+COYOTE_FRAMES = 6        # Jumps allowed this long after walking off a ledge
+
+class Actions:
+    """One tick of player input: held actions and press/release edges as bit masks"""
+    def __init__(self, held=0, pressed=0, released=0, source=None):
+        self.held = held
+        self.pressed = pressed
+        self.released = released
+        self.source = source
     
-    # Game state
-    current_level = 1
-    score = 0
-    camera_x = 0
-    game_state = "playing"  # "playing", "paused", "level_complete", "game_over", "victory"
-    transition_timer = 0
+    def consume(self, action):
+        """Tell the input buffer the player acted on a press (for latency measurement)"""
+        if self.source is not None:
+            self.source.consumed(action)
+
+class InputBuffer:
+    """Single entry point for player input. SDL, replays and agents report key
+    presses with press() (timestamped; taps shorter than a frame still count)
+    and the held keys with hold(); tick() turns them into the frame's Actions,
+    with edges relative to the actions the player held last frame. With
+    measure_latency, the time from each press to the end of the frame that
+    acted on it is recorded by presented()."""
+    def __init__(self, measure_latency=False):
+        self.measure_latency = measure_latency
+        self.held_keys = frozenset()
+        self.pressed = 0
+        self.press_times = {}  # action -> timestamp of its oldest unconsumed press
+        self.press_ticks = {}  # action -> tick of that press
+        self.consumed_times = []
+        self.latencies = []    # Seconds from press to presented frame
+        self.ticks = 0
     
-    # Create game objects
-    player = Player(100, SCREEN_HEIGHT - 200)
-    platforms, robots, diamonds, superdiamonds, boss = create_level(current_level)
+    def press(self, key, timestamp=None):
+        action = KEY_ACTIONS.get(key)
+        if action is None:
+            return
+        self.pressed |= action
+        if self.measure_latency and action not in self.press_times:
+            self.press_times[action] = timestamp if timestamp is not None else time.perf_counter()
+            self.press_ticks[action] = self.ticks
     
-    # Fonts
-    font = pygame.font.Font(None, 36)
-    big_font = pygame.font.Font(None, 72)
+    def hold(self, keys):
+        """Set the held keys from anything indexable like pygame.key.get_pressed()"""
+        self.held_keys = frozenset(key for key in CONTROL_KEYS if keys[key])
     
-    running = True
-    while running:
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    running = False
-                elif event.key == pygame.K_p and game_state == "playing":
-                    # Pause the game
-                    game_state = "paused"
-                    sound_manager.play_sound('jump')  # Use existing sound for pause
-                elif event.key == pygame.K_p and game_state == "paused":
-                    # Unpause the game
-                    game_state = "playing"
-                    sound_manager.play_sound('jump')  # Use existing sound for unpause
-                elif event.key == pygame.K_r and (game_state == "game_over" or game_state == "victory"):
-                    # Restart game
-                    current_level = 1
-                    score = 0
-                    player = Player(100, SCREEN_HEIGHT - 200)
-                    platforms, robots, diamonds, superdiamonds, boss = create_level(current_level)
-                    game_state = "playing"
-                    camera_x = 0
-                elif event.key == pygame.K_RETURN and game_state == "level_complete":
-                    # Next level
-                    current_level += 1
-                    if current_level > 10:  # Changed from 5 to 10
-                        game_state = "victory"
-                    else:
-                        player = Player(100, SCREEN_HEIGHT - 200)
-                        platforms, robots, diamonds, superdiamonds, boss = create_level(current_level)
-                        game_state = "playing"
-                        camera_x = 0
-                # CHEAT CODES - Level selection (only during gameplay)
-                elif game_state == "playing" and event.key >= pygame.K_1 and event.key <= pygame.K_9:
-                    # Jump to level 1-9
-                    cheat_level = event.key - pygame.K_0  # Convert key to number
-                    if 1 <= cheat_level <= 10:
-                        current_level = cheat_level
-                        player = Player(100, SCREEN_HEIGHT - 200)
-                        platforms, robots, diamonds, superdiamonds, boss = create_level(current_level)
-                        camera_x = 0
-                        sound_manager.play_sound('superdiamond_collect')  # Special sound for cheat
-                elif game_state == "playing" and event.key == pygame.K_0:
-                    # Jump to level 10
-                    current_level = 10
-                    player = Player(100, SCREEN_HEIGHT - 200)
-                    platforms, robots, diamonds, superdiamonds, boss = create_level(current_level)
-                    camera_x = 0
-                    sound_manager.play_sound('superdiamond_collect')  # Special sound for cheat
-        
-        if game_state == "playing":
+    def clear(self):
+        """Drop presses that arrived while the simulation was not running"""
+        self.pressed = 0
+        self.press_times.clear()
+    
+    def tick(self, previous):
+        """Actions for this frame given the action mask held the frame before"""
+        held = 0
+        for key in self.held_keys:
+            held |= KEY_ACTIONS[key]
+        actions = Actions(held, self.pressed | (held & ~previous), previous & ~held,
+                          self if self.measure_latency else None)
+        self.pressed = 0
+        self.ticks += 1
+        if self.press_times:
+            # Presses the player never acted on expire with the input buffer
+            for action, tick in list(self.press_ticks.items()):
+                if self.ticks - tick > INPUT_BUFFER_FRAMES + 1:
+                    del self.press_ticks[action]
+                    self.press_times.pop(action, None)
+        return actions
+    
+    def consumed(self, action):
+        timestamp = self.press_times.pop(action, None)
+        self.press_ticks.pop(action, None)
+        if timestamp is not None:
+            self.consumed_times.append(timestamp)
+    
+    def presented(self, timestamp=None):
+        """Call once the frame is on screen to record press-to-display latency"""
+        if self.consumed_times:
+            now = timestamp if timestamp is not None else time.perf_counter()
+            self.latencies.extend(now - pressed for pressed in self.consumed_times)
+            self.consumed_times.clear()
+    
+    def latency_stats(self):
+        """Press-to-display latency in milliseconds: count, mean, p95, max"""
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return {"count": 0}
+        return {
+            "count": len(ordered),
+            "mean": sum(ordered) / len(ordered) * 1000.0,
+            "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000.0,
+            "max": ordered[-1] * 1000.0,
+        }
+
+class KeyState:
+    """Held-key snapshot that can be indexed like pygame.key.get_pressed()"""
+    def __init__(self, held=()):
+        self.held = frozenset(held)
+        
+    def __getitem__(self, key):
+        return key in self.held
+
+class Replay:
+    """Recorded per-frame input (held keys and KEYDOWN presses) for one run"""
+    def __init__(self, level=1, seed=0, frames=None):
+        self.level = level
+        self.seed = seed
+        self.frames = frames if frames is not None else []  # [(held, keydowns), ...]
+        
+    def record(self, held, keydowns=()):
+        self.frames.append((tuple(held), tuple(keydowns)))
+    
+    def inputs(self, frame):
+        """Return (KeyState, keydowns) for a frame - idle once the replay runs out"""
+        if frame < len(self.frames):
+            held, keydowns = self.frames[frame]
+            return KeyState(held), keydowns
+        return KeyState(), ()
+    
+    @classmethod
+    def demo(cls, level=1, frames=600, seed=0):
+        """Scripted run to the right with regular jumps and attacks"""
+        replay = cls(level, seed)
+        for i in range(frames):
+            held = [pygame.K_RIGHT]
+            if i % 45 < 3:
+                held.append(pygame.K_SPACE)
+            if i % 30 == 0:
+                held.append(pygame.K_x)
+            if i % 50 == 25:
+                held.append(pygame.K_z)
+            replay.record(held)
+        return replay
+    
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"level": self.level, "seed": self.seed,
+                       "frames": [[list(held), list(keydowns)] for held, keydowns in self.frames]}, fh)
+    
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        frames = [(tuple(held), tuple(keydowns)) for held, keydowns in data["frames"]]
+        return cls(data.get("level", 1), data.get("seed", 0), frames)
+
+# Extra world-space margin around the viewport for draw culling; each draw()
+# still does its own exact on-screen check
+DRAW_MARGIN = 100
+
+class XIndex:
+    """Entities sorted by world x, so draw passes and collision sweeps bisect
+    only the slice they need"""
+    def __init__(self, items=(), x=operator.attrgetter("x"), width=operator.attrgetter("width")):
+        self.x = x
+        self.width = width
+        self.rebuild(items)
+    
+    def rebuild(self, items):
+        """Re-sort from items; cheap for moving entities as the order barely changes"""
+        self.items = sorted(items, key=self.x)
+        self.xs = list(map(self.x, self.items))
+        # Widest entity: anything starting this far left of the view can still overlap it
+        self.reach = max(map(self.width, self.items), default=0)
+    
+    def resort(self):
+        """Re-sort after the items moved, reusing the index's lists"""
+        self.items.sort(key=self.x)
+        self.xs[:] = map(self.x, self.items)
+    
+    def remove(self, item):
+        i = bisect.bisect_left(self.xs, self.x(item))
+        while self.items[i] is not item:
+            i += 1
+        del self.items[i]
+        del self.xs[i]
+    
+    def span(self, left, right):
+        """Index range in items of the entities whose x range may intersect
+        [left, right], for walking them without copying"""
+        return bisect.bisect_left(self.xs, left - self.reach), bisect.bisect_right(self.xs, right)
+    
+    def between(self, left, right):
+        """Entities whose x range may intersect [left, right]"""
+        lo, hi = self.span(left, right)
+        return self.items[lo:hi]
+    
+    def visible(self, camera_x, margin=DRAW_MARGIN):
+        """Entities whose x range may intersect the viewport plus margin"""
+        return self.between(camera_x - margin, camera_x + SCREEN_WIDTH + margin)
+
+class Game:
+    """One play session: level objects, score, camera and game state"""
+    def __init__(self, level=1, seed=None):
+        if seed is not None:
+            random.seed(seed)  # Reproducible level layout and robot directions
+        self.seed = seed
+        self.score = 0
+        self.game_state = "playing"  # "playing", "paused", "level_complete", "game_over", "victory"
+        self.transition_timer = 0
+        
+        self.combat = CombatSystem()
+        self.input = InputBuffer()
+        self.damage_flash = (0, 0)  # HUD: (diamonds lost, ticks left to show it)
+        self.player = None
+        self.platforms, self.robots, self.diamonds, self.superdiamonds, self.boss = [], [], [], [], None
+        self.load_level(level)
+    
+    def load_level(self, level):
+        """Reset the player and build the level's objects, recycling the previous level's"""
+        self.current_level = level
+        if self.player is None:
+            self.player = Player(100, SCREEN_HEIGHT - 200)
+        else:
+            self.player.reset(100, SCREEN_HEIGHT - 200)
+        self.release_level()
+        started = time.perf_counter()
+        self.platforms, self.robots, self.diamonds, self.superdiamonds, self.boss = create_level(level)
+        metrics.level_built(time.perf_counter() - started)
+        self.camera_x = 0
+        particles.clear()
+        self.combat.reset()
+        self.reindex()
+        gc_policy.level_loaded()
+    
+    def release_level(self):
+        """Hand the level's entities back to their pools; the lists are left empty"""
+        platform_pool.release_all(self.platforms)
+        robot_pool.release_all(self.robots)
+        diamond_pool.release_all(self.diamonds)
+        superdiamond_pool.release_all(self.superdiamonds)
+        for entities in (self.platforms, self.robots, self.diamonds, self.superdiamonds):
+            entities.clear()
+        if self.boss is not None:
+            boss_pool.release(self.boss)
+            self.boss = None
+    
+    def remove_collected(self, pickups, index, pool):
+        """Drop collected diamonds or superdiamonds from the level, in place"""
+        for pickup in pickups:
+            if pickup.collected:
+                index.remove(pickup)
+                pool.release(pickup)
+        pickups[:] = [pickup for pickup in pickups if not pickup.collected]
+    
+    def reindex(self):
+        """Rebuild the draw indices after the level's entity lists were replaced or edited"""
+        self.platform_index = XIndex(self.platforms, operator.attrgetter("rect.x"),
+                                     operator.attrgetter("rect.width"))
+        self.diamond_index = XIndex(self.diamonds)
+        self.superdiamond_index = XIndex(self.superdiamonds)
+        self.robot_index = XIndex(self.robots)
+    
+    def handle_key(self, key, timestamp=None):
+        """Handle a KEYDOWN: control presses go to the input buffer, other keys
+        pause, restart, advance the level or trigger cheat codes"""
+        if key in KEY_ACTIONS:
+            self.input.press(key, timestamp)
+        elif key == pygame.K_p and self.game_state == "playing":
+            # Pause the game
+            self.game_state = "paused"
+            events.push(EVENT_PAUSE, True)
+        elif key == pygame.K_p and self.game_state == "paused":
+            # Unpause the game
+            self.game_state = "playing"
+            events.push(EVENT_PAUSE, False)
+        elif key == pygame.K_r and (self.game_state == "game_over" or self.game_state == "victory"):
+            # Restart game
+            self.score = 0
+            self.load_level(1)
+            self.game_state = "playing"
+        elif key == pygame.K_RETURN and self.game_state == "level_complete":
+            # Next level
+            self.next_level()
+        # CHEAT CODES - Level selection (only during gameplay)
+        elif self.game_state == "playing" and key >= pygame.K_1 and key <= pygame.K_9:
+            # Jump to level 1-9
+            cheat_level = key - pygame.K_0  # Convert key to number
+            if 1 <= cheat_level <= 10:
+                self.load_level(cheat_level)
+                events.push(EVENT_CHEAT, cheat_level)
+        elif self.game_state == "playing" and key == pygame.K_0:
+            # Jump to level 10
+            self.load_level(10)
+            events.push(EVENT_CHEAT, 10)
+    
+    def on_events(self, batch):
+        """HUD consumer: remember recent damage to flash next to the diamond count"""
+        for kind, detail in batch:
+            if kind == EVENT_DAMAGE:
+                self.damage_flash = (detail, 45)
+            elif kind == EVENT_LIFE_LOST:
+                self.damage_flash = (0, 0)
+    
+    def next_level(self):
+        self.current_level += 1
+        if self.current_level > 10:  # Changed from 5 to 10
+            self.game_state = "victory"
+        else:
+            self.load_level(self.current_level)
+            self.game_state = "playing"
+    
+    def update(self, keys=None):
+        """Advance the simulation by one frame; keys are the held keys (default: polled)"""
+        player = self.player
+        self.input.hold(keys if keys is not None else pygame.key.get_pressed())
+        actions = self.input.tick(player.held_actions)
+        
+        if self.game_state == "playing":
+            lost, frames_left = self.damage_flash
+            if frames_left > 0:
+                self.damage_flash = (lost, frames_left - 1)
+            
             # Update camera to follow player
             target_camera_x = player.x - SCREEN_WIDTH // 2
             target_camera_x = max(0, min(target_camera_x, WORLD_WIDTH - SCREEN_WIDTH))
-            camera_x += (target_camera_x - camera_x) * 0.1
+            self.camera_x += (target_camera_x - self.camera_x) * 0.1
             
             # Update game objects
             if player.lives > 0:
-                player.update(platforms, camera_x)
+                timers.advance()
+                player.update(self.platform_index, self.camera_x, actions)
+                
+                # Pickups, robots and the boss each test against the player
+                checked = (len(self.diamonds) + len(self.superdiamonds) + len(self.robots) +
+                           bool(self.boss and self.boss.alive))
+                metrics.collision_tests += checked
+                metrics.entities_updated += checked + 1
                 
                 # Update diamonds
-                for diamond in diamonds[:]:
+                collected = 0
+                for diamond in self.diamonds:
                     diamond.update(player)
-                    if diamond.collected:
-                        diamonds.remove(diamond)
-                        score += 10
+                    collected += diamond.collected
+                if collected:
+                    self.remove_collected(self.diamonds, self.diamond_index, diamond_pool)
+                    self.score += 10 * collected
                 
                 # Update superdiamonds
-                for superdiamond in superdiamonds[:]:
+                collected = 0
+                for superdiamond in self.superdiamonds:
                     superdiamond.update(player)
-                    if superdiamond.collected:
-                        superdiamonds.remove(superdiamond)
-                        score += 50  # SuperDiamonds are worth more points
+                    collected += superdiamond.collected
+                if collected:
+                    self.remove_collected(self.superdiamonds, self.superdiamond_index, superdiamond_pool)
+                    self.score += 50 * collected  # SuperDiamonds are worth more points
                 
                 # Update robots
-                for robot in robots[:]:
-                    robot.update(platforms, player)
-                    if not robot.alive:
-                        robots.remove(robot)
-                        score += 100
+                for robot in self.robots:
+                    robot.update(self.platform_index, player)
+                self.robot_index.resort()  # Robots move every frame
                 
                 # Update boss
+                boss = self.boss
                 if boss and boss.alive:
-                    boss.update(platforms, player)
-                    if not boss.alive:
-                        score += 500
+                    boss.update(self.platform_index, player)
+                
+                # Player attacks against robots and boss
+                for target in self.combat.resolve(player, self.robot_index, boss):
+                    if target is boss:
+                        self.score += 500
                         # Don't immediately complete level - check if all enemies are dead
+                    else:
+                        self.robots.remove(target)
+                        self.robot_index.remove(target)
+                        robot_pool.release(target)
+                        self.score += 100
+                
+                # Age visual effects spawned by the player, robots, boss and pickups
+                particles.update()
                 
                 # Check level completion: both all robots AND boss must be defeated
-                robots_alive = len([r for r in robots if r.alive])
+                # (defeated robots were just removed, so every listed robot is alive)
+                robots_alive = len(self.robots)
                 boss_alive = boss and boss.alive
                 
                 if robots_alive == 0 and not boss_alive:
-                    sound_manager.play_sound('level_complete')
-                    game_state = "level_complete"
-                    transition_timer = 180  # 3 seconds
+                    events.push(EVENT_LEVEL_COMPLETE, self.current_level)
+                    self.game_state = "level_complete"
+                    self.transition_timer = 180  # 3 seconds
                 
                 # Check if player reached boss area without defeating all robots
                 if player.x > WORLD_WIDTH - 500 and robots_alive > 0:
@@ -1973,188 +3208,640 @@ def main():
                     player.x = WORLD_WIDTH - 500
                     
             else:
-                game_state = "game_over"
+                self.game_state = "game_over"
         
-        elif game_state == "level_complete":
-            transition_timer -= 1
-            if transition_timer <= 0:
+        elif self.game_state == "level_complete":
+            self.transition_timer -= 1
+            if self.transition_timer <= 0:
                 # Auto-advance after showing completion message
-                current_level += 1
-                if current_level > 10:  # Changed from 5 to 10
-                    game_state = "victory"
-                else:
-                    player = Player(100, SCREEN_HEIGHT - 200)
-                    platforms, robots, diamonds, superdiamonds, boss = create_level(current_level)
-                    game_state = "playing"
-                    camera_x = 0
+                self.next_level()
+    
+    # Game states that show the level (the others show a full-screen message)
+    LEVEL_STATES = ("playing", "level_complete", "paused")
+    
+    INSTRUCTIONS = (
+        "Arrow Keys/WASD: Move & Jump",
+        "X: Punch, Z: Kick",
+        "P: Pause/Unpause",
+        "F5/F9: Save/Load checkpoint",
+        "Backspace (hold): Rewind",
+        "Collect diamonds & superdiamonds!",
+        "SuperDiamonds give special powers:",
+        "Yellow=Speed, Green=Jump, Pink=Invincible, Orange=Strength",
+        "Defeat ALL robots AND boss to complete level!",
+        "ESC: Quit"
+    )
+    
+    def draw(self, screen):
+        """Render the current frame onto screen (a Canvas). Canvases that keep the
+        previous frame (dirty_render.DirtyCanvas) compose it from the layers below."""
+        if screen.retained:
+            screen.draw_game(self)
+            return
         
-        # Draw everything
         screen.fill(BLUE)  # Sky background
+        if self.game_state in self.LEVEL_STATES:
+            self.draw_world(screen, self.camera_x)
+            self.draw_actors(screen, self.camera_x)
+            self.draw_hud(screen)
+        else:
+            self.draw_message(screen)
+    
+    def draw_world(self, screen, camera_x, left=0, right=SCREEN_WIDTH):
+        """Static scenery (platforms) overlapping screen columns [left, right)"""
+        for platform in self.platform_index.between(camera_x + left - DRAW_MARGIN,
+                                                    camera_x + right + DRAW_MARGIN):
+            platform.draw(screen, camera_x)
+    
+    def draw_actors(self, screen, camera_x):
+        """Everything in the world that moves or animates"""
+        # Draw diamonds, superdiamonds and robots near the viewport
+        diamonds = self.diamond_index.visible(camera_x)
+        for diamond in diamonds:
+            diamond.draw(screen, camera_x)
+        
+        superdiamonds = self.superdiamond_index.visible(camera_x)
+        for superdiamond in superdiamonds:
+            superdiamond.draw(screen, camera_x)
+        
+        robots = self.robot_index.visible(camera_x)
+        for robot in robots:
+            robot.draw(screen, camera_x)
+        metrics.entities_culled += (len(self.diamonds) - len(diamonds) + len(self.superdiamonds) -
+                                    len(superdiamonds) + len(self.robots) - len(robots))
+        
+        # Draw boss
+        boss = self.boss
+        if boss:
+            boss.draw(screen, camera_x)
+        
+        # Draw player
+        player = self.player
+        if player.lives > 0:
+            player.draw(screen, camera_x)
+            particles.draw(screen, camera_x, player.x, player.y)
+    
+    def draw_hud(self, screen):
+        """Status text, instructions and the level-complete and pause overlays"""
+        player = self.player
+        boss = self.boss
+        game_state = self.game_state
+        
+        diamonds_rect = screen.text(f"Diamonds: {player.diamonds}", 36, WHITE, (10, 10))
+        lost, frames_left = self.damage_flash
+        if frames_left > 0:
+            screen.text(f"-{lost}", 36, RED, (diamonds_rect.right + 10, 10))
+        
+        screen.text(f"Lives: {player.lives}", 36, WHITE, (10, 50))
+        
+        screen.text(f"Score: {self.score}", 36, WHITE, (10, 90))
+        
+        screen.text(f"Level: {self.current_level}", 36, WHITE, (10, 130))
+        
+        robots_left = len(self.robots)
+        boss_alive = boss and boss.alive
+        
+        # Show robots left
+        screen.text(f"Robots Left: {robots_left}", 36, WHITE, (10, 170))
+        
+        # Show boss status
+        if boss:
+            boss_status = "Boss: Alive" if boss_alive else "Boss: Defeated"
+            boss_color = RED if boss_alive else GREEN
+            screen.text(boss_status, 36, boss_color, (10, 195))
+        
+        # Show level completion requirement
+        if robots_left == 0 and boss_alive:
+            screen.text("Defeat the Boss to complete level!", 36, YELLOW, (10, 220))
+        elif robots_left > 0 and not boss_alive:
+            screen.text("Defeat all robots to complete level!", 36, YELLOW, (10, 220))
+        elif robots_left > 0 and boss_alive:
+            screen.text("Defeat all enemies to complete level!", 36, YELLOW, (10, 220))
+        
+        # Power-up status display
+        power_y = 250  # Moved down to accommodate new UI elements
+        powers = player.powers
+        if any(timer > 0 for timer in powers.values()):
+            screen.text("Active Powers:", 24, YELLOW, (10, power_y))
+            power_y += 25
+            
+            for power, timer in powers.items():
+                if timer > 0:
+                    time_left = timer // 60  # Convert to seconds
+                    color = SuperDiamond.COLORS.get(power, WHITE)
+                    screen.text(f"{power.upper()}: {time_left}s", 20, color, (10, power_y))
+                    power_y += 22
         
-        if game_state == "playing" or game_state == "level_complete" or game_state == "paused":
-            # Draw platforms
-            for platform in platforms:
-                platform.draw(screen, camera_x)
-            
-            # Draw diamonds
-            for diamond in diamonds:
-                diamond.draw(screen, camera_x)
-            
-            # Draw superdiamonds
-            for superdiamond in superdiamonds:
-                superdiamond.draw(screen, camera_x)
-            
-            # Draw robots
-            for robot in robots:
-                robot.draw(screen, camera_x)
-            
-            # Draw boss
-            if boss:
-                boss.draw(screen, camera_x)
-            
-            # Draw player
-            if player.lives > 0:
-                player.draw(screen, camera_x)
-            
-            # Draw UI
-            diamonds_text = font.render(f"Diamonds: {player.diamonds}", True, WHITE)
-            screen.blit(diamonds_text, (10, 10))
-            
-            lives_text = font.render(f"Lives: {player.lives}", True, WHITE)
-            screen.blit(lives_text, (10, 50))
-            
-            score_text = font.render(f"Score: {score}", True, WHITE)
-            screen.blit(score_text, (10, 90))
-            
-            level_text = font.render(f"Level: {current_level}", True, WHITE)
-            screen.blit(level_text, (10, 130))
-            
-            robots_left = len([r for r in robots if r.alive])
-            boss_alive = boss and boss.alive
-            
-            # Show robots left
-            robots_text = font.render(f"Robots Left: {robots_left}", True, WHITE)
-            screen.blit(robots_text, (10, 170))
+        # Instructions
+        for i, instruction in enumerate(self.INSTRUCTIONS):
+            screen.text(instruction, 20, WHITE, (SCREEN_WIDTH - 280, 10 + i * 22))
+        
+        # Level complete message
+        if game_state == "level_complete":
+            screen.text("LEVEL COMPLETE!", 72, YELLOW, (SCREEN_WIDTH//2 - 200, SCREEN_HEIGHT//2 - 50))
             
-            # Show boss status
-            if boss:
-                boss_status = "Boss: Alive" if boss_alive else "Boss: Defeated"
-                boss_color = RED if boss_alive else GREEN
-                boss_text = font.render(boss_status, True, boss_color)
-                screen.blit(boss_text, (10, 195))
+            if self.current_level < 10:  # Changed from 5 to 10
+                screen.text("Press ENTER for next level", 36, WHITE, (SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT//2 + 20))
+            else:
+                screen.text("Final level completed!", 36, WHITE, (SCREEN_WIDTH//2 - 120, SCREEN_HEIGHT//2 + 20))
+        
+        # Pause overlay
+        if game_state == "paused":
+            # Semi-transparent overlay
+            screen.overlay(BLACK, 128)
             
-            # Show level completion requirement
-            if robots_left == 0 and boss_alive:
-                requirement_text = font.render("Defeat the Boss to complete level!", True, YELLOW)
-                screen.blit(requirement_text, (10, 220))
-            elif robots_left > 0 and not boss_alive:
-                requirement_text = font.render("Defeat all robots to complete level!", True, YELLOW)
-                screen.blit(requirement_text, (10, 220))
-            elif robots_left > 0 and boss_alive:
-                requirement_text = font.render("Defeat all enemies to complete level!", True, YELLOW)
-                screen.blit(requirement_text, (10, 220))
-            
-            # Power-up status display
-            power_y = 250  # Moved down to accommodate new UI elements
-            active_powers = [power for power, timer in player.powers.items() if timer > 0]
-            if active_powers:
-                powers_text = pygame.font.Font(None, 24).render("Active Powers:", True, YELLOW)
-                screen.blit(powers_text, (10, power_y))
-                power_y += 25
-                
-                power_colors = {
-                    "speed": (255, 255, 0),
-                    "jump": (0, 255, 0),
-                    "invincible": (255, 0, 255),
-                    "strength": (255, 100, 0)
-                }
-                
-                for power in active_powers:
-                    time_left = player.powers[power] // 60  # Convert to seconds
-                    color = power_colors.get(power, WHITE)
-                    power_text = pygame.font.Font(None, 20).render(
-                        f"{power.upper()}: {time_left}s", True, color)
-                    screen.blit(power_text, (10, power_y))
-                    power_y += 22
+            # Pause text
+            screen.text("GAME PAUSED", 72, WHITE, (SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 50), "center")
             
             # Instructions
-            instructions = [
-                "Arrow Keys/WASD: Move & Jump",
-                "X: Punch, Z: Kick",
-                "P: Pause/Unpause",
-                "Collect diamonds & superdiamonds!",
-                "SuperDiamonds give special powers:",
-                "Yellow=Speed, Green=Jump, Pink=Invincible, Orange=Strength",
-                "Defeat ALL robots AND boss to complete level!",
-                "ESC: Quit"
-            ]
-            
-            for i, instruction in enumerate(instructions):
-                text = pygame.font.Font(None, 20).render(instruction, True, WHITE)
-                screen.blit(text, (SCREEN_WIDTH - 280, 10 + i * 22))
-            
-            # Level complete message
-            if game_state == "level_complete":
-                complete_text = big_font.render("LEVEL COMPLETE!", True, YELLOW)
-                screen.blit(complete_text, (SCREEN_WIDTH//2 - 200, SCREEN_HEIGHT//2 - 50))
-                
-                if current_level < 10:  # Changed from 5 to 10
-                    next_text = font.render("Press ENTER for next level", True, WHITE)
-                    screen.blit(next_text, (SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT//2 + 20))
-                else:
-                    final_text = font.render("Final level completed!", True, WHITE)
-                    screen.blit(final_text, (SCREEN_WIDTH//2 - 120, SCREEN_HEIGHT//2 + 20))
+            screen.text("Press P to resume", 36, WHITE, (SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 20), "center")
             
-            # Pause overlay
-            if game_state == "paused":
-                # Semi-transparent overlay
-                pause_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-                pause_overlay.set_alpha(128)  # Semi-transparent
-                pause_overlay.fill(BLACK)
-                screen.blit(pause_overlay, (0, 0))
-                
-                # Pause text
-                pause_text = big_font.render("GAME PAUSED", True, WHITE)
-                pause_rect = pause_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 50))
-                screen.blit(pause_text, pause_rect)
-                
-                # Instructions
-                resume_text = font.render("Press P to resume", True, WHITE)
-                resume_rect = resume_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 20))
-                screen.blit(resume_text, resume_rect)
-                
-                quit_text = font.render("Press ESC to quit", True, WHITE)
-                quit_rect = quit_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 60))
-                screen.blit(quit_text, quit_rect)
-        
-        elif game_state == "game_over":
-            game_over_text = big_font.render("GAME OVER!", True, RED)
-            screen.blit(game_over_text, (SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT//2 - 50))
+            screen.text("Press ESC to quit", 36, WHITE, (SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 60), "center")
+    
+    def draw_message(self, screen):
+        """Game over and victory screens"""
+        if self.game_state == "game_over":
+            screen.text("GAME OVER!", 72, RED, (SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT//2 - 50))
             
-            final_score_text = font.render(f"Final Score: {score}", True, WHITE)
-            screen.blit(final_score_text, (SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT//2 + 20))
+            screen.text(f"Final Score: {self.score}", 36, WHITE, (SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT//2 + 20))
             
-            restart_text = font.render("Press R to restart", True, WHITE)
-            screen.blit(restart_text, (SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT//2 + 60))
+            screen.text("Press R to restart", 36, WHITE, (SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT//2 + 60))
             
-        elif game_state == "victory":
-            victory_text = big_font.render("VICTORY!", True, YELLOW)
-            screen.blit(victory_text, (SCREEN_WIDTH//2 - 120, SCREEN_HEIGHT//2 - 100))
+        elif self.game_state == "victory":
+            screen.text("VICTORY!", 72, YELLOW, (SCREEN_WIDTH//2 - 120, SCREEN_HEIGHT//2 - 100))
             
-            congrats_text = font.render("You defeated all 10 levels!", True, WHITE)
-            screen.blit(congrats_text, (SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT//2 - 30))
+            screen.text("You defeated all 10 levels!", 36, WHITE, (SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT//2 - 30))
             
-            final_score_text = font.render(f"Final Score: {score}", True, WHITE)
-            screen.blit(final_score_text, (SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT//2 + 10))
+            screen.text(f"Final Score: {self.score}", 36, WHITE, (SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT//2 + 10))
             
-            restart_text = font.render("Press R to play again", True, WHITE)
-            screen.blit(restart_text, (SCREEN_WIDTH//2 - 120, SCREEN_HEIGHT//2 + 50))
+            screen.text("Press R to play again", 36, WHITE, (SCREEN_WIDTH//2 - 120, SCREEN_HEIGHT//2 + 50))
+
+def run_headless(game, frames, replay=None, screen=None, on_frame=None):
+    """Run frames of the game without a window, rendering to screen if given"""
+    for frame in range(frames):
+        started = time.perf_counter()
+        if replay is not None:
+            keys, keydowns = replay.inputs(frame)
+            for key in keydowns:
+                game.handle_key(key)
+        else:
+            keys = KeyState()
+        game.update(keys)
+        events.dispatch()
+        if on_frame is not None:
+            on_frame(game)
+        if screen is not None:
+            game.draw(screen)
+            screen.present()
+        gc_policy.idle(started + gc_policy.budget, game.game_state != "playing")
+
+def add_run_arguments(parser, seed=None):
+    """Add the --level/--seed options shared by play and the tool subcommands"""
+    parser.add_argument("--level", type=int, default=1, choices=range(1, 11),
+                        metavar="N", help="level to start on (1-10)")
+    parser.add_argument("--seed", type=int, default=seed,
+                        help="random seed for a reproducible run")
+
+def render_scale(value):
+    """argparse type for --render-scale"""
+    scale = float(value)
+    if not 0.1 <= scale <= 2:
+        raise argparse.ArgumentTypeError(f"render scale must be between 0.1 and 2, got {value}")
+    return scale
+
+# Simulation speeds the [ and ] keys step through: 1/8 to 8 ticks per frame
+TIME_SCALES = (1 / 8, 1 / 4, 1 / 2, 1, 2, 4, 8)
+
+def time_scale(value):
+    """argparse type for --time-scale: K ticks per frame, or 1/K for one tick every K frames"""
+    try:
+        if value.startswith("1/"):
+            scale = 1 / int(value[2:])
+        else:
+            scale = float(value)
+    except (ValueError, ZeroDivisionError):
+        raise argparse.ArgumentTypeError(f"invalid time scale {value!r}")
+    ticks = scale if scale >= 1 else 1 / scale if scale > 0 else 0
+    if not 1 <= ticks <= 64 or ticks != round(ticks):
+        raise argparse.ArgumentTypeError(f"time scale must be K or 1/K for a whole K "
+                                         f"up to 64, got {value}")
+    return scale
+
+# Drawing backends: pygame.Surface (redrawing everything, or only what changed),
+# or SDL2 textures (GPU, or SDL's software renderer)
+RENDERERS = ("surface", "surface-dirty", "sdl2", "sdl2-software")
+
+def add_render_arguments(parser):
+    """Add the --renderer/--render-scale options shared by play, bench and profile"""
+    parser.add_argument("--renderer", choices=RENDERERS, default="surface",
+                        help="drawing backend (default: surface; surface-dirty redraws only "
+                             "what changed, at render scale 1; sdl2-software needs no GPU)")
+    parser.add_argument("--render-scale", type=render_scale, default=1.0, metavar="SCALE",
+                        help="internal render resolution relative to 1024x768, e.g. 0.5 (default: 1)")
+    parser.add_argument("--quality", choices=("auto",) + QUALITY_LEVELS, default="auto",
+                        help="visual effect detail (default: auto, which steps down from high "
+                             "while frames run over budget; headless runs stay at high)")
+
+def offscreen_canvas(renderer="surface", scale=1.0):
+    """Canvas for headless runs that presents like a native-size game window"""
+    if renderer == "surface":
+        return window_canvas(pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)), scale)
+    if renderer == "surface-dirty":
+        import dirty_render
+        return dirty_render.DirtyCanvas(pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)))
+    import sdl2_canvas
+    return sdl2_canvas.create(scale, software=renderer == "sdl2-software", hidden=True)[1]
+
+def window_canvas(window, scale, smooth=False):
+    """Canvas for the window: drawn directly at native size and scale 1, otherwise
+    rendered offscreen and scaled into the window by present()"""
+    if scale == 1 and window.get_size() == (SCREEN_WIDTH, SCREEN_HEIGHT):
+        return Canvas(window, window=window)
+    return Canvas(scale=scale, window=window, smooth=smooth)
+
+def build_arg_parser():
+    import assetpack
+    import benchmarks
+    import collision_check
+    import offline_render
+    import profiling
+    import soak
+    
+    parser = argparse.ArgumentParser(
+        prog="retro-platform",
+        description="Retro Platform Fighter - Diamond Quest")
+    add_run_arguments(parser)
+    parser.add_argument("--record", metavar="PATH",
+                        help="record the run's input to a replay file")
+    parser.add_argument("--checkpoint", metavar="PATH", default="checkpoint.sav",
+                        help="save state file for F5 (save) and F9 (load)")
+    parser.add_argument("--rewind", type=float, default=10, metavar="SECONDS",
+                        help="seconds of gameplay kept for Backspace rewind (0 disables)")
+    parser.add_argument("--async", dest="async_loop", action="store_true",
+                        help="run the game loop on asyncio, with background work (checkpoint "
+                             "writes) as executor jobs between frames")
+    parser.add_argument("--input-latency", action="store_true",
+                        help="measure key press to displayed frame latency and print it on exit")
+    parser.add_argument("--time-scale", type=time_scale, default=1, metavar="SCALE",
+                        help="gameplay speed: K runs K simulation ticks per frame (turbo), "
+                             "1/K one tick every K frames (slow motion); [ and ] step it")
+    parser.add_argument("--no-gc-policy", dest="gc_policy", action="store_false",
+                        help="leave garbage collection automatic instead of running it in "
+                             "idle frame time (see GCPolicy)")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve hot-path counters in the Prometheus text format at "
+                             "http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="append the counters to a JSON lines file every --metrics-interval")
+    parser.add_argument("--metrics-interval", type=float, default=10, metavar="SECONDS",
+                        help="seconds between --metrics-file lines (default: 10)")
+    add_render_arguments(parser)
+    parser.add_argument("--smooth-scale", action="store_true",
+                        help="filter the scaled frame instead of nearest-neighbour scaling")
+    parser.add_argument("--fullscreen", action="store_true",
+                        help="run fullscreen at the desktop resolution")
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    profiling.add_parser(subparsers)
+    benchmarks.add_parser(subparsers)
+    offline_render.add_parser(subparsers)
+    assetpack.add_parser(subparsers)
+    collision_check.add_parser(subparsers)
+    soak.add_parser(subparsers)
+    return parser
+
+class AsyncClock:
+    """pygame.time.Clock.tick() for an asyncio loop: the rest of the frame is
+    slept with asyncio.sleep, so background tasks and executor callbacks run
+    in it instead of the thread blocking. Always yields at least once.
+    Frames are scheduled on a fixed grid, so event loop timer slack on one
+    frame is made up on the next."""
+    def __init__(self):
+        self.clock = pygame.time.Clock()  # Keeps get_fps() working
+        self._last = self._next = time.perf_counter()
+    
+    async def tick(self, framerate=0):
+        """Wait for the next 1/framerate slot; returns ms since the previous tick"""
+        delay = 0.0
+        if framerate:
+            now = time.perf_counter()
+            self._next = max(self._next + 1.0 / framerate, now - 1.0 / framerate)  # No catch-up bursts
+            delay = self._next - now
+        await asyncio.sleep(max(0.0, delay))
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        self.clock.tick()
+        return int(elapsed * 1000)
+    
+    def get_fps(self):
+        return self.clock.get_fps()
+
+class WindowActivity:
+    """Decides how often the main loop needs frames. While the game is paused
+    the last presented frame (pause overlay included) stays on screen and the
+    loop only wakes for events; while the window is unfocused or minimized it
+    runs at IDLE_FPS."""
+    FROZEN_WAIT_MS = 500  # Longest sleep between event checks while frozen
+    
+    def __init__(self):
+        self.focused = True
+        self.minimized = False
+        self.frozen = False  # The paused frame on screen is still current
+    
+    def handle(self, event):
+        """Track window events; returns True when the window lost its contents"""
+        if event.type == pygame.WINDOWFOCUSLOST:
+            self.focused = False
+        elif event.type == pygame.WINDOWFOCUSGAINED:
+            self.focused = True
+        elif event.type == pygame.WINDOWMINIMIZED:
+            self.minimized = True
+        elif event.type == pygame.WINDOWRESTORED:
+            self.minimized = False
+            return True
+        return event.type in (pygame.WINDOWEXPOSED, pygame.WINDOWSIZECHANGED)
+    
+    def framerate(self):
+        if self.frozen or self.minimized or not self.focused:
+            return IDLE_FPS
+        return FPS
+    
+    def wait(self):
+        """Block until an event arrives (or FROZEN_WAIT_MS passes), leaving it queued"""
+        event = pygame.event.wait(self.FROZEN_WAIT_MS)
+        if event.type != pygame.NOEVENT:
+            pygame.event.post(event)
+
+class TimeScale:
+    """Gameplay speed for QA and demos, on top of the FPS display rate. Turbo
+    (scale K) runs K simulation ticks per frame and draws only the last;
+    slow motion (1/K) runs one tick every K frames, and the frames between
+    draw nothing. The ticks actually run are measured over each second, as
+    turbo can ask for more than the machine keeps up with."""
+    def __init__(self, scale=1):
+        self.tps = FPS  # Ticks per second achieved over the last second
+        self._count = 0
+        self._since = time.perf_counter()
+        self.set(scale)
+    
+    def set(self, scale):
+        self.scale = scale
+        self._every = round(1 / scale) if scale < 1 else 1  # Frames per tick
+        self._wait = 0  # Frames left before the next slow-motion tick
+    
+    def step(self, direction):
+        """Step to the next slower (-1) or faster (1) of TIME_SCALES, or back to 1 (0)"""
+        if not direction:
+            self.set(1)
+            return
+        nearest = min(range(len(TIME_SCALES)), key=lambda i: abs(TIME_SCALES[i] - self.scale))
+        self.set(TIME_SCALES[max(0, min(len(TIME_SCALES) - 1, nearest + direction))])
+    
+    def ticks(self):
+        """Simulation ticks to run this frame"""
+        if self.scale >= 1:
+            return int(self.scale)
+        if self._wait:
+            self._wait -= 1
+            return 0
+        self._wait = self._every - 1
+        return 1
+    
+    def ticked(self, count):
+        """Count ticks run, for tps"""
+        self._count += count
+        now = time.perf_counter()
+        if now - self._since >= 1.0:
+            self.tps = self._count / (now - self._since)
+            self._count = 0
+            self._since = now
+    
+    def label(self):
+        """HUD text: the speed and the ticks per second achieved"""
+        if self.scale >= 1:
+            speed = f"TURBO x{int(self.scale)}"
+        else:
+            speed = f"SLOW MOTION x1/{self._every}"
+        return f"{speed}: {self.tps:.0f} ticks/s"
+
+async def run_async(frame, checkpoints, background=(), framerate=None):
+    """Run frame() once per tick on the asyncio event loop until it returns
+    False. framerate() gives the rate of the next tick (default FPS).
+    background coroutines run as tasks alongside and are cancelled on exit;
+    pending checkpoint writes are awaited."""
+    clock = AsyncClock()
+    tasks = [asyncio.create_task(coroutine) for coroutine in background]
+    try:
+        while frame():
+            await clock.tick(framerate() if framerate is not None else FPS)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await checkpoints.close()
+
+def main(argv=None):
+    import rewind
+    import savestate
+    
+    args = build_arg_parser().parse_args(argv)
+    if args.command is not None:
+        sys.exit(args.handler(args))
+    
+    if args.renderer == "surface":
+        if args.fullscreen:
+            window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            window = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
+        pygame.display.set_caption("Retro Platform Fighter - Diamond Quest")
+        canvas = window_canvas(window, args.render_scale, args.smooth_scale)
+    elif args.renderer == "surface-dirty":
+        import dirty_render
+        if args.render_scale != 1:
+            print("--render-scale is ignored by the surface-dirty renderer", file=sys.stderr)
+        # SDL scales the native-size display surface to a resized or fullscreen window
+        flags = pygame.SCALED | (pygame.FULLSCREEN if args.fullscreen else pygame.RESIZABLE)
+        window = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), flags)
+        pygame.display.set_caption("Retro Platform Fighter - Diamond Quest")
+        canvas = dirty_render.DirtyCanvas(window, display=True)
+    else:
+        import sdl2_canvas
+        window, canvas = sdl2_canvas.create(args.render_scale, args.renderer == "sdl2-software",
+                                            args.smooth_scale, args.fullscreen)
+    clock = pygame.time.Clock()
+    
+    replay = None
+    seed = args.seed
+    if args.record:
+        if seed is None:
+            seed = random.randrange(2**32)
+        replay = Replay(args.level, seed)
+    
+    # Create game objects
+    quality.set(args.quality)
+    if args.gc_policy:
+        gc_policy.start()
+    game = Game(args.level, seed)
+    game.input.measure_latency = args.input_latency
+    events.attach(play_event_sounds)
+    events.attach(game.on_events)
+    
+    # Counters for monitoring, exported off the frame thread; off unless asked for
+    exporter = None
+    if args.metrics_port is not None or args.metrics_file:
+        import metrics_exporter
+        try:
+            exporter = metrics_exporter.MetricsExporter(args.metrics_port, args.metrics_file,
+                                                        args.metrics_interval)
+            metrics.instrument(canvas)
+        except OSError as e:
+            print(f"Warning: Could not export metrics: {e}", file=sys.stderr)
+    
+    # Checkpoints are written in the background (a thread, or executor jobs on the
+    # asyncio loop); F9 reloads the latest one
+    checkpoints = savestate.AsyncCheckpointWriter() if args.async_loop else savestate.CheckpointWriter()
+    checkpoint = None
+    
+    # Holding Backspace steps back through the last few seconds of play. A
+    # replay only holds input, so it could not play a rewind back: recording
+    # turns rewind off
+    rewind_buffer = None
+    if args.rewind > 0 and replay is not None:
+        print("Rewind is disabled while recording a replay", file=sys.stderr)
+    elif args.rewind > 0:
+        rewind_buffer = rewind.RewindBuffer(args.rewind)
+    
+    # Paused, unfocused and minimized windows use next to no CPU
+    activity = WindowActivity()
+    speed = TimeScale(args.time_scale)
+    pending_keydowns = []  # Recorded with the next simulation tick
+    
+    def frame():
+        """Handle events, update and draw one frame; returns False to quit"""
+        nonlocal window, canvas, checkpoint
+        started = time.perf_counter()
+        keydowns = []
+        redraw = False
         
-        pygame.display.flip()
-        clock.tick(FPS)
+        # Handle events
+        for event in pygame.event.get():
+            if activity.handle(event):
+                canvas.invalidate()
+                redraw = True
+            if event.type == pygame.QUIT:
+                return False
+            elif event.type == pygame.VIDEORESIZE and args.renderer == "surface":
+                # SDL2 renderers rescale to the new window size by themselves
+                window = pygame.display.get_surface()
+                canvas = window_canvas(window, args.render_scale, args.smooth_scale)
+                if exporter is not None:
+                    metrics.instrument(canvas)
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    return False
+                elif event.key == pygame.K_F5:
+                    checkpoint = savestate.snapshot(game)
+                    checkpoints.write(args.checkpoint, checkpoint)
+                    print(f"Checkpoint saved to {args.checkpoint}")
+                elif event.key == pygame.K_F9 and replay is not None:
+                    # The replay would play on from the state before the load
+                    print("Checkpoints can't be loaded while recording a replay", file=sys.stderr)
+                elif event.key == pygame.K_F9:
+                    if checkpoint is None and os.path.exists(args.checkpoint):
+                        checkpoint = savestate.load(args.checkpoint)
+                    if checkpoint is not None:
+                        savestate.restore(game, checkpoint)
+                        redraw = True
+                        print("Checkpoint loaded")
+                elif event.key in TIME_SCALE_KEYS:
+                    speed.step(TIME_SCALE_KEYS[event.key])
+                    redraw = True
+                else:
+                    keydowns.append(event.key)
+                    game.handle_key(event.key)
+            elif event.type in (pygame.WINDOWFOCUSLOST, pygame.WINDOWMINIMIZED):
+                if game.game_state == "playing":
+                    # Same as pressing P, so replays pause here too
+                    keydowns.append(pygame.K_p)
+                    game.handle_key(pygame.K_p)
+        
+        keys = pygame.key.get_pressed()
+        rewinding = rewind_buffer is not None and keys[pygame.K_BACKSPACE]
+        if activity.frozen and not keydowns and not redraw and not rewinding:
+            return True  # Nothing on screen would change
+        
+        # Turbo runs several ticks and draws only the last; slow motion runs
+        # none on most frames. Replays record one entry per tick
+        ticks = 1 if rewinding else speed.ticks()
+        pending_keydowns.extend(keydowns)
+        if replay is not None and not rewinding:
+            held = [key for key in CONTROL_KEYS if keys[key]]
+            for tick in range(ticks):
+                replay.record(held, pending_keydowns if tick == 0 else ())
+        if ticks:
+            pending_keydowns.clear()
+        
+        if rewinding:
+            rewind_buffer.step_back(game)
+            game.input.clear()
+        else:
+            for _ in range(ticks):
+                game.update(keys)
+                if rewind_buffer is not None and game.game_state != "paused":
+                    rewind_buffer.record(game)
+            speed.ticked(ticks)
+            if not (ticks or keydowns or redraw):
+                return True  # Slow motion between ticks: the frame on screen is current
+        # A turbo frame's events arrive as one batch, which plays each sound once
+        events.dispatch()
+        game.draw(canvas)
+        
+        if rewinding:
+            canvas.text(f"<< REWIND {rewind_buffer.seconds():.1f}s", 36, YELLOW,
+                        (SCREEN_WIDTH//2, 10), "midtop")
+        if speed.scale != 1:
+            canvas.text(speed.label(), 28, YELLOW, (SCREEN_WIDTH//2, 50), "midtop")
+        
+        canvas.present()
+        if args.renderer == "surface":
+            pygame.display.flip()
+        game.input.presented()
+        work = time.perf_counter() - started
+        if ticks <= 1:
+            # Turbo frames are over budget by design; don't let them lower the detail
+            quality.frame(work)
+        metrics.frame(work)
+        activity.frozen = game.game_state == "paused" and not rewinding
+        gc_policy.idle(started + gc_policy.budget, game.game_state != "playing")
+        return True
+    
+    if args.async_loop:
+        # Blocking on events would stall background work, so frozen frames tick at IDLE_FPS
+        asyncio.run(run_async(frame, checkpoints, framerate=activity.framerate))
+    else:
+        while frame():
+            if activity.frozen:
+                activity.wait()
+            else:
+                clock.tick(activity.framerate())
+        checkpoints.close()
+    gc_policy.stop()
+    if exporter is not None:
+        exporter.close()
+    
+    if args.input_latency:
+        stats = game.input.latency_stats()
+        if stats["count"]:
+            print(f"Input latency over {stats['count']} presses: mean {stats['mean']:.1f} ms, "
+                  f"p95 {stats['p95']:.1f} ms, max {stats['max']:.1f} ms")
+    if replay is not None:
+        replay.save(args.record)
+        print(f"Replay saved to {args.record} ({len(replay.frames)} frames)")
     
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
+    # Tool modules import the game by name - make them share this instance
+    sys.modules.setdefault("retro_platform_game", sys.modules[__name__])
     main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Rewind buffer for Retro Platform Fighter - Diamond Quest
+Keeps the last N seconds of gameplay in memory as periodic keyframes (full
+save states) plus per-frame deltas of only the bytes that changed since the
+previous frame. Deltas are stored as XOR masks, so one delta steps both forward
+and back and a held rewind key runs at full frame rate.
+
+Usage:
+    buffer = rewind.RewindBuffer(seconds=10)
+    buffer.record(game)        # after every update
+    buffer.step_back(game)     # while the rewind key is held
+"""
+
+import time
+from collections import deque
+
+import numpy
+
+import retro_platform_game as rpg
+import savestate
+
+# Approximate per-record Python object overhead (tuple, arrays, deque slot)
+RECORD_OVERHEAD = 200
+
+class RewindBuffer:
+    """Bounded history of save states stored as keyframes plus byte deltas"""
+    def __init__(self, seconds=10, keyframe_interval=60, max_bytes=32 * 1024 * 1024):
+        self.capacity = int(seconds * rpg.FPS)
+        self.keyframe_interval = keyframe_interval
+        self.max_bytes = max_bytes
+        # Each record is ("key", state) or ("delta", positions, xor_mask)
+        self.records = deque()
+        self.bytes = 0
+        self._current = None  # State after the newest record, as a uint8 array
+        self._base = None     # State before the oldest record
+        self._since_key = 0
+        # Cost accounting for the profiler
+        self.recorded = 0
+        self.keyframes = 0
+        self.record_seconds = 0.0
+        self.recorded_bytes = 0
+
+    def __len__(self):
+        return len(self.records)
+
+    @staticmethod
+    def _record_size(record):
+        if record[0] == "key":
+            return record[1].nbytes + RECORD_OVERHEAD
+        return record[1].nbytes + record[2].nbytes + RECORD_OVERHEAD
+
+    def _append(self, record, state):
+        size = self._record_size(record)
+        self.records.append(record)
+        self.bytes += size
+        self.recorded_bytes += size
+        self._current = state
+        while self.records and (len(self.records) > self.capacity or self.bytes > self.max_bytes):
+            self._evict()
+
+    def _evict(self):
+        """Drop the oldest frame, folding it into the base state"""
+        record = self.records.popleft()
+        self.bytes -= self._record_size(record)
+        if record[0] == "key":
+            self._base = record[1]
+        else:
+            base = self._base.copy()
+            base[record[1]] ^= record[2]
+            self._base = base
+
+    def record(self, game):
+        """Store the state of game after a frame"""
+        start = time.perf_counter()
+        state = numpy.frombuffer(savestate.snapshot(game), numpy.uint8)
+        previous = self._current
+        if previous is None:
+            self._base = state
+            self._current = state
+        elif previous.shape != state.shape or self._since_key + 1 >= self.keyframe_interval:
+            # Entity counts changed (or a keyframe is due): store the full state
+            self._append(("key", state), state)
+            self._since_key = 0
+            self.keyframes += 1
+        else:
+            mask = previous ^ state
+            positions = numpy.flatnonzero(mask)
+            positions = positions.astype(numpy.uint16 if state.size <= 0xFFFF else numpy.uint32)
+            self._append(("delta", positions, mask[positions]), state)
+            self._since_key += 1
+        self.recorded += 1
+        self.record_seconds += time.perf_counter() - start
+
+    def _state_before(self, index):
+        """Rebuild the state before records[index] from the nearest earlier keyframe"""
+        state, start = self._base, 0
+        for i in range(index - 1, -1, -1):
+            if self.records[i][0] == "key":
+                state, start = self.records[i][1], i + 1
+                break
+        state = state.copy()
+        for i in range(start, index):
+            record = self.records[i]
+            state[record[1]] ^= record[2]
+        return state
+
+    def step_back(self, game):
+        """Rewind game by one frame; returns False once the buffer is exhausted"""
+        if not self.records:
+            return False
+        record = self.records[-1]
+        if record[0] == "key":
+            state = self._state_before(len(self.records) - 1)
+        else:
+            state = self._current.copy()
+            state[record[1]] ^= record[2]
+        self.records.pop()
+        self.bytes -= self._record_size(record)
+        self._current = state
+        self._since_key = 0  # Record a fresh keyframe interval from here
+        savestate.restore(game, state)
+        return True
+
+    def seconds(self):
+        return len(self.records) / rpg.FPS
+
+    def stats(self):
+        """Memory and CPU cost per recorded frame"""
+        frames = max(1, self.recorded)
+        return {
+            "frames": len(self.records),
+            "keyframes": self.keyframes,
+            "bytes": self.bytes,
+            "bytes_per_frame": self.recorded_bytes / frames,
+            "record_us_per_frame": self.record_seconds / frames * 1e6,
+        }
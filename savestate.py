@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Save states for Retro Platform Fighter - Diamond Quest
+Packs the full simulation state (player, robots, boss, collectibles, platforms,
+particles, combat hit registries, camera, score, level and RNG state) into a compact binary blob with precompiled
+structs, and writes checkpoints to disk on a background thread.
+
+Usage:
+    data = savestate.snapshot(game)
+    savestate.restore(game, data)
+
+    writer = savestate.CheckpointWriter()
+    writer.write("checkpoint.sav", data)   # returns immediately
+    writer.close()                         # flushes pending writes
+
+    writer = savestate.AsyncCheckpointWriter()  # on the asyncio game loop
+    writer.write("checkpoint.sav", data)
+    await writer.close()
+"""
+
+import asyncio
+import os
+import random
+import struct
+import sys
+import threading
+
+import retro_platform_game as rpg
+
+MAGIC = b"RPSV"
+VERSION = 5
+
+# Strings stored as small codes
+GAME_STATES = ("playing", "paused", "level_complete", "game_over", "victory")
+ROBOT_TYPES = ("normal", "tough")
+POWER_TYPES = rpg.POWER_NAMES
+
+HEADER = struct.Struct("<4sH")
+# level, score, camera_x, game_state, transition_timer, has seed, seed,
+# damage flash (diamonds lost, frames left)
+GAME = struct.Struct("<iqdBi?qii")
+# x, y, vel_x, vel_y, on_ground, facing_right, punching, kicking, punch_timer,
+# kick_timer, diamonds, lives, invulnerable, animation_frame, jump_cooldown,
+# stamina, power_cooldown, powers (speed, jump, invincible, strength),
+# punch_swing, kick_swing, held_actions, jump_buffer, punch_buffer, kick_buffer,
+# coyote_frames
+PLAYER = struct.Struct("<dddd????iiiiiiidi4iii5i")
+# kind, x, y, timer, size, flag
+PARTICLE = struct.Struct("<BddiiB")
+PLATFORM = struct.Struct("<iiii")
+# x, y, vel_x, vel_y, max_health, health, alive, attack_timer, patrol_distance,
+# start_x, type, speed, attack_damage, detection_range, aggression_timer
+ROBOT = struct.Struct("<ddddii?iidBdiii")
+# x, y, vel_x, vel_y, max_health, health, alive, attack_timer, level, phase,
+# attack_pattern, animation, move_timer, jump_timer, charge_timer, is_charging,
+# base_damage
+BOSS = struct.Struct("<ddddii?iiiidiii?i")
+# x, y, collected, animation
+DIAMOND = struct.Struct("<dd?d")
+# x, y, collected, animation, power_type
+SUPERDIAMOND = struct.Struct("<dd?dB")
+COUNT = struct.Struct("<I")
+# Hit registry: swing serial, target count, then one TARGET each
+REGISTRY = struct.Struct("<iI")
+TARGET = struct.Struct("<i")  # Index into robots, or -1 for the boss
+# Mersenne Twister state: version, 625 words, has gauss_next, gauss_next
+RNG = struct.Struct("<B625I?d")
+
+def _pack_list(parts, items, pack):
+    parts.append(COUNT.pack(len(items)))
+    parts.extend(pack(item) for item in items)
+
+def _pack_player(player):
+    powers = player.powers
+    return PLAYER.pack(
+        player.x, player.y, player.vel_x, player.vel_y,
+        player.on_ground, player.facing_right, player.punching, player.kicking,
+        player.punch_timer, player.kick_timer, player.diamonds, player.lives,
+        player.invulnerable, player.animation_frame, player.jump_cooldown,
+        player.stamina, player.power_cooldown,
+        powers["speed"], powers["jump"], powers["invincible"], powers["strength"],
+        player.punch_swing, player.kick_swing, player.held_actions, player.jump_buffer,
+        player.punch_buffer, player.kick_buffer, player.coyote_frames)
+
+def _pack_particles(parts, pool):
+    parts.append(COUNT.pack(pool.count))
+    for i in range(pool.count):
+        parts.append(PARTICLE.pack(pool.kind[i], pool.x[i], pool.y[i], pool.timer[i],
+                                   pool.size[i], pool.flag[i]))
+
+def _pack_platform(platform):
+    rect = platform.rect
+    return PLATFORM.pack(rect.x, rect.y, rect.width, rect.height)
+
+def _pack_robot(robot):
+    return ROBOT.pack(
+        robot.x, robot.y, robot.vel_x, robot.vel_y, robot.max_health, robot.health,
+        robot.alive, robot.attack_timer, robot.patrol_distance, robot.start_x,
+        ROBOT_TYPES.index(robot.type), robot.speed, robot.attack_damage,
+        robot.detection_range, robot.aggression_timer)
+
+def _pack_boss(boss):
+    return BOSS.pack(
+        boss.x, boss.y, boss.vel_x, boss.vel_y, boss.max_health, boss.health,
+        boss.alive, boss.attack_timer, boss.level, boss.phase, boss.attack_pattern,
+        boss.animation, boss.move_timer, boss.jump_timer, boss.charge_timer,
+        boss.is_charging, boss.base_damage)
+
+def _pack_diamond(diamond):
+    return DIAMOND.pack(diamond.x, diamond.y, diamond.collected, diamond.animation)
+
+def _pack_superdiamond(superdiamond):
+    return SUPERDIAMOND.pack(superdiamond.x, superdiamond.y, superdiamond.collected,
+                             superdiamond.animation, POWER_TYPES.index(superdiamond.power_type))
+
+def _pack_registries(parts, game):
+    for attack, _ in rpg.CombatSystem.ATTACKS:
+        swing, hits = game.combat.registries[attack]
+        parts.append(REGISTRY.pack(swing, len(hits)))
+        # Sorted so the same state always packs to the same bytes
+        parts.extend(TARGET.pack(index) for index in sorted(
+            -1 if target is game.boss else game.robots.index(target) for target in hits))
+
+def _pack_rng():
+    version, words, gauss_next = random.getstate()
+    return RNG.pack(version, *words, gauss_next is not None,
+                    gauss_next if gauss_next is not None else 0.0)
+
+def snapshot(game):
+    """Serialize the full simulation state of game to bytes"""
+    player = game.player
+    parts = [
+        HEADER.pack(MAGIC, VERSION),
+        GAME.pack(game.current_level, game.score, game.camera_x,
+                  GAME_STATES.index(game.game_state), game.transition_timer,
+                  game.seed is not None, game.seed or 0, *game.damage_flash),
+        _pack_player(player),
+    ]
+    _pack_particles(parts, rpg.particles)
+    _pack_list(parts, game.platforms, _pack_platform)
+    _pack_list(parts, game.robots, _pack_robot)
+    _pack_list(parts, game.diamonds, _pack_diamond)
+    _pack_list(parts, game.superdiamonds, _pack_superdiamond)
+    parts.append(COUNT.pack(1 if game.boss is not None else 0))
+    if game.boss is not None:
+        parts.append(_pack_boss(game.boss))
+    _pack_registries(parts, game)
+    parts.append(_pack_rng())
+    return b"".join(parts)
+
+class _Reader:
+    """Sequential struct reader over a bytes-like buffer"""
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def read(self, layout):
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def count(self):
+        return self.read(COUNT)[0]
+
+def _resize(items, count, pool, *args):
+    """Trim or grow a list in place, reusing existing objects; trimmed entities go
+    back to pool and new ones come from it, built with placeholder args"""
+    pool.release_all(items[count:])
+    del items[count:]
+    while len(items) < count:
+        items.append(pool.acquire(*args))
+
+def _restore_player(player, values):
+    (player.x, player.y, player.vel_x, player.vel_y,
+     player.on_ground, player.facing_right, player.punching, player.kicking,
+     player.punch_timer, player.kick_timer, player.diamonds, player.lives,
+     player.invulnerable, player.animation_frame, player.jump_cooldown,
+     player.stamina, player.power_cooldown,
+     speed, jump, invincible, strength,
+     player.punch_swing, player.kick_swing, player.held_actions, player.jump_buffer,
+     player.punch_buffer, player.kick_buffer, player.coyote_frames) = values
+    powers = player.powers
+    powers["speed"], powers["jump"] = speed, jump
+    powers["invincible"], powers["strength"] = invincible, strength
+
+def _restore_particles(pool, reader):
+    pool.clear()
+    for _ in range(reader.count()):
+        pool.spawn(*reader.read(PARTICLE))
+
+def _restore_robot(robot, values):
+    (robot.x, robot.y, robot.vel_x, robot.vel_y, robot.max_health, robot.health,
+     robot.alive, robot.attack_timer, robot.patrol_distance, robot.start_x,
+     robot_type, robot.speed, robot.attack_damage, robot.detection_range,
+     robot.aggression_timer) = values
+    robot.type = ROBOT_TYPES[robot_type]
+
+def _restore_boss(boss, values):
+    (boss.x, boss.y, boss.vel_x, boss.vel_y, boss.max_health, boss.health,
+     boss.alive, boss.attack_timer, boss.level, boss.phase, boss.attack_pattern,
+     boss.animation, boss.move_timer, boss.jump_timer, boss.charge_timer,
+     boss.is_charging, boss.base_damage) = values
+
+def restore(game, data):
+    """Restore game in place from bytes produced by snapshot()"""
+    reader = _Reader(data)
+    magic, version = reader.read(HEADER)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a version {VERSION} save state")
+
+    (level, score, camera_x, state, transition_timer, has_seed, seed,
+     lost, frames_left) = reader.read(GAME)
+    game.current_level = level
+    game.score = score
+    game.camera_x = camera_x
+    game.game_state = GAME_STATES[state]
+    game.transition_timer = transition_timer
+    game.seed = seed if has_seed else None
+    game.damage_flash = (lost, frames_left)
+
+    player = game.player
+    _restore_player(player, reader.read(PLAYER))
+    _restore_particles(rpg.particles, reader)
+
+    # Entity constructors may consume random numbers - the RNG state is restored last
+    _resize(game.platforms, reader.count(), rpg.platform_pool, 0, 0, 0, 0)
+    for platform in game.platforms:
+        x, y, width, height = reader.read(PLATFORM)
+        platform.rect.update(x, y, width, height)
+
+    _resize(game.robots, reader.count(), rpg.robot_pool, 0, 0)
+    for robot in game.robots:
+        _restore_robot(robot, reader.read(ROBOT))
+
+    _resize(game.diamonds, reader.count(), rpg.diamond_pool, 0, 0)
+    for diamond in game.diamonds:
+        diamond.x, diamond.y, diamond.collected, diamond.animation = reader.read(DIAMOND)
+
+    _resize(game.superdiamonds, reader.count(), rpg.superdiamond_pool, 0, 0, "speed")
+    for superdiamond in game.superdiamonds:
+        (superdiamond.x, superdiamond.y, superdiamond.collected,
+         superdiamond.animation, power) = reader.read(SUPERDIAMOND)
+        superdiamond.power_type = POWER_TYPES[power]
+
+    if reader.count():
+        if game.boss is None:
+            game.boss = rpg.boss_pool.acquire(0, 0, level)
+        _restore_boss(game.boss, reader.read(BOSS))
+    elif game.boss is not None:
+        rpg.boss_pool.release(game.boss)
+        game.boss = None
+
+    game.reindex()
+
+    for attack, _ in rpg.CombatSystem.ATTACKS:
+        swing, count = reader.read(REGISTRY)
+        hits = set()
+        for _ in range(count):
+            index = reader.read(TARGET)[0]
+            hits.add(game.boss if index < 0 else game.robots[index])
+        game.combat.registries[attack] = (swing, hits)
+
+    values = reader.read(RNG)
+    gauss_next = values[627] if values[626] else None
+    random.setstate((values[0], tuple(values[1:626]), gauss_next))
+
+def save(path, data):
+    """Write a save state atomically - a crash mid-write keeps the old file"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp_path, path)
+
+def load(path):
+    with open(path, "rb") as fh:
+        return fh.read()
+
+class CheckpointWriter:
+    """Background thread that writes checkpoints so the frame loop never waits on disk"""
+    def __init__(self):
+        self._pending = {}  # path -> latest data; older unwritten checkpoints are dropped
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, path, data):
+        """Queue data to be written to path and return immediately"""
+        with self._condition:
+            self._pending[path] = data
+            self._condition.notify()
+
+    def close(self):
+        """Flush pending checkpoints and stop the writer thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                path, data = self._pending.popitem()
+            try:
+                save(path, data)
+            except OSError as e:
+                print(f"Warning: Could not write checkpoint {path}: {e}", file=sys.stderr)
+
+class AsyncCheckpointWriter:
+    """CheckpointWriter for the asyncio game loop: writes run as executor jobs
+    started from the event loop, so the frame never waits on disk"""
+    def __init__(self):
+        self._pending = {}  # path -> latest data; older unwritten checkpoints are dropped
+        self._jobs = {}     # path -> task writing it
+
+    def write(self, path, data):
+        """Queue data to be written to path and return immediately"""
+        self._pending[path] = data
+        if path not in self._jobs:
+            self._jobs[path] = asyncio.get_running_loop().create_task(self._run(path))
+
+    async def close(self):
+        """Wait for pending checkpoints to be written"""
+        while self._jobs:
+            await asyncio.gather(*self._jobs.values())
+
+    async def _run(self, path):
+        loop = asyncio.get_running_loop()
+        try:
+            while path in self._pending:
+                data = self._pending.pop(path)
+                try:
+                    await loop.run_in_executor(None, save, path, data)
+                except OSError as e:
+                    print(f"Warning: Could not write checkpoint {path}: {e}", file=sys.stderr)
+        finally:
+            del self._jobs[path]
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+SDL2 texture renderer for Retro Platform Fighter - Diamond Quest
+TextureCanvas implements the Canvas drawing interface on pygame._sdl2.video.
+Rects and thin lines are renderer primitives; circles, arcs, ellipses, polygons,
+thick lines, text and baked sprites are rasterized once with pygame.draw,
+uploaded as textures and copied every frame. Scaling to the window (logical
+size letterboxing) and to the internal render scale is done by SDL.
+
+Usage:
+    retro-platform --renderer sdl2
+    retro-platform bench --renderer sdl2-software   # no GPU needed
+"""
+
+import os
+
+import pygame
+from pygame._sdl2 import video
+
+import retro_platform_game as rpg
+
+BLENDMODE_BLEND = 1  # SDL_BLENDMODE_BLEND
+
+def rgba(color):
+    """Renderer.draw_color needs all four channels"""
+    return color if len(color) == 4 else (*color, 255)
+
+class TextureCanvas:
+    """Canvas drawing through an SDL2 Renderer; see retro_platform_game.Canvas.
+    With a render scale other than 1 each frame is drawn into a target texture
+    of the scaled size, which present() stretches to the window."""
+    TEXTURE_CACHE_SIZE = 1024
+    retained = False
+    SPRITE_CACHE_BYTES = rpg.Canvas.SPRITE_CACHE_BYTES
+
+    def __init__(self, renderer, scale=1.0):
+        self.renderer = renderer
+        self.scale = scale
+        self.target = None
+        if scale != 1:
+            self.target = video.Texture(renderer, (round(rpg.SCREEN_WIDTH * scale),
+                                                   round(rpg.SCREEN_HEIGHT * scale)), target=True)
+        renderer.logical_size = (rpg.SCREEN_WIDTH, rpg.SCREEN_HEIGHT)
+        renderer.draw_blend_mode = BLENDMODE_BLEND
+        self._fonts = {}
+        self._textures = {}  # Shape and text key -> (texture, width, height)
+        self._sprites = {}   # Sprite key -> (texture, width, height)
+        self._sprite_bytes = 0
+
+    def _upload(self, key, surface):
+        if len(self._textures) >= self.TEXTURE_CACHE_SIZE:
+            self._textures.clear()  # Particle radii and text vary; keep the cache bounded
+        entry = self._textures[key] = (video.Texture.from_surface(self.renderer, surface),
+                                       surface.get_width(), surface.get_height())
+        return entry
+
+    def _stamp(self, key, size, paint, pos):
+        """Copy the cached texture for key to pos, rasterizing it with
+        paint(surface) onto a transparent surface of size on first use"""
+        entry = self._textures.get(key)
+        if entry is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            paint(surface)
+            entry = self._upload(key, surface)
+        texture, width, height = entry
+        texture.draw(dstrect=(pos[0], pos[1], width, height))
+
+    # Primitives (same arguments as pygame.draw, minus the surface)
+    def fill(self, color):
+        """Clear the frame; Game.draw calls this first, so it also selects the target"""
+        renderer = self.renderer
+        renderer.target = self.target
+        if self.target is not None:
+            renderer.scale = (self.scale, self.scale)  # Reset by every target switch
+        renderer.draw_color = rgba(color)
+        renderer.clear()
+
+    def rect(self, color, rect, width=0):
+        renderer = self.renderer
+        renderer.draw_color = rgba(color)
+        if not width:
+            renderer.fill_rect(rect)
+        elif width == 1:
+            renderer.draw_rect(rect)
+        else:
+            # pygame draws thick outlines inside the rect
+            x, y, w, h = rect
+            renderer.fill_rect((x, y, w, width))
+            renderer.fill_rect((x, y + h - width, w, width))
+            renderer.fill_rect((x, y, width, h))
+            renderer.fill_rect((x + w - width, y, width, h))
+
+    def circle(self, color, center, radius, width=0):
+        radius = int(radius)
+        size = radius * 2 + 1
+        self._stamp(("circle", color, radius, width), (size, size),
+                    lambda surface: pygame.draw.circle(surface, color, (radius, radius), radius, width),
+                    (int(center[0]) - radius, int(center[1]) - radius))
+
+    def line(self, color, start, end, width=1):
+        if width <= 1:
+            self.renderer.draw_color = rgba(color)
+            self.renderer.draw_line(start, end)
+            return
+        x0, y0 = int(start[0]), int(start[1])
+        dx, dy = int(end[0]) - x0, int(end[1]) - y0
+        left, top = min(0, dx) - width, min(0, dy) - width
+        self._stamp(("line", color, dx, dy, width), (abs(dx) + width * 2, abs(dy) + width * 2),
+                    lambda surface: pygame.draw.line(surface, color, (-left, -top),
+                                                     (dx - left, dy - top), width),
+                    (x0 + left, y0 + top))
+
+    def polygon(self, color, points, width=0):
+        xs = [int(x) for x, _ in points]
+        ys = [int(y) for _, y in points]
+        left, top = min(xs), min(ys)
+        shape = tuple(zip([x - left for x in xs], [y - top for y in ys]))
+        size = (max(xs) - left + 1, max(ys) - top + 1)
+        self._stamp(("polygon", color, shape, width), size,
+                    lambda surface: pygame.draw.polygon(surface, color, shape, width),
+                    (left, top))
+
+    def ellipse(self, color, rect, width=0):
+        x, y, w, h = (int(value) for value in rect)
+        self._stamp(("ellipse", color, w, h, width), (w, h),
+                    lambda surface: pygame.draw.ellipse(surface, color, (0, 0, w, h), width),
+                    (x, y))
+
+    def arc(self, color, rect, start_angle, stop_angle, width=1):
+        x, y, w, h = (int(value) for value in rect)
+        self._stamp(("arc", color, w, h, start_angle, stop_angle, width), (w, h),
+                    lambda surface: pygame.draw.arc(surface, color, (0, 0, w, h),
+                                                    start_angle, stop_angle, width),
+                    (x, y))
+
+    # Cached assets
+    def text(self, text, size, color, pos, anchor="topleft"):
+        """Draw text with the default font at size; returns its Rect"""
+        key = ("text", text, size, color)
+        entry = self._textures.get(key)
+        if entry is None:
+            font = self._fonts.get(size)
+            if font is None:
+                font = self._fonts[size] = pygame.font.Font(None, size)
+            entry = self._upload(key, font.render(text, True, color))
+            rpg.metrics.text_renders += 1
+        texture, width, height = entry
+        rect = pygame.Rect(0, 0, width, height)
+        setattr(rect, anchor, pos)
+        texture.draw(dstrect=rect)
+        return rect
+
+    def sprite(self, key, size, paint, pos, alpha=None):
+        """Copy a baked texture of size, drawn by paint(surface) the first time key is used"""
+        entry = self._sprites.get(key)
+        if entry is None:
+            surface = pygame.Surface(size)
+            paint(surface)
+            nbytes = size[0] * size[1] * 4
+            if self._sprite_bytes + nbytes > self.SPRITE_CACHE_BYTES:
+                self._sprites.clear()  # Textures are freed with their last reference
+                self._sprite_bytes = 0
+            texture = video.Texture.from_surface(self.renderer, surface)
+            if alpha is not None:
+                texture.blend_mode = BLENDMODE_BLEND
+                texture.alpha = alpha
+            entry = self._sprites[key] = (texture,) + tuple(size)
+            self._sprite_bytes += nbytes
+        texture, width, height = entry
+        texture.draw(dstrect=(pos[0], pos[1], width, height))
+
+    def overlay(self, color, alpha):
+        """Cover the whole canvas with a translucent color"""
+        self.renderer.draw_color = (*color, alpha)
+        self.renderer.fill_rect((0, 0, rpg.SCREEN_WIDTH, rpg.SCREEN_HEIGHT))
+
+    def present(self):
+        """Show the frame; SDL letterboxes it into the window via the logical size"""
+        renderer = self.renderer
+        if self.target is not None:
+            renderer.target = None
+            self.target.draw(dstrect=(0, 0, rpg.SCREEN_WIDTH, rpg.SCREEN_HEIGHT))
+        renderer.present()
+    
+    def invalidate(self):
+        """The window lost its contents; every frame is drawn in full, so nothing to do"""
+
+    def to_surface(self):
+        """Read the current frame back into a Surface (slow; for tests and screenshots)"""
+        if self.target is None:
+            return self.renderer.to_surface()
+        return self.renderer.to_surface(area=self.target.get_rect())
+
+def create(scale=1.0, software=False, smooth=False, fullscreen=False, hidden=False):
+    """Open a window with an SDL2 renderer; returns (window, canvas).
+    software=True uses SDL's software renderer, which needs no GPU."""
+    # Must be set before textures are created; SDL reads hints from the environment
+    os.environ["SDL_RENDER_SCALE_QUALITY"] = "linear" if smooth else "nearest"
+    window = video.Window("Retro Platform Fighter - Diamond Quest",
+                          (rpg.SCREEN_WIDTH, rpg.SCREEN_HEIGHT), resizable=True,
+                          fullscreen_desktop=fullscreen, hidden=hidden)
+    renderer = video.Renderer(window, accelerated=0 if software else -1, target_texture=True)
+    return window, TextureCanvas(renderer, scale)
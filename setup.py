@@ -26,6 +26,9 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/username/retro-platform",
     packages=find_packages(),
+    py_modules=["retro_platform_game", "profiling", "benchmarks", "savestate", "rewind",
+                "offline_render", "sdl2_canvas", "assetpack", "dirty_render",
+                "collision_check", "autopilot", "soak", "metrics_exporter"],
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: End Users/Desktop",
@@ -56,7 +59,7 @@ setup(
     },
     include_package_data=True,
     package_data={
-        "": ["sounds/*.wav", "*.md", "requirements.txt"],
+        "": ["sounds/*.wav", "assets.pack", "*.md", "requirements.txt"],
     },
     keywords="game platformer 2d pygame retro arcade",
     project_urls={
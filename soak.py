@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Soak test for Retro Platform Fighter - Diamond Quest
+Lets the autopilot play headlessly for hours. It draws every frame and plays
+the event sounds, and it cycles through all ten levels with the level-select
+keys. At intervals it records:
+- frame time percentiles
+- resident and traced (tracemalloc) memory
+- GC-tracked objects, collections and pauses
+- entity, particle, timer and event counts
+- cache sizes and busy sound channels
+The first full round of the levels is a warm-up. After it, the run fails if
+memory, objects or counters that should stay flat keep growing (SOAK_LIMITS),
+or if frames get slower. Effect lists, Surfaces created in draw paths and
+sound channels are where slow leaks show up.
+
+Usage:
+    retro-platform soak                            # two hours
+    retro-platform soak --minutes 20 --interval 30 --output soak.jsonl
+    retro-platform soak --frames 50000 --no-render --no-tracemalloc
+"""
+
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+import pygame
+
+import autopilot
+import retro_platform_game as rpg
+
+# Growth allowed from the end of the warm-up to the end of the run
+SOAK_LIMITS = {
+    "rss_mb": 64.0,
+    "heap_mb": 16.0,     # tracemalloc
+    "gc_objects": 50000,
+    "created": 64,       # Entities the pools had to construct
+    "timers": 256,       # Timers waiting in the wheel
+    "events": 64,        # Events left undispatched
+    "gc_garbage": 0,     # Uncollectable objects
+}
+FRAME_SLOWDOWN = 0.5     # Allowed p95 frame time increase (0.5 = 50% slower)
+
+POOLS = (rpg.platform_pool, rpg.robot_pool, rpg.diamond_pool, rpg.superdiamond_pool, rpg.boss_pool)
+
+# How each SOAK_LIMITS metric is read from a sample
+METRICS = {
+    "rss_mb": lambda sample: sample["rss_mb"],
+    "heap_mb": lambda sample: sample["heap_mb"],
+    "gc_objects": lambda sample: sample["gc"]["objects"],
+    "created": lambda sample: sample["entities"]["created"],
+    "timers": lambda sample: sample["timers"],
+    "events": lambda sample: sample["events"],
+    "gc_garbage": lambda sample: sample["gc"]["garbage"],
+}
+
+def rss_mb():
+    """Resident set size in MB, or None where it cannot be read. Without
+    /proc this is the peak size from getrusage, which still shows growth."""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+def percentiles(samples):
+    """p50/p95/p99/max of frame times in milliseconds"""
+    ordered = sorted(samples)
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p / 100.0 * len(ordered)))]
+    return {"p50": round(pct(50), 3), "p95": round(pct(95), 3),
+            "p99": round(pct(99), 3), "max": round(ordered[-1], 3)}
+
+def busy_channels():
+    if pygame.mixer.get_init() is None:
+        return 0
+    return sum(pygame.mixer.Channel(i).get_busy() for i in range(pygame.mixer.get_num_channels()))
+
+def cache_sizes(canvas):
+    """Entries in a canvas's text (or shape texture) and sprite caches"""
+    if canvas is None:
+        return {}
+    text = getattr(canvas, "_text", None)
+    if text is None:
+        text = canvas._textures
+    return {"text": len(text), "sprites": len(canvas._sprites),
+            "sprite_kb": canvas._sprite_bytes // 1024}
+
+class LevelRotation:
+    """Moves the soak through the levels in order with the level-select cheat
+    keys, as a player would. Each level gets at most `frames` frames. A
+    completed level counts as a move on. After a game over the restart is
+    taken back to the level being soaked."""
+    def __init__(self, frames):
+        self.frames = frames
+        self.level = None
+        self.elapsed = 0
+        self.visits = Counter()
+        self.rounds = 0  # Times level 10 was left for level 1
+
+    def _enter(self, level):
+        if self.level == 10 and level == 1:
+            self.rounds += 1
+        self.level = level
+        self.elapsed = 0
+        self.visits[level] += 1
+
+    def keydowns(self, game):
+        """Level-select presses for this frame, if any"""
+        if game.game_state != "playing":
+            return ()
+        level = game.current_level
+        if self.level is None or level == self.level % 10 + 1:
+            self._enter(level)
+        elif level != self.level:
+            return (pygame.K_0 + self.level % 10,)  # Restarted after a game over
+        self.elapsed += 1
+        if self.elapsed < self.frames:
+            return ()
+        self._enter(self.level % 10 + 1)
+        return (pygame.K_0 + self.level % 10,)
+
+class GCStats:
+    """Counts collections (GCPolicy's or automatic) via gc.callbacks, keeping
+    only totals and the longest pause since the last sample"""
+    def __init__(self):
+        self.collections = [0, 0, 0]
+        self.max_pause = 0.0
+        self._start = 0.0
+
+    def attach(self):
+        gc.callbacks.append(self._callback)
+
+    def detach(self):
+        gc.callbacks.remove(self._callback)
+
+    def _callback(self, phase, info):
+        if phase == "start":
+            self._start = time.perf_counter()
+        else:
+            self.collections[info["generation"]] += 1
+            self.max_pause = max(self.max_pause, time.perf_counter() - self._start)
+
+class FrameHistogram:
+    """Frame times in 0.1 ms bins (100 ms and over share the last), so a whole
+    round of the levels fits in constant memory"""
+    BINS = 1000
+
+    def __init__(self):
+        self.counts = [0] * (self.BINS + 1)
+        self.total = 0
+
+    def add(self, ms):
+        self.counts[min(self.BINS, int(ms * 10))] += 1
+        self.total += 1
+
+    def percentile(self, p):
+        rank = p / 100.0 * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen > rank:
+                return i / 10.0
+        return self.BINS / 10.0
+
+class SoakMonitor:
+    """Frame times since the last sample and over each round of the levels,
+    and the samples taken so far. Frame times are compared round against
+    round, since levels with more robots are slower to play and draw."""
+    def __init__(self, game, canvas, trace, rotation):
+        self.game = game
+        self.canvas = canvas
+        self.trace = trace
+        self.rotation = rotation
+        self.times = []  # Milliseconds
+        self.round = FrameHistogram()
+        self.round_start = 0
+        self.rounds = []  # (first frame, p95 ms) of each full round
+        self.samples = []
+        self.baseline = None  # Index of the first sample after the warm-up
+        self.gc = GCStats()
+
+    def frame(self, ms, frames):
+        self.times.append(ms)
+        self.round.add(ms)
+        if self.rotation.rounds > len(self.rounds):
+            self.rounds.append((self.round_start, self.round.percentile(95)))
+            self.round = FrameHistogram()
+            self.round_start = frames
+
+    def sample(self, elapsed, frames):
+        game = self.game
+        frame_ms = percentiles(self.times) if self.times else None
+        self.times.clear()  # Before measuring memory, so the list isn't counted
+        sample = {
+            "elapsed_s": round(elapsed, 1),
+            "frames": frames,
+            "level": game.current_level,
+            "frame_ms": frame_ms,
+            "rss_mb": rss_mb(),
+            "heap_mb": tracemalloc.get_traced_memory()[0] / 2**20 if self.trace else None,
+            "gc": {
+                "objects": len(gc.get_objects()) + gc.get_freeze_count(),
+                "collections": list(self.gc.collections),
+                "max_pause_ms": round(self.gc.max_pause * 1000, 3),
+                "garbage": len(gc.garbage),
+            },
+            "entities": {
+                "robots": len(game.robots),
+                "diamonds": len(game.diamonds),
+                "superdiamonds": len(game.superdiamonds),
+                "platforms": len(game.platforms),
+                "particles": rpg.particles.count,
+                "created": sum(pool.created for pool in POOLS),
+            },
+            "timers": rpg.timers.pending(),
+            "events": len(rpg.events.pending),
+            "channels": busy_channels(),
+            "caches": cache_sizes(self.canvas),
+        }
+        self.gc.max_pause = 0.0
+        self.samples.append(sample)
+        return sample
+
+def print_sample(sample):
+    frame_ms = sample["frame_ms"] or dict.fromkeys(("p50", "p95", "p99", "max"), 0)
+    memory = f"rss {sample['rss_mb']:.1f} MB" if sample["rss_mb"] is not None else "rss -"
+    if sample["heap_mb"] is not None:
+        memory += f", heap {sample['heap_mb']:.1f} MB"
+    entities = sample["entities"]
+    print(f"{sample['elapsed_s'] / 60:7.1f} min {sample['frames']:>9} frames  level {sample['level']:<2}  "
+          f"ms p50 {frame_ms['p50']:.2f} p95 {frame_ms['p95']:.2f} p99 {frame_ms['p99']:.2f} "
+          f"max {frame_ms['max']:.1f}  {memory}  objects {sample['gc']['objects']}  "
+          f"robots {entities['robots']} particles {entities['particles']} "
+          f"created {entities['created']}  timers {sample['timers']}  "
+          f"channels {sample['channels']}", flush=True)
+
+def judge(samples, rounds):
+    """(check, before, after, allowed, failed) for every metric, comparing the
+    median of the first and last few samples (at most three each), and the
+    p95 frame time of the first and last full rounds of the levels"""
+    count = max(1, min(3, len(samples) // 2))
+    head, tail = samples[:count], samples[-count:]
+    checks = []
+    for name, read in METRICS.items():
+        before = [read(sample) for sample in head]
+        if None in before:
+            continue  # Not measured in this run
+        before = statistics.median(before)
+        after = statistics.median(read(sample) for sample in tail)
+        allowed = SOAK_LIMITS[name]
+        checks.append((f"{name} growth", before, after, f"+{allowed:g}", after - before > allowed))
+    before, after = rounds[0], rounds[-1]
+    checks.append(("round p95 frame_ms", before, after, f"+{FRAME_SLOWDOWN:.0%}",
+                   after > before * (1.0 + FRAME_SLOWDOWN)))
+    return checks
+
+def print_growth(start, end, limit):
+    """Largest traced allocations made after the warm-up, by source line"""
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    diffs = end.filter_traces(filters).compare_to(start.filter_traces(filters), "lineno")
+    print(f"\n{'size':>10} {'blocks':>8}  call site (grown since the warm-up)")
+    for diff in diffs[:limit]:
+        if diff.size_diff <= 0:
+            break
+        frame = diff.traceback[0]
+        print(f"{diff.size_diff:+10d} {diff.count_diff:+8d}  "
+              f"{os.path.basename(frame.filename)}:{frame.lineno}")
+
+def soak(args, game, monitor, warmup, output):
+    """Play until the time or frame limit (or Ctrl+C); returns the frames played
+    and the tracemalloc snapshot taken at the end of the warm-up"""
+    pilot = autopilot.Autopilot(game, args.seed)
+    rotation = monitor.rotation
+    canvas = monitor.canvas
+    perf_counter = time.perf_counter
+    started = perf_counter()
+    deadline = started + args.minutes * 60
+    next_sample = started + args.interval
+    frame, snapshot = 0, None
+    try:
+        while frame != args.frames:
+            frame_start = perf_counter()
+            keys, keydowns = pilot.inputs(frame)
+            for key in keydowns + rotation.keydowns(game):
+                game.handle_key(key)
+            game.update(keys)
+            rpg.events.dispatch()
+            if canvas is not None:
+                game.draw(canvas)
+                canvas.present()
+            rpg.gc_policy.idle(frame_start + rpg.gc_policy.budget, game.game_state != "playing")
+            now = perf_counter()
+            frame += 1
+            monitor.frame((now - frame_start) * 1000.0, frame)
+            if now >= next_sample or now >= deadline or frame == args.frames:
+                next_sample = now + args.interval
+                sample = monitor.sample(now - started, frame)
+                sample["baseline"] = monitor.baseline is None and frame >= warmup
+                if sample["baseline"]:
+                    monitor.baseline = len(monitor.samples) - 1
+                    if monitor.trace:
+                        snapshot = tracemalloc.take_snapshot()
+                print_sample(sample)
+                if output is not None:
+                    output.write(json.dumps(sample) + "\n")
+                    output.flush()
+                if now >= deadline:
+                    break
+    except KeyboardInterrupt:
+        print("Interrupted; reporting the samples so far", file=sys.stderr)
+    return frame, snapshot
+
+def run_soak(args):
+    """Entry point for the `soak` subcommand"""
+    warmup = args.warmup if args.warmup is not None else 10 * args.level_frames
+    needed = warmup + 20 * args.level_frames  # Two full rounds of the levels after it
+    if args.frames is not None and args.frames < needed:
+        print(f"Soak: --frames {args.frames} can't be judged; the warm-up and two rounds "
+              f"of the levels need at least {needed} (lower --warmup or --level-frames)",
+              file=sys.stderr)
+        return 2
+    rpg.quality.set(args.quality)
+    if args.gc_policy:
+        rpg.gc_policy.start()
+    if args.tracemalloc:
+        tracemalloc.start()
+    game = rpg.Game(1, args.seed)
+    canvas = None if args.no_render else rpg.offscreen_canvas(args.renderer, args.render_scale)
+    monitor = SoakMonitor(game, canvas, args.tracemalloc, LevelRotation(args.level_frames))
+    # The same consumers as the game window, plus telemetry
+    counter = rpg.EventCounter()
+    consumers = [counter, game.on_events]
+    if not args.mute and pygame.mixer.get_init() is not None and rpg.sound_manager.sound_enabled:
+        consumers.append(rpg.play_event_sounds)
+    for consumer in consumers:
+        rpg.events.attach(consumer)
+    monitor.gc.attach()
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+    start = time.perf_counter()
+    try:
+        frames, snapshot = soak(args, game, monitor, warmup, output)
+    finally:
+        elapsed = time.perf_counter() - start
+        monitor.gc.detach()
+        for consumer in consumers:
+            rpg.events.detach(consumer)
+        if output is not None:
+            output.close()
+        rpg.gc_policy.stop()
+
+    rotation = monitor.rotation
+    visits = ", ".join(f"{level}: {count}" for level, count in sorted(rotation.visits.items()))
+    print(f"\nSoak: {frames} frames in {elapsed / 60:.1f} min ({frames / max(elapsed, 1e-9):.0f} FPS), "
+          f"{rotation.rounds} full rounds of the levels")
+    print(f"  level visits {visits}")
+    print(f"  levels completed {counter.counts[rpg.EVENT_LEVEL_COMPLETE]}, lives lost "
+          f"{counter.counts[rpg.EVENT_LIFE_LOST]}, enemy hits {counter.counts[rpg.EVENT_HIT]}")
+    if output is not None:
+        print(f"  samples written to {args.output}")
+
+    samples = monitor.samples[monitor.baseline:] if monitor.baseline is not None else []
+    if snapshot is not None:
+        print_growth(snapshot, tracemalloc.take_snapshot(), args.top)
+    if args.tracemalloc:
+        tracemalloc.stop()
+    rounds = [p95 for start, p95 in monitor.rounds if start >= warmup]
+    if rounds:
+        print("\nRound p95 frame ms after the warm-up: " + " ".join(f"{p95:.1f}" for p95 in rounds))
+    # A run too short to compare must not pass (a misconfigured CI soak)
+    if len(samples) < 2 or len(rounds) < 2:
+        print("\nSoak test: FAILED (not judged - fewer than two samples or full rounds of "
+              "the levels after the warm-up; run longer, or lower --warmup, --interval "
+              "or --level-frames)")
+        return 1
+    print(f"\n{'check':<20} {'after warm-up':>14} {'at end':>12} {'allowed':>9}")
+    failures = []
+    for name, before, after, allowed, failed in judge(samples, rounds):
+        print(f"{name:<20} {before:>14.2f} {after:>12.2f} {allowed:>9}" + ("  FAILED" if failed else ""))
+        if failed:
+            failures.append(name)
+    for name in failures:
+        print(f"Soak check failed: {name}", file=sys.stderr)
+    print("\nSoak test: " + (f"FAILED ({', '.join(failures)})" if failures else "ok"))
+    return 1 if failures else 0
+
+def add_parser(subparsers):
+    parser = subparsers.add_parser(
+        "soak", help="let the autopilot play for hours and check for leaks",
+        description="Play all ten levels headlessly with the autopilot, sampling frame "
+                    "times, memory, GC and entity counts at intervals; exits with code 1 "
+                    "when something keeps growing after the warm-up or frames slow down.")
+    parser.add_argument("--minutes", type=float, default=120,
+                        help="wall-clock length of the run (default: 120)")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="stop after this many frames instead, if sooner")
+    parser.add_argument("--interval", type=float, default=60, metavar="SECONDS",
+                        help="seconds between samples (default: 60)")
+    parser.add_argument("--level-frames", type=int, default=3600,
+                        help="frames on each level before moving to the next (default: 3600)")
+    parser.add_argument("--warmup", type=int, default=None, metavar="FRAMES",
+                        help="frames before the growth baseline (default: one round of the "
+                             "ten levels)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed for the levels and the autopilot (default: 0)")
+    rpg.add_render_arguments(parser)
+    parser.add_argument("--no-render", action="store_true",
+                        help="skip drawing (leaks in draw paths go unnoticed)")
+    parser.add_argument("--mute", action="store_true",
+                        help="don't play event sounds")
+    parser.add_argument("--no-tracemalloc", dest="tracemalloc", action="store_false",
+                        help="don't trace Python allocations (faster frames, no heap figures)")
+    parser.add_argument("--no-gc-policy", dest="gc_policy", action="store_false",
+                        help="leave garbage collection automatic, unlike the game")
+    parser.add_argument("--output", metavar="PATH",
+                        help="write every sample to this file as a JSON line")
+    parser.add_argument("--top", type=int, default=10,
+                        help="call sites to list by traced memory growth (default: 10)")
+    parser.set_defaults(handler=run_soak)
+    return parser